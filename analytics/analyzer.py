@@ -1,124 +1,199 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from database import TransactionModel
+from bson.objectid import ObjectId
+from database import TransactionModel, RollupModel, SummaryModel
+from database.transaction_model import TRANSACTION_SORT
+from database.query_cache import cached_query
+from pymongo.errors import OperationFailure
+from utils import handler_datetime
+from analytics.frame_loader import load_frame
+
+# compact column dtypes of the analytics DataFrame
+# (amount is loaded as integer cents into the "amount_cents" column)
+TRANSACTION_SCHEMA = {
+    "_id": "objectid",
+    "date": "datetime64[ms]",
+    "type": "category",
+    "category": "category",
+    "amount": "cents",
+    "description": "string",
+}
+DEFAULT_FRAME_FIELDS = ["date", "type", "category", "amount", "description"]
+# server error codes for an unknown expression operator / group accumulator
+# ($median/$percentile before MongoDB 7.0)
+UNSUPPORTED_OPERATOR_CODES = (168, 15952)
 
 class FinanceAnalyzer:
     def __init__(self, 
-                 transaction_model: TransactionModel):
+                 transaction_model: TransactionModel,
+                 rollup_model: RollupModel = None,
+                 summary_model: SummaryModel = None):
         self.transaction_model = transaction_model
+        # aggregates (totals, categories, trends) are read from daily rollups
+        self.rollup_model = rollup_model or RollupModel(transaction_model.user_id)
+        # all-time totals are read from the per-user summary document
+        self.summary_model = summary_model or SummaryModel(transaction_model.user_id)
+        # None until the first statistics query tells whether the server has $median/$percentile
+        self._server_percentiles = None
+
+    @property
+    def user_id(self):
+        """User the results belong to (scopes the query cache)"""
+        return self.transaction_model.user_id
     
-    def get_transactions_dataframe(self):
-        """Convert transactions to pandas DataFrame"""
-        transactions = self.transaction_model.get_transactions()
-        
-        if not transactions:
+    def get_transactions_dataframe(self, fields=None, advanced_filters=None):
+        """
+        Load transactions into a compact pandas DataFrame (decoded column-wise):
+        categorical type/category, amount as int cents in "amount_cents",
+        datetime64 date, no id columns unless "_id" is asked for.
+
+        Args:
+            fields: Columns to load, keys of TRANSACTION_SCHEMA (None = DEFAULT_FRAME_FIELDS)
+            advanced_filters: Filter dict accepted by TransactionModel.get_transactions
+        """
+        fields = fields or DEFAULT_FRAME_FIELDS
+        # transactions store category_id: load it and map it to names
+        schema = {
+            ("category_id" if field == "category" else field):
+                ("objectid" if field == "category" else TRANSACTION_SCHEMA[field])
+            for field in fields
+        }
+
+        df = load_frame(
+            self.transaction_model.analytics_collection,
+            self.transaction_model.build_query(advanced_filters),
+            schema,
+            sort=TRANSACTION_SORT,
+        )
+
+        if df.empty:
             return pd.DataFrame()
-        
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
+        if "category_id" in df.columns and "category" in fields:
+            position = df.columns.get_loc("category_id")
+            df.insert(position, "category", pd.Categorical(self._category_names(df.pop("category_id"))))
         return df
+
+    def _category_names(self, category_ids):
+        """category_id values -> display names (cached category map)"""
+        categories = self.transaction_model.category_model.get_category_map()
+
+        def name(category_id):
+            if isinstance(category_id, bytes):  # pymongoarrow ObjectId
+                category_id = ObjectId(category_id)
+            category = categories.get(category_id)
+            return category["name"] if category else None
+
+        return [name(category_id) for category_id in category_ids]
     
     def calculate_total_by_type(self, transaction_type, start_date=None, end_date=None):
         """Calculate total amount by transaction type"""
-        if start_date and end_date:
-            transactions = self.transaction_model.get_transactions_by_date_range(
-                start_date, end_date
-            )
-        else:
-            transactions = self.transaction_model.get_transactions()
-        
-        total = sum(t['amount'] for t in transactions if t['type'] == transaction_type)
-        return total
+        start, end = self._date_bounds(start_date, end_date)
+        return self._total_by_type(transaction_type, start, end)
+
+    @cached_query()
+    def _total_by_type(self, transaction_type, start, end):
+        if start is None:
+            return self._summary_type(transaction_type).get("sum", 0)
+
+        pipeline = [
+            {"$match": {"type": transaction_type}},
+            {"$group": {"_id": None, "total": {"$sum": "$sum"}}},
+        ]
+        result = self.rollup_model.aggregate(pipeline, start, end)
+        return result[0]["total"] if result else 0
     
     def get_spending_by_category(self, start_date=None, end_date=None):
         """Get spending grouped by category"""
-        if start_date and end_date:
-            transactions = self.transaction_model.get_transactions_by_date_range(
-                start_date, end_date
-            )
-        else:
-            transactions = self.transaction_model.get_transactions()
-        
-        df = pd.DataFrame(transactions)
-        
-        if df.empty:
-            return pd.DataFrame()
-        
-        # Filter only expenses
-        expenses = df[df['type'] == 'Expense']
-        
-        if expenses.empty:
-            return pd.DataFrame()
-        
-        category_spending = expenses.groupby('category')['amount'].agg(['sum', 'count', 'mean']).reset_index()
-        category_spending.columns = ['Category', 'Total', 'Count', 'Average']
-        category_spending = category_spending.sort_values('Total', ascending=False)
-        
-        return category_spending
+        start, end = self._date_bounds(start_date, end_date)
+        return self._spending_by_category(start, end)
+
+    @cached_query()
+    def _spending_by_category(self, start, end):
+        result = self.rollup_model.aggregate(self._category_stages(), start, end)
+        return self._category_frame_from_facet(result)
     
     def get_monthly_trend(self, months=6):
         """Get monthly spending and income trend"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=months*30)
-        
-        transactions = self.transaction_model.get_transactions_by_date_range(
-            start_date, end_date
-        )
-        
-        df = pd.DataFrame(transactions)
-        
-        if df.empty:
-            return pd.DataFrame()
-        
-        df['date'] = pd.to_datetime(df['date'])
-        df['month'] = df['date'].dt.to_period('M')
-        
-        monthly_data = df.groupby(['month', 'type'])['amount'].sum().unstack(fill_value=0)
-        monthly_data.index = monthly_data.index.to_timestamp()
-        
-        return monthly_data
+        start, end = self._trend_bounds(months)
+        return self._monthly_trend(start, end)
+
+    @cached_query()
+    def _monthly_trend(self, start, end):
+        result = self.rollup_model.aggregate(self._trend_stages(), start, end)
+        return self._trend_frame_from_facet(result)
     
-    def get_daily_average(self):
-        """Calculate daily average spending"""
+    def _iter_frames(self, fields, advanced_filters=None):
+        """
+        Stream transactions as DataFrame chunks (one cursor batch each, bounded memory)
+        with the TRANSACTION_SCHEMA dtypes, amount as int cents in "amount_cents"
+        """
+        return self.transaction_model.iter_transactions(
+            advanced_filters, schema={field: TRANSACTION_SCHEMA[field] for field in fields}
+        )
 
-        # approach 1:
-        transactions = self.transaction_model.get_transactions()
-        expenses = [t for t in transactions if t['type'] == 'Expense']
+    def get_daily_average(self, start_date=None, end_date=None):
+        """
+        Calculate daily average spending: the summary document for all time,
+        a $sum over the daily rollups for a date range
+        """
+        start, end = self._date_bounds(start_date, end_date)
+        if start is None:
+            expenses = self._summary_type('Expense')
+            if not expenses:
+                return 0
+            return self._daily_average(expenses["sum"], expenses["first_date"], expenses["last_date"])
+        return self._range_daily_average(start, end)
 
-        # # approach 2:
-        # advanced_filter = {"type": 'Expense'}
-        # expenses = self.transaction_model.get_transactions(advanced_filter)
+    @cached_query()
+    def _range_daily_average(self, start, end):
+        daily = self.rollup_model.aggregate(self._daily_stages(), start, end)
+        return self._daily_average(daily[0]["total"], daily[0]["first"], daily[0]["last"]) if daily else 0
 
-        if not expenses:
-            return 0
-        
-        df = pd.DataFrame(expenses)
-        df['date'] = pd.to_datetime(df['date']) # ensure convert properly datetime format
-        
-        date_range = (df['date'].max() - df['date'].min()).days + 1
-        total_spending = df['amount'].sum()
-        
-        return total_spending / date_range if date_range > 0 else 0
+    def _summary_type(self, transaction_type):
+        """{"sum", "count", "first_date", "last_date"} of one type, {} if none"""
+        stats = self.summary_model.get_summary().get("types", {}).get(transaction_type, {})
+        return stats if stats.get("count", 0) > 0 else {}
     
+    @cached_query()
     def detect_anomalies(self, threshold=2):
-        """Detect unusual spending patterns"""
-        df = self.get_transactions_dataframe()
-        
-        if df.empty:
-            return pd.DataFrame()
-        
-        expenses = df[df['type'] == 'Expense'].copy()
-        
-        if expenses.empty or len(expenses) < 5:
+        """Detect unusual spending patterns (two streaming passes, only outliers are kept)"""
+        columns = ['date', 'category', 'amount', 'description', 'z_score']
+        expense_filter = {"transaction_type": 'Expense'}
+
+        # pass 1: mean / variance merged chunk by chunk (parallel variance algorithm)
+        count, mean_amount, m2 = 0, 0.0, 0.0
+        for chunk in self._iter_frames(['amount'], expense_filter):
+            cents = chunk['amount_cents'].to_numpy(dtype="float64")
+            chunk_mean = cents.mean()
+            delta = chunk_mean - mean_amount
+            total = count + len(cents)
+            mean_amount += delta * len(cents) / total
+            m2 += ((cents - chunk_mean) ** 2).sum() + delta ** 2 * count * len(cents) / total
+            count = total
+
+        if count < 5:
             return pd.DataFrame()
-        
-        mean_amount = expenses['amount'].mean()
-        std_amount = expenses['amount'].std()
-        
-        expenses['z_score'] = (expenses['amount'] - mean_amount) / std_amount
-        anomalies = expenses[abs(expenses['z_score']) > threshold]
-        
-        return anomalies[['date', 'category', 'amount', 'description', 'z_score']]
+
+        std_amount = (m2 / (count - 1)) ** 0.5
+        if std_amount == 0:
+            return pd.DataFrame(columns=columns)
+
+        # pass 2: keep the rows far from the mean
+        anomalies = []
+        for chunk in self._iter_frames(['date', 'category', 'amount', 'description'], expense_filter):
+            cents = chunk['amount_cents'].to_numpy()
+            z_score = (cents - mean_amount) / std_amount
+            outliers = np.abs(z_score) > threshold
+            if outliers.any():
+                anomalies.append(chunk[outliers].assign(
+                    amount=cents[outliers] / 100,
+                    z_score=z_score[outliers],
+                ))
+
+        if not anomalies:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(anomalies, ignore_index=True)[columns]
     
     def predict_next_month_spending(self):
         """Simple prediction based on moving average"""
@@ -137,27 +212,276 @@ class FinanceAnalyzer:
         
         return prediction
     
-    def get_statistics_summary(self):
-        """Get comprehensive statistics summary"""
-        df = self.get_transactions_dataframe()
-        
-        if df.empty:
+    def get_statistics_summary(self, start_date=None, end_date=None):
+        """Get comprehensive statistics summary (one aggregation, honors the date range)"""
+        start, end = self._date_bounds(start_date, end_date)
+        stats = self._statistics(start, end)
+        if not stats:
             return {}
-        
-        expenses = df[df['type'] == 'Expense']
-        income = df[df['type'] == 'Income']
-        
+
+        expenses = stats.get('Expense', {})
+        income = stats.get('Income', {})
         summary = {
-            'total_expenses': expenses['amount'].sum() if not expenses.empty else 0,
-            'total_income': income['amount'].sum() if not income.empty else 0,
-            'avg_expense': expenses['amount'].mean() if not expenses.empty else 0,
-            'avg_income': income['amount'].mean() if not income.empty else 0,
-            'median_expense': expenses['amount'].median() if not expenses.empty else 0,
-            'transaction_count': len(df),
-            'expense_count': len(expenses),
-            'income_count': len(income),
+            'total_expenses': expenses.get('sum', 0),
+            'total_income': income.get('sum', 0),
+            'avg_expense': expenses.get('avg', 0),
+            'avg_income': income.get('avg', 0),
+            'median_expense': expenses.get('median', 0),
+            'p90_expense': expenses.get('p90', 0),
+            'min_expense': expenses.get('min', 0),
+            'max_expense': expenses.get('max', 0),
+            'daily_average': self._daily_average(
+                expenses['sum'], expenses['first_date'], expenses['last_date']
+            ) if expenses else 0,
+            'transaction_count': sum(row['count'] for row in stats.values()),
+            'expense_count': expenses.get('count', 0),
+            'income_count': income.get('count', 0),
         }
         
         summary['net_balance'] = summary['total_income'] - summary['total_expenses']
         
-        return summary
\ No newline at end of file
+        return summary
+
+    @cached_query()
+    def _statistics(self, start, end):
+        """
+        Per-type sum/avg/count/min/max, first/last date, median and 90th
+        percentile of the transactions between two days, in one $group.
+        Servers without $median/$percentile (before MongoDB 7.0) get the
+        percentiles from a NumPy pass over the amounts instead.
+        """
+        filters = {}
+        if start is not None:
+            # rollup semantics: the end day is included up to its last millisecond
+            filters = {"start_date": start, "end_date": end + timedelta(days=1, milliseconds=-1)}
+
+        group = {
+            "_id": "$type",
+            "sum": {"$sum": "$amount"},
+            "avg": {"$avg": "$amount"},
+            "count": {"$sum": 1},
+            "min": {"$min": "$amount"},
+            "max": {"$max": "$amount"},
+            "first_date": {"$min": "$date"},
+            "last_date": {"$max": "$date"},
+        }
+        percentiles = {
+            "median": {"$median": {"input": "$amount", "method": "approximate"}},
+            "p90": {"$percentile": {"input": "$amount", "p": [0.9], "method": "approximate"}},
+        }
+
+        rows = None
+        if self._server_percentiles is not False:
+            try:
+                rows = self.transaction_model.aggregate([{"$group": {**group, **percentiles}}], filters)
+                self._server_percentiles = True
+            except OperationFailure as e:
+                if e.code not in UNSUPPORTED_OPERATOR_CODES:
+                    raise
+                self._server_percentiles = False
+
+        if rows is None:
+            rows = self.transaction_model.aggregate([{"$group": group}], filters)
+            self._add_percentiles(rows, filters)
+
+        stats = {}
+        for row in rows:
+            p90 = row["p90"]
+            stats[row.pop("_id")] = {
+                **row,
+                "sum": round(row["sum"], 2),
+                "p90": p90[0] if isinstance(p90, list) else p90,
+            }
+        return stats
+
+    def _add_percentiles(self, rows, filters):
+        """NumPy fallback: median / 90th percentile per type, amounts streamed as int cents"""
+        cents = {}
+        for chunk in self._iter_frames(['type', 'amount'], filters):
+            amounts = chunk['amount_cents'].to_numpy()
+            types = chunk['type'].to_numpy()
+            for transaction_type in pd.unique(types):
+                cents.setdefault(transaction_type, []).append(amounts[types == transaction_type])
+
+        for row in rows:
+            amounts = np.concatenate(cents.get(row["_id"], [np.empty(0, dtype=np.int64)]))
+            median, p90 = np.percentile(amounts, [50, 90]) / 100 if len(amounts) else (0, 0)
+            row["median"], row["p90"] = float(median), float(p90)
+    
+    def get_dashboard_snapshot(self, start_date=None, end_date=None, months=6):
+        """
+        Compute every dashboard figure in a single $facet aggregation on daily rollups.
+
+        Totals, category breakdown and daily average honor the selected
+        date range; the monthly trend always covers the last `months` months.
+        For "All Time" (no range) totals and daily average come from the
+        per-user summary document instead of the rollups.
+
+        Returns:
+            {
+                "total_expense": float,
+                "total_income": float,
+                "net_balance": float,
+                "daily_average": float,
+                "category_spending": DataFrame (Category, Total, Count, Average),
+                "monthly_trend": DataFrame (index: month, columns: type),
+            }
+        """
+        start, end = self._date_bounds(start_date, end_date)
+        trend_start, trend_end = self._trend_bounds(months)
+        return self._dashboard_snapshot(start, end, trend_start, trend_end)
+
+    @cached_query()
+    def _dashboard_snapshot(self, start, end, trend_start, trend_end):
+        # Only pre-filter by day when a range is selected ("All Time" needs everything)
+        range_match = {}
+        prefilter_start = None
+        facets = {
+            "categories": [
+                {"$match": range_match},
+                *self._category_stages(),
+            ],
+            "trend": [
+                {"$match": {"day": {"$gte": trend_start, "$lte": trend_end}}},
+                *self._trend_stages(),
+            ],
+        }
+        if start and end:
+            range_match.update(day={"$gte": start, "$lte": end})
+            prefilter_start = min(start, trend_start)
+            facets["totals"] = [
+                {"$match": range_match},
+                {"$group": {"_id": "$type", "total": {"$sum": "$sum"}}},
+            ]
+            facets["daily"] = [{"$match": range_match}, *self._daily_stages()]
+
+        result = self.rollup_model.aggregate([{"$facet": facets}], prefilter_start)
+        facets = result[0] if result else {}
+
+        if start and end:
+            totals = {row["_id"]: row["total"] for row in facets.get("totals", [])}
+            daily = facets.get("daily", [])
+            daily_average = (
+                self._daily_average(daily[0]["total"], daily[0]["first"], daily[0]["last"])
+                if daily else 0
+            )
+        else:
+            # All Time: totals and daily average are O(1) reads of the summary
+            types = self.summary_model.get_summary().get("types", {})
+            totals = {type_: stats.get("sum", 0) for type_, stats in types.items()}
+            expenses = types.get("Expense", {})
+            daily_average = self._daily_average(
+                expenses["sum"], expenses["first_date"], expenses["last_date"]
+            ) if expenses.get("count", 0) > 0 else 0
+
+        total_expense = totals.get("Expense", 0)
+        total_income = totals.get("Income", 0)
+
+        return {
+            "total_expense": total_expense,
+            "total_income": total_income,
+            "net_balance": total_income - total_expense,
+            "daily_average": daily_average,
+            "category_spending": self._category_frame_from_facet(facets.get("categories", [])),
+            "monthly_trend": self._trend_frame_from_facet(facets.get("trend", [])),
+        }
+
+    @staticmethod
+    def _date_bounds(start_date, end_date):
+        """
+        Normalize a dashboard date range to rollup day bounds (None, None = all time).
+        Buckets are midnights, so `day <= end` is the same as `day <= midnight of end`;
+        truncating keeps cache keys stable across reruns.
+        """
+        if not (start_date and end_date):
+            return None, None
+        return (
+            RollupModel.to_day(handler_datetime(start_date)),
+            RollupModel.to_day(handler_datetime(end_date)),
+        )
+
+    @staticmethod
+    def _trend_bounds(months):
+        """Day bounds of the last `months` months (30 days each)"""
+        today = RollupModel.to_day(datetime.now())
+        return today - timedelta(days=months*30), today
+
+    @staticmethod
+    def _daily_stages():
+        """Expense total and first/last expense day of the rollup buckets (input of _daily_average)"""
+        return [
+            {"$match": {"type": "Expense"}},
+            {
+                "$group": {
+                    "_id": None,
+                    "total": {"$sum": "$sum"},
+                    "first": {"$min": "$day"},
+                    "last": {"$max": "$day"},
+                }
+            },
+        ]
+
+    @staticmethod
+    def _category_stages():
+        """Rollup stages: expense Total/Count/Average per category"""
+        return [
+            {"$match": {"type": "Expense"}},
+            {
+                "$group": {
+                    "_id": "$category_id",
+                    "Total": {"$sum": "$sum"},
+                    "Count": {"$sum": "$count"},
+                }
+            },
+            {"$addFields": {"Average": {"$divide": ["$Total", "$Count"]}}},
+        ]
+
+    @staticmethod
+    def _trend_stages():
+        """Rollup stages: total per (month, type)"""
+        return [
+            {
+                "$group": {
+                    "_id": {
+                        "month": {
+                            "$dateFromParts": {
+                                "year": {"$year": "$day"},
+                                "month": {"$month": "$day"},
+                            }
+                        },
+                        "type": "$type",
+                    },
+                    "total": {"$sum": "$sum"},
+                }
+            },
+        ]
+
+    @staticmethod
+    def _daily_average(total, first, last):
+        """Total expense divided by the number of calendar days from first to last expense"""
+        date_range = (RollupModel.to_day(last) - RollupModel.to_day(first)).days + 1
+        return total / date_range if date_range > 0 else 0
+
+    def _category_frame_from_facet(self, rows):
+        """Same shape as get_spending_by_category (category ids mapped to names)"""
+        if not rows:
+            return pd.DataFrame()
+
+        category_spending = pd.DataFrame(rows)
+        category_spending["Category"] = self._category_names(category_spending.pop("_id"))
+        category_spending = category_spending[['Category', 'Total', 'Count', 'Average']]
+        return category_spending.sort_values('Total', ascending=False)
+
+    @staticmethod
+    def _trend_frame_from_facet(rows):
+        """Same shape as get_monthly_trend"""
+        if not rows:
+            return pd.DataFrame()
+
+        df = pd.DataFrame(
+            [{"month": r["_id"]["month"], "type": r["_id"]["type"], "amount": r["total"]} for r in rows]
+        )
+        monthly_data = df.pivot_table(
+            index="month", columns="type", values="amount", aggfunc="sum", fill_value=0
+        )
+        return monthly_data.sort_index()
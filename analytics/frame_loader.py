@@ -0,0 +1,160 @@
+"""
+Decode MongoDB query results straight into typed DataFrame columns.
+
+- With pymongoarrow installed (pip install pymongoarrow) the server batches
+  are decoded by its C extension into Arrow columns and handed to pandas
+  as ArrowDtype columns without another copy.
+- Without it, documents are streamed from the cursor in chunks that are
+  transposed into typed column arrays, so no list of dicts is ever held
+  in memory.
+
+Schema format: {field: dtype}, dtype one of
+"float64", "int64", "datetime64[ms]", "string", "objectid", plus the compact ones:
+- "category": pandas Categorical (for low-cardinality strings like type/category)
+- "cents": money as integer cents (int32 when it fits, else int64),
+  the column is named "<field>_cents"
+"""
+from operator import itemgetter
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    from pymongoarrow.api import Schema, find_arrow_all
+    from pymongoarrow.types import ObjectIdType
+except ImportError:  # optional dependency
+    pa = None
+    find_arrow_all = None
+
+
+def _arrow_schema(schema: dict) -> "Schema":
+    arrow_types = {
+        "float64": pa.float64(),
+        "int64": pa.int64(),
+        "datetime64[ms]": pa.timestamp("ms"),
+        "string": pa.string(),
+        "objectid": ObjectIdType(),
+        # converted by _compact() after decoding
+        "category": pa.string(),
+        "cents": pa.float64(),
+    }
+    return Schema({field: arrow_types[dtype] for field, dtype in schema.items()})
+
+
+def _to_cents(amounts: np.ndarray) -> np.ndarray:
+    cents = np.rint(np.nan_to_num(amounts, nan=0.0) * 100)
+    int32 = np.iinfo(np.int32)
+    if cents.size == 0 or (cents.min() >= int32.min and cents.max() <= int32.max):
+        return cents.astype(np.int32)
+    return cents.astype(np.int64)
+
+
+def _column_name(field: str, dtype: str) -> str:
+    return f"{field}_cents" if dtype == "cents" else field
+
+
+def _compact(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """Apply the compact dtypes to a frame decoded by pymongoarrow."""
+    for field, dtype in schema.items():
+        if dtype == "category":
+            df[field] = df[field].astype("category")
+        elif dtype == "cents":
+            amounts = df.pop(field).to_numpy(dtype="float64", na_value=np.nan)
+            df[_column_name(field, dtype)] = _to_cents(amounts)
+    return df
+
+
+def _concat(chunks: list):
+    if isinstance(chunks[0], pd.Categorical):
+        return union_categoricals(chunks)
+    return np.concatenate(chunks)
+
+
+def _to_column(values: tuple, dtype: str):
+    """Convert one chunk of raw values to a typed array (None -> NaN/NaT)."""
+    if dtype == "category":
+        return pd.Categorical(values)
+    if dtype == "cents":
+        return _to_cents(np.array(values, dtype="float64"))
+    if dtype == "float64":
+        return np.array(values, dtype="float64")
+    if dtype == "int64":
+        return np.fromiter((v or 0 for v in values), dtype="int64", count=len(values))
+    if dtype == "datetime64[ms]":
+        # pandas' C datetime parser, np.array(..., "datetime64[ms]") is ~10x slower
+        return pd.DatetimeIndex(values).as_unit("ms").to_numpy()
+    return np.array(values, dtype=object)
+
+
+def frame_from_cursor(cursor, schema: dict, chunk_size: int = 10_000) -> pd.DataFrame:
+    """
+    Fallback decoder: read the cursor in chunks of `chunk_size` rows,
+    transpose each chunk into typed column arrays and drop the documents.
+    """
+    fields = list(schema)
+    chunks = {field: [] for field in fields}
+    rows = []
+    get_row = itemgetter(*fields) if len(fields) > 1 else (lambda doc: (doc[fields[0]],))
+
+    def flush():
+        for field, values in zip(fields, zip(*rows)):
+            chunks[field].append(_to_column(values, schema[field]))
+        rows.clear()
+
+    for doc in cursor:
+        try:
+            rows.append(get_row(doc))
+        except KeyError:  # field missing in this document
+            rows.append(tuple(map(doc.get, fields)))
+        if len(rows) == chunk_size:
+            flush()
+    if rows:
+        flush()
+
+    columns = {
+        _column_name(field, schema[field]): (
+            _concat(chunks[field]) if chunks[field] else _to_column((), schema[field])
+        )
+        for field in fields
+    }
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_frame(
+    collection,
+    query: dict,
+    schema: dict,
+    sort: Optional[list] = None,
+    batch_size: int = 10_000,
+) -> pd.DataFrame:
+    """
+    Run `query` and return only the schema columns as a typed DataFrame.
+
+    Args:
+        collection: pymongo Collection
+        query: MongoDB filter
+        schema: {field: dtype}, fields not listed are not fetched
+        sort: Optional pymongo sort spec
+        batch_size: Documents per server batch
+    """
+    if find_arrow_all is not None:
+        table = find_arrow_all(
+            collection,
+            query,
+            schema=_arrow_schema(schema),
+            sort=sort,
+            batch_size=batch_size,
+        )
+        return _compact(table.to_pandas(types_mapper=pd.ArrowDtype), schema)
+
+    projection = {field: 1 for field in schema}
+    if "_id" not in projection:
+        projection["_id"] = 0
+
+    cursor = collection.find(query, projection, batch_size=batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    return frame_from_cursor(cursor, schema)
@@ -1,5 +1,4 @@
 import streamlit as st
-import config
 
 # import model
 from database import (
@@ -8,6 +7,7 @@ from database import (
     UserModel,
     BudgetModel,
 )
+from database.job_model import job_runner
 
 # import analytics
 from analytics.analyzer import FinanceAnalyzer
@@ -29,23 +29,34 @@ st.set_page_config(
     layout="wide"
 )
 
-# initialize models
+# initialize shared models (not bound to any user, safe to share across sessions)
 @st.cache_resource
-def init_models():
+def init_shared_models():
     """Initialize and cached models"""
+    # background jobs (category deletes, account purges) of this process;
+    # also resumes jobs left unfinished by a crashed process
+    job_runner.start()
     return {
-        "category": CategoryModel(),
-        "transaction": TransactionModel(),
         "user": UserModel(),
         "visualizer": FinanceVisualizer(),
-        "budget": BudgetModel(),
     }
 
-# initialize session per user
-if "models" not in st.session_state:
-    st.session_state["models"] = init_models()
 
-models = st.session_state["models"]
+def init_user_models(mongo_user_id: str) -> dict:
+    """
+    Create the user-bound models of one session.
+    They only hold the user id, the MongoClient pool (DatabaseManager) stays shared.
+    """
+    transaction_model = TransactionModel(mongo_user_id)
+    return {
+        "category": CategoryModel(mongo_user_id),
+        "transaction": transaction_model,
+        "budget": BudgetModel(mongo_user_id),
+        "analyzer": FinanceAnalyzer(transaction_model),
+    }
+
+
+shared_models = init_shared_models()
 
 # =============================================
 # 1. Authen User
@@ -59,23 +70,31 @@ user = getattr(st, "user", None)
 is_logged_in = bool(getattr(user, "is_logged_in", False))
 
 if (user is None) or (not is_logged_in):
+    # forget the previous bootstrap so the next login is checked again
+    st.session_state.pop("bootstrap_email", None)
     login_screen()
     st.stop()
 
 # Logged-in flow
-user_model: UserModel = models["user"]
-try:
-    mongo_user_id = user_model.login(user.email)
-except Exception as e:
-    st.error(f"Error during user login: {e}")
-    st.stop()
+user_model: UserModel = shared_models["user"]
 
 # =============================================
-# 2. Set user context for models
+# 2. Bootstrap once per session (login + default categories)
+#    steady-state reruns do no user lookup and no write
 # =============================================
-models["category"].set_user_id(mongo_user_id)
-models["transaction"].set_user_id(mongo_user_id)
-models["budget"].set_user_id(mongo_user_id)
+if st.session_state.get("bootstrap_email") != user.email:
+    try:
+        mongo_user_id = user_model.bootstrap(user.email)
+    except Exception as e:
+        st.error(f"Error during user login: {e}")
+        st.stop()
+
+    st.session_state["mongo_user_id"] = mongo_user_id
+    st.session_state["models"] = init_user_models(mongo_user_id)
+    st.session_state["bootstrap_email"] = user.email
+
+mongo_user_id = st.session_state["mongo_user_id"]
+models = st.session_state["models"]
 
 # =============================================
 # 3. User profile
@@ -84,9 +103,6 @@ user_dict = user.to_dict()  # convert google user to dict
 user_dict.update({"id": mongo_user_id})
 render_user_profile(user_model, user_dict)
 
-# init analyzer (transaction_model already has user_id)
-analyzer_model = FinanceAnalyzer(models["transaction"])
-
 # =============================================
 # 4. Navigation
 # =============================================
@@ -98,9 +114,9 @@ page = st.sidebar.radio("Navigation", ["Home", "Category", "Transaction", "Budge
 if page == "Home":
     st.title("Home")
     render_dashboard(
-        analyzer_model=analyzer_model,
+        analyzer_model=models["analyzer"],
         transaction_model=models["transaction"],
-        visualizer_model=models["visualizer"],
+        visualizer_model=shared_models["visualizer"],
     )
 
 elif page == "Category":
@@ -9,14 +9,80 @@ APP_NAME = "FINANCE-TRACKER"
 MONGO_URI = os.getenv("MONGO_URI")  # không default localhost
 DATABASE_NAME = os.getenv("DATABASE_NAME", "finance_tracker")
 
+# MongoClient options per workload (database/database_manager.py).
+# Any key can be overridden in Streamlit secrets:
+#     [mongo.oltp]
+#     maxPoolSize = 100
+# "oltp": request-path reads/writes, "analytics": dashboard aggregates and
+# frame loads, on their own pool so they cannot hold every OLTP connection.
+# timeoutMS is the per-operation budget, sent to the server as maxTimeMS.
+MONGO_CLIENT_OPTIONS = {
+    "oltp": {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "maxIdleTimeMS": 60_000,
+        "compressors": "zstd,snappy,zlib",  # unavailable ones are skipped
+        "socketTimeoutMS": 20_000,
+        "serverSelectionTimeoutMS": 10_000,
+        "timeoutMS": 10_000,
+        "readPreference": "primary",
+    },
+    "analytics": {
+        "maxPoolSize": 10,
+        "minPoolSize": 0,
+        "maxIdleTimeMS": 60_000,
+        "compressors": "zstd,snappy,zlib",
+        "socketTimeoutMS": 120_000,
+        "serverSelectionTimeoutMS": 10_000,
+        "timeoutMS": 60_000,
+        # "secondaryPreferred" offloads the primary, but a dashboard may then
+        # miss a write made just before (cached until the next write)
+        "readPreference": "primary",
+    },
+}
+
 # collections
 COLLECTIONS = {
     "user": "users",
     "transaction": "transactions",
     "category": "categories",
-    "budget": "budgets"
+    "budget": "budgets",
+    "rollup": "daily_rollups",
+    "summary": "user_summaries",
+    "job": "jobs",
 }
 
+# query result cache (database/query_cache.py)
+QUERY_CACHE_MAX_ENTRIES = 512
+QUERY_CACHE_TTL_SECONDS = 300
+QUERY_CACHE_MAX_MB = 128
+
+# transaction list page size (keyset pagination)
+TRANSACTIONS_PAGE_SIZE = 20
+
+# documents per insert_many in TransactionModel.add_transactions_bulk
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# background mutation jobs (database/job_model.py)
+JOB_CHUNK_SIZE = 1000           # documents deleted/updated per write
+JOB_THROTTLE_SECONDS = 0.05     # pause between chunks, leaves room for user traffic
+JOB_LEASE_SECONDS = 60          # a job not checkpointed for this long is resumed by another worker
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_SECONDS = 1            # UI progress refresh
+JOB_IDLE_POLL_SECONDS = 30      # idle runner checks for abandoned jobs
+JOB_RETENTION_DAYS = 7          # finished jobs are removed by a TTL index
+
+# deadline of full-collection maintenance (rollup/summary rebuilds, reconcile,
+# migration scripts): they run on the OLTP client, whose timeoutMS would stop them midway
+MAINTENANCE_TIMEOUT_SECONDS = 6 * 3600
+
+# the download button holds the whole export file in memory (~100 bytes per CSV row):
+# bigger exports must be narrowed with filters
+EXPORT_DOWNLOAD_MAX_ROWS = 500_000
+
+# documents per cursor batch of streaming reads (iter_transactions, export), ~1 MB per batch
+TRANSACTION_BATCH_SIZE = 5000
+
 # transaction types
 TRANSACTION_TYPES = ['Expense', "Income"]
 
@@ -32,3 +98,6 @@ DEFAULT_CATEGORIES_INCOME = [
     "Others"
 ]
 
+# bump when the default category lists change, users get re-seeded on next login
+DEFAULT_CATEGORIES_VERSION = 1
+
@@ -3,10 +3,16 @@ from .category_models import CategoryModel
 from .transaction_model import TransactionModel
 from .user_model import UserModel
 from .budget_model import BudgetModel 
+from .rollup_model import RollupModel
+from .summary_model import SummaryModel
+from .job_model import JobModel
 
 __all__ = [
     "CategoryModel",
     "TransactionModel",
     "UserModel",
     "BudgetModel",
+    "RollupModel",
+    "SummaryModel",
+    "JobModel",
 ]
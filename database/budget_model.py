@@ -1,11 +1,16 @@
-from datetime import datetime, date
+from datetime import datetime
 from typing import Optional
 
 from bson.objectid import ObjectId
 
 from .database_manager import DatabaseManager
+from .category_models import CategoryModel
+from .query_cache import query_cache
 import config
 
+# budgets limit spending: they reference Expense categories
+BUDGET_CATEGORY_TYPE = "Expense"
+
 
 class BudgetModel:
     def __init__(self, user_id: Optional[str] = None):
@@ -16,20 +21,65 @@ class BudgetModel:
         self.transaction_collection = self.db_manager.get_collection(
             config.COLLECTIONS["transaction"]
         )
-        self.user_id: Optional[ObjectId] = None
-        if user_id:
-            self.set_user_id(user_id)
+        self.rollup_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["rollup"]
+        )
+        # gắn user_id 1 lần khi tạo model (giống CategoryModel / TransactionModel)
+        self._user_id: Optional[ObjectId] = ObjectId(user_id) if user_id else None
+        # budgets store category_id, names come from the category map
+        self.category_model = CategoryModel(self._user_id)
 
     # -----------------------------
     # Helper
     # -----------------------------
-    def set_user_id(self, user_id: Optional[str]):
-        """Gắn user_id cho model (giống CategoryModel / TransactionModel)"""
-        self.user_id = ObjectId(user_id) if user_id else None
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        return self._user_id
 
     def _require_user(self):
         if not self.user_id:
-            raise ValueError("user_id is required. Call set_user_id() first.")
+            raise ValueError("user_id is required. Create the model with a user_id.")
+
+    def _category_id(self, category: str) -> ObjectId:
+        category_id = self.category_model.category_id(BUDGET_CATEGORY_TYPE, category)
+        if category_id is None:
+            raise ValueError(
+                f"Category '{category}' does not exist for type '{BUDGET_CATEGORY_TYPE}'."
+            )
+        return category_id
+
+    def _with_category_names(self, budgets: list[dict]) -> list[dict]:
+        """Add the display name ("category") of each budget's category_id."""
+        categories = self.category_model.get_category_map()
+        for budget in budgets:
+            if "category_id" in budget:
+                category = categories.get(budget["category_id"])
+                budget["category"] = category["name"] if category else None
+        return budgets
+
+    @staticmethod
+    def _month_range(month: int, year: int) -> tuple[datetime, datetime]:
+        """[start, end) của 1 tháng"""
+        start_date = datetime(year, month, 1)
+        if month == 12:
+            end_date = datetime(year + 1, 1, 1)
+        else:
+            end_date = datetime(year, month + 1, 1)
+        return start_date, end_date
+
+    @staticmethod
+    def _build_progress(budget_amount: float, spent: float) -> dict:
+        remaining = max(budget_amount - spent, 0.0)
+        percentage = 0.0
+        if budget_amount > 0:
+            percentage = min(spent / budget_amount * 100, 999.9)
+
+        return {
+            "budget": budget_amount,
+            "spent": spent,
+            "remaining": remaining,
+            "percentage": percentage,
+        }
 
     # -----------------------------
     # CRUD
@@ -53,10 +103,10 @@ class BudgetModel:
 
         now = datetime.now()
 
-        # upsert theo unique key (user, category, month, year)
+        # upsert theo unique key (user, category_id, month, year)
         filter_ = {
             "user_id": self.user_id,
-            "category": category,
+            "category_id": self._category_id(category),
             "month": month,
             "year": year,
         }
@@ -73,6 +123,9 @@ class BudgetModel:
         }
 
         result = self.collection.update_one(filter_, update_doc, upsert=True)
+        if result.upserted_id:
+            # category usage counts (CategoryModel.get_categories_with_usage)
+            query_cache.bump_version(self.user_id)
         # Nếu insert mới -> result.upserted_id có giá trị, còn update thì None
         return str(result.upserted_id) if result.upserted_id else "updated"
 
@@ -91,10 +144,11 @@ class BudgetModel:
         if year:
             query["year"] = year
 
-        cursor = self.collection.find(query).sort(
-            [("year", 1), ("month", 1), ("category", 1)]
+        budgets = self._with_category_names(list(self.collection.find(query)))
+        return sorted(
+            budgets,
+            key=lambda budget: (budget["year"], budget["month"], budget["category"] or ""),
         )
-        return list(cursor)
 
     def update_budget(self, budget_id: str, new_amount: float) -> bool:
         """Update số tiền limit cho budget."""
@@ -123,6 +177,8 @@ class BudgetModel:
         result = self.collection.delete_one(
             {"_id": ObjectId(budget_id), "user_id": self.user_id}
         )
+        if result.deleted_count:
+            query_cache.bump_version(self.user_id)
         return result.deleted_count > 0
 
     # -----------------------------
@@ -148,11 +204,13 @@ class BudgetModel:
 
         self._require_user()
 
+        category_id = self.category_model.category_id(BUDGET_CATEGORY_TYPE, category)
+
         # 1. Lấy budget amount
         budget_doc = self.collection.find_one(
             {
                 "user_id": self.user_id,
-                "category": category,
+                "category_id": category_id,
                 "month": month,
                 "year": year,
             }
@@ -168,18 +226,14 @@ class BudgetModel:
         budget_amount = float(budget_doc.get("amount", 0))
 
         # 2. Tổng chi (Expense) trong tháng đó bằng aggregation
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
+        start_date, end_date = self._month_range(month, year)
 
         pipeline = [
             {
                 "$match": {
                     "user_id": self.user_id,
                     "type": "Expense",
-                    "category": category,
+                    "category_id": category_id,
                     "date": {"$gte": start_date, "$lt": end_date},
                 }
             },
@@ -194,14 +248,59 @@ class BudgetModel:
         agg_result = list(self.transaction_collection.aggregate(pipeline))
         spent = float(agg_result[0]["total_spent"]) if agg_result else 0.0
 
-        remaining = max(budget_amount - spent, 0.0)
-        percentage = 0.0
-        if budget_amount > 0:
-            percentage = min(spent / budget_amount * 100, 999.9)
+        return self._build_progress(budget_amount, spent)
 
-        return {
-            "budget": budget_amount,
-            "spent": spent,
-            "remaining": remaining,
-            "percentage": percentage,
+    def get_budgets_with_progress(self, month: int, year: int) -> list[dict]:
+        """
+        Lấy tất cả budgets của 1 tháng kèm progress, chỉ với 2 queries:
+        1 find trên budgets + 1 aggregation (group theo category) trên daily rollups.
+
+        Return:
+            [
+                {
+                    ...budget document...,
+                    "progress": {"budget", "spent", "remaining", "percentage"}
+                },
+            ]
+        """
+
+        self._require_user()
+
+        budgets = self.get_budgets(month=month, year=year)
+        if not budgets:
+            return []
+
+        start_date, end_date = self._month_range(month, year)
+
+        pipeline = [
+            {
+                "$match": {
+                    "user_id": self.user_id,
+                    "type": "Expense",
+                    "category_id": {"$in": [b.get("category_id") for b in budgets]},
+                    "day": {"$gte": start_date, "$lt": end_date},
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$category_id",
+                    "total_spent": {"$sum": "$sum"},
+                }
+            },
+        ]
+
+        spent_by_category = {
+            row["_id"]: float(row["total_spent"])
+            for row in self.rollup_collection.aggregate(pipeline)
         }
+
+        return [
+            {
+                **budget,
+                "progress": self._build_progress(
+                    float(budget.get("amount", 0)),
+                    spent_by_category.get(budget.get("category_id"), 0.0),
+                ),
+            }
+            for budget in budgets
+        ]
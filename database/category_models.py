@@ -1,8 +1,11 @@
-from database.database_manager import DatabaseManager
+from database.database_manager import DatabaseManager, ANALYTICS
+from database.query_cache import query_cache, category_cache, cached_query
+from database.job_model import JobModel, DELETE_CATEGORY
 import config
 from datetime import datetime
 from typing import Optional
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
 
 collection_name = config.COLLECTIONS['category']
 
@@ -16,35 +19,100 @@ class CategoryModel:
         self.budget_collection = self.db_manager.get_collection(
             config.COLLECTIONS["budget"]
         )
+        # usage aggregations of the category page run on the analytics pool
+        self.analytics_transaction_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["transaction"], workload=ANALYTICS
+        )
+        self.analytics_budget_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["budget"], workload=ANALYTICS
+        )
 
-        self.user_id = user_id
-        # init:
-        self.user_id = user_id
-
-    def set_user_id(self, user_id: str):
-        self.user_id = ObjectId(user_id) if user_id is not None else None
+        # bound once: a model instance never changes user
+        self._user_id = ObjectId(user_id) if user_id is not None else None
 
-        # after we have user_id, initialize their default categories
-        self._initialize_user_default_categories()
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        return self._user_id
 
-    def _initialize_user_default_categories(self):
-        """Initialize user categories if they dont exist"""
+    def initialize_user_default_categories(self):
+        """Initialize user categories if they dont exist (1 bulk_write for all defaults)"""
 
         # Check if there is user_id, exist earlier
         if not self.user_id:
             return
-        
-        # EXPENSE
-        for cate in config.DEFAULT_CATEGORIES_EXPENSE:
-            # # calling by params order
-            # self.upsert_category("Expense", cate)
 
-            # calling by params keywords
-            self.upsert_category(category_type = "Expense", category_name= cate)
+        defaults = [("Expense", cate) for cate in config.DEFAULT_CATEGORIES_EXPENSE]
+        defaults += [("Income", cate) for cate in config.DEFAULT_CATEGORIES_INCOME]
+
+        now = datetime.now()
+        operations = [
+            UpdateOne(
+                {
+                    "type": category_type,
+                    "name": category_name,
+                    "user_id": self.user_id,
+                },
+                {
+                    "$setOnInsert": {
+                        "created_at": now,
+                        "last_modified": now,
+                    }
+                },
+                upsert=True,
+            )
+            for category_type, category_name in defaults
+        ]
+        result = self.collection.bulk_write(operations, ordered=False)
+        if result.upserted_count:
+            self._categories_changed()
+
+    def _categories_changed(self):
+        """Reload the category catalog and every cached result showing category names."""
+        category_cache.bump_version(self.user_id)
+        query_cache.bump_version(self.user_id)
+
+    # -----------------------------
+    # id <-> name (category catalog)
+    # -----------------------------
+    @cached_query(cache=category_cache)
+    def get_category_map(self) -> dict:
+        """
+        {category_id: {"name", "type"}} of the user's categories, newest first.
+
+        The per-user category catalog: transactions, budgets and rollups
+        store category_id only and resolve names from it; validation and
+        the category dropdowns read it too. It is loaded once and only
+        reloaded after a category write (_categories_changed).
+        """
+        if not self.user_id:
+            return {}
+        # a category being deleted in the background is hidden right away
+        cursor = self.collection.find(
+            {"user_id": self.user_id, "deleting": {"$ne": True}}, {"name": 1, "type": 1}
+        ).sort("created_at", -1)
+        return {cate["_id"]: {"name": cate["name"], "type": cate["type"]} for cate in cursor}
+
+    def get_category_names(self, category_type: Optional[str] = None) -> list[str]:
+        """Category names of one type (or of both, deduplicated) from the catalog."""
+        names = (
+            category["name"]
+            for category in self.get_category_map().values()
+            if not category_type or category["type"] == category_type
+        )
+        return list(dict.fromkeys(names))
+
+    def category_ids(self, names, category_type: Optional[str] = None) -> list[ObjectId]:
+        """Ids of the categories called `names` (a name or a list), of one type or both."""
+        names = {names} if isinstance(names, str) else set(names)
+        return sorted(
+            category_id
+            for category_id, category in self.get_category_map().items()
+            if category["name"] in names and (not category_type or category["type"] == category_type)
+        )
 
-        # INCOME
-        for cate in config.DEFAULT_CATEGORIES_INCOME:
-            self.upsert_category(category_type = "Income", category_name = cate)
+    def category_id(self, category_type: str, category_name: str) -> Optional[ObjectId]:
+        ids = self.category_ids(category_name, category_type)
+        return ids[0] if ids else None
 
     def upsert_category(self, category_type: str, category_name: str):
 
@@ -70,6 +138,8 @@ class CategoryModel:
             update_doc,
             upsert=True
         )
+        if result.upserted_id:
+            self._categories_changed()
         return result.upserted_id
     def update_category(
         self,
@@ -91,6 +161,7 @@ class CategoryModel:
             {
                 "_id": cat_id,
                 "user_id": self.user_id,
+                "deleting": {"$ne": True},
             }
         )
         if not current_cat:
@@ -124,12 +195,12 @@ class CategoryModel:
         name_changed = new_name != old_name
         type_changed = new_type != old_type
 
-        # 3. Đếm transactions đang dùng category cũ
-        tx_filter = {
-            "user_id": self.user_id,
-            "category": old_name,
-        }
-        affected = self.transaction_collection.count_documents(tx_filter)
+        # 3. Đếm transactions đang dùng category (theo category_id)
+        affected = 0
+        if type_changed:
+            affected = self.transaction_collection.count_documents(
+                {"user_id": self.user_id, "category_id": cat_id}
+            )
 
         # 4. Nếu đổi type và còn transactions -> BLOCK
         if type_changed and affected > 0:
@@ -167,24 +238,14 @@ class CategoryModel:
                 "message": "No changes to update.",
             }
 
-        # 6. Nếu có đổi tên -> update toàn bộ transactions liên quan
-        updated_tx = 0
-        if name_changed and affected > 0:
-            tx_result = self.transaction_collection.update_many(
-                tx_filter,
-                {
-                    "$set": {
-                        "category": new_name,
-                        "last_modified": now,
-                    }
-                },
-            )
-            updated_tx = tx_result.modified_count
+        # 6. Transactions/budgets/rollups chỉ lưu category_id:
+        # đổi tên = 1 document, tên mới được resolve lúc đọc
+        self._categories_changed()
 
         return {
             "updated": True,
-            "affected": updated_tx,
-            "message": f"Updated category and {updated_tx} related transactions",
+            "affected": 0,
+            "message": "Category updated.",
         }
 
     def count_transactions_for_category(self, category_name: str) -> int:
@@ -194,7 +255,7 @@ class CategoryModel:
 
         filter_ = {
             "user_id": self.user_id,
-            "category": category_name,
+            "category_id": {"$in": self.category_ids(category_name)},
         }
         return self.transaction_collection.count_documents(filter_)
     def count_budgets_for_category(self, category_name: str) -> int:
@@ -203,7 +264,7 @@ class CategoryModel:
 
         filter_ = {
             "user_id": self.user_id,
-            "category": category_name,
+            "category_id": {"$in": self.category_ids(category_name)},
         }
         return self.budget_collection.count_documents(filter_)
 
@@ -222,23 +283,32 @@ class CategoryModel:
                 "message": "user_id is not set for CategoryModel",
             }
 
-        # 1. Đếm số transaction bị ảnh hưởng
+        cat_id = self.category_id(category_type, category_name)
+        if cat_id is None:
+            return {
+                "deleted": False,
+                "affected_transactions": 0,
+                "affected_budgets": 0,
+                "strategy": strategy,
+                "message": "Category not found or already deleted.",
+            }
+
         tx_filter = {
             "user_id": self.user_id,
-            "category": category_name,
+            "category_id": cat_id,
         }
-        affected_transactions = self.transaction_collection.count_documents(tx_filter)
-
-        # 2. Đếm số budgets bị ảnh hưởng (Topic 5)
         budget_filter = {
             "user_id": self.user_id,
-            "category": category_name,
+            "category_id": cat_id,
         }
-        affected_budgets = self.budget_collection.count_documents(budget_filter)
 
-        # 3. Xử lý theo strategy
         if strategy == "block":
-            if affected_transactions > 0 or affected_budgets > 0:
+            # chỉ đếm khi category còn được dùng (message)
+            in_use = self.transaction_collection.find_one(tx_filter, {"_id": 1}) \
+                or self.budget_collection.find_one(budget_filter, {"_id": 1})
+            if in_use:
+                affected_transactions = self.transaction_collection.count_documents(tx_filter)
+                affected_budgets = self.budget_collection.count_documents(budget_filter)
                 return {
                     "deleted": False,
                     "affected_transactions": affected_transactions,
@@ -251,51 +321,64 @@ class CategoryModel:
                     ),
                 }
 
-        elif strategy == "reassign":
-            now = datetime.now()
-            # Reassign transactions sang 'Others'
-            if affected_transactions > 0:
-                self.transaction_collection.update_many(
-                    tx_filter,
-                    {
-                        "$set": {
-                            "category": "Others",
-                            "last_modified": now,
-                        }
-                    },
-                )
-            # Budgets: xoá (tránh bị mồ côi)
-            if affected_budgets > 0:
-                self.budget_collection.delete_many(budget_filter)
-
-        elif strategy == "cascade":
-            # Xoá luôn transactions + budgets
-            if affected_transactions > 0:
-                self.transaction_collection.delete_many(tx_filter)
-            if affected_budgets > 0:
-                self.budget_collection.delete_many(budget_filter)
-
-        # 4. Cuối cùng xoá category
-        result = self.collection.delete_one(
-            {
-                "type": category_type,
-                "name": category_name,
-                "user_id": self.user_id,
+            result = self.collection.delete_one({"_id": cat_id, "user_id": self.user_id})
+            deleted = result.deleted_count > 0
+            if deleted:
+                self._categories_changed()
+            return {
+                "deleted": deleted,
+                "affected_transactions": 0,
+                "affected_budgets": 0,
+                "strategy": strategy,
+                "message": "Category deleted successfully."
+                if deleted
+                else "Category not found or already deleted.",
             }
-        )
 
-        deleted = result.deleted_count > 0
+        if strategy not in ("reassign", "cascade"):
+            raise ValueError(f"Unknown delete strategy '{strategy}'")
+
+        # reassign: transactions -> 'Others' (cùng type); cascade: xoá luôn.
+        # Budgets luôn bị xoá. Chạy nền theo từng chunk (database/job_model.py),
+        # category bị ẩn ngay (deleting) và bị xoá khi job xong.
+        params = {"category_id": cat_id, "strategy": strategy}
+        if strategy == "reassign":
+            params["others_id"] = self._get_or_create(category_type, "Others")
+            if params["others_id"] == cat_id:
+                return {
+                    "deleted": False,
+                    "affected_transactions": 0,
+                    "affected_budgets": 0,
+                    "strategy": strategy,
+                    "message": "'Others' cannot be reassigned to itself: use block or cascade.",
+                }
+        self.collection.update_one(
+            {"_id": cat_id, "user_id": self.user_id},
+            {"$set": {"deleting": True, "last_modified": datetime.now()}},
+        )
+        self._categories_changed()
+        job_id = JobModel(self.user_id).start(DELETE_CATEGORY, params)
 
         return {
-            "deleted": deleted,
-            "affected_transactions": affected_transactions,
-            "affected_budgets": affected_budgets,
+            "deleted": False,
+            "job_id": job_id,
+            "affected_transactions": None,
+            "affected_budgets": None,
             "strategy": strategy,
-            "message": "Category deleted successfully."
-            if deleted
-            else "Category not found or already deleted.",
+            "message": "Deletion started, it continues in the background.",
         }
 
+    def _get_or_create(self, category_type: str, category_name: str) -> ObjectId:
+        """Id of a category, created if missing."""
+        category_id = self.category_id(category_type, category_name)
+        if category_id is None:
+            self.upsert_category(category_type, category_name)
+            category_id = self.collection.find_one(
+                {"user_id": self.user_id, "type": category_type, "name": category_name},
+                {"_id": 1},
+            )["_id"]
+        return category_id
+
     def get_categories_by_type(self, category_type: str):
         """
         Lấy danh sách category theo type ('Expense' / 'Income') cho đúng user.
@@ -303,11 +386,60 @@ class CategoryModel:
         query = {
             "type": category_type,
             "user_id": self.user_id,
+            "deleting": {"$ne": True},
         }
         cursor = self.collection.find(query).sort("created_at", -1)
         return list(cursor)
 
     
+    @cached_query()
+    def get_categories_with_usage(self, category_type: str) -> list[dict]:
+        """
+        Categories of a type with their usage, for the category page:
+        one $group over transactions (covered by the user_id, type,
+        category_id, date, _id, amount index) and one over budgets,
+        merged in memory.
+
+        Returns:
+            get_categories_by_type() documents plus "transaction_count",
+            "budget_count", "total_amount" and "last_used" (None if unused)
+        """
+        if not self.user_id:
+            return []
+
+        categories = self.get_categories_by_type(category_type)
+        category_ids = [category["_id"] for category in categories]
+
+        transactions = {
+            row["_id"]: row
+            for row in self.analytics_transaction_collection.aggregate([
+                {"$match": {"user_id": self.user_id, "type": category_type}},
+                {
+                    "$group": {
+                        "_id": "$category_id",
+                        "count": {"$sum": 1},
+                        "total": {"$sum": "$amount"},
+                        "last_used": {"$max": "$date"},
+                    }
+                },
+            ])
+        }
+        budgets = {
+            row["_id"]: row["count"]
+            for row in self.analytics_budget_collection.aggregate([
+                {"$match": {"user_id": self.user_id, "category_id": {"$in": category_ids}}},
+                {"$group": {"_id": "$category_id", "count": {"$sum": 1}}},
+            ])
+        }
+
+        for category in categories:
+            usage = transactions.get(category["_id"], {})
+            category["transaction_count"] = usage.get("count", 0)
+            category["total_amount"] = usage.get("total", 0)
+            category["last_used"] = usage.get("last_used")
+            category["budget_count"] = budgets.get(category["_id"], 0)
+        return categories
+
     def get_total(self):
         result = self.collection.find({"user_id": self.user_id})
         result = list(result)
@@ -1,15 +1,85 @@
-from pymongo import MongoClient, DESCENDING
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+import pymongo
+from pymongo import MongoClient, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
 import streamlit as st
+import threading
 import config
 
+# client workloads (config.MONGO_CLIENT_OPTIONS)
+OLTP = "oltp"
+ANALYTICS = "analytics"
+
+# wire compressor -> module it needs (zlib is in the standard library)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+# Transaction indexes follow the ESR rule (Equality, Sort, Range):
+# equality filters first, then the list order (date, _id), then amount so
+# amount ranges are checked on index keys. Every list/filter shape then
+# reads in index order without an in-memory SORT (see scripts/index_advisor.py).
+INDEXES = {
+    "transaction": [
+        # all transactions, date ranges, and the seek key of the paginated list
+        ([("user_id", DESCENDING), ("date", DESCENDING), ("_id", DESCENDING), ("amount", DESCENDING)], {}),
+        ([("user_id", DESCENDING), ("type", DESCENDING), ("date", DESCENDING), ("_id", DESCENDING),
+          ("amount", DESCENDING)], {}),
+        ([("user_id", DESCENDING), ("type", DESCENDING), ("category_id", DESCENDING), ("date", DESCENDING),
+          ("_id", DESCENDING), ("amount", DESCENDING)], {}),
+        ([("user_id", DESCENDING), ("category_id", DESCENDING), ("date", DESCENDING), ("_id", DESCENDING),
+          ("amount", DESCENDING)], {}),
+        # description search (database/text_search.py): terms are edge n-grams, no stemming
+        ([("user_id", DESCENDING), ("search_tokens", TEXT)],
+         {"name": "transaction_search", "default_language": "none"}),
+        # statement imports: a row already imported is rejected by the server
+        ([("user_id", DESCENDING), ("import_hash", DESCENDING)],
+         {"unique": True, "partialFilterExpression": {"import_hash": {"$exists": True}}}),
+    ],
+    "category": [
+        ([("user_id", DESCENDING), ("type", DESCENDING), ("name", DESCENDING)], {"unique": True}),
+    ],
+    "budget": [
+        ([("user_id", DESCENDING), ("category_id", DESCENDING), ("year", DESCENDING), ("month", DESCENDING)],
+         {"unique": True}),
+    ],
+    "job": [
+        # runner claim: runnable jobs whose lease ran out
+        ([("status", DESCENDING), ("lease_until", DESCENDING)], {}),
+        ([("user_id", DESCENDING), ("status", DESCENDING), ("created_at", DESCENDING)], {}),
+        ([("finished_at", DESCENDING)], {"expireAfterSeconds": config.JOB_RETENTION_DAYS * 24 * 3600}),
+    ],
+    # also the "on" key of the rollup rebuild $merge
+    "rollup": [
+        ([("user_id", DESCENDING), ("day", DESCENDING), ("type", DESCENDING), ("category_id", DESCENDING)],
+         {"unique": True}),
+    ],
+}
+
+
+@contextmanager
+def maintenance_timeout():
+    """
+    Deadline for full-collection maintenance: config.MAINTENANCE_TIMEOUT_SECONDS
+    instead of the client's timeoutMS (pymongo.timeout(None) falls back to it).
+    Also usable as a decorator.
+    """
+    with pymongo.timeout(config.MAINTENANCE_TIMEOUT_SECONDS):
+        yield
+
 
 class DatabaseManager:
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
+        # one MongoClient (connection pool) shared by every session/thread
         if cls._instance is None:
-            cls._instance = super(DatabaseManager, cls).__new__(cls)
-            cls._instance._initialize()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(DatabaseManager, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _get_mongo_uri(self) -> str:
@@ -28,6 +98,25 @@ class DatabaseManager:
         # 2) fallback local config
         return getattr(config, "DATABASE_NAME", None)
 
+    def _get_client_options(self, workload: str) -> dict:
+        """config.MONGO_CLIENT_OPTIONS[workload], overridden by secrets [mongo.<workload>]."""
+        options = dict(config.MONGO_CLIENT_OPTIONS[workload])
+        if "mongo" in st.secrets:
+            options.update(st.secrets["mongo"].get(workload, {}))
+
+        # pymongo warns about compressors whose module is missing: skip them
+        compressors = options.get("compressors")
+        if isinstance(compressors, str):
+            compressors = compressors.split(",")
+        if compressors:
+            options["compressors"] = ",".join(
+                name for name in compressors
+                if name in _COMPRESSOR_MODULES and find_spec(_COMPRESSOR_MODULES[name])
+            )
+            if not options["compressors"]:
+                del options["compressors"]
+        return options
+
     def _initialize(self):
         mongo_uri = self._get_mongo_uri()
         db_name = self._get_db_name()
@@ -37,9 +126,12 @@ class DatabaseManager:
         if not db_name:
             raise ValueError("DATABASE_NAME is missing. Set it in Streamlit Secrets or config.py")
 
-        # timeout để khỏi treo lâu trên Cloud
-        self.client = MongoClient(mongo_uri, serverSelectionTimeoutMS=10000)
+        # two pools: a slow dashboard aggregate cannot take the connections
+        # (or the time budget) of transaction reads/writes
+        self.client = MongoClient(mongo_uri, **self._get_client_options(OLTP))
         self.db = self.client[db_name]
+        self.analytics_client = MongoClient(mongo_uri, **self._get_client_options(ANALYTICS))
+        self.analytics_db = self.analytics_client[db_name]
 
         try:
             self.db.command("ping")
@@ -50,20 +142,27 @@ class DatabaseManager:
             raise
 
     def _create_index(self):
-        self.db.transactions.create_index([("user_id", DESCENDING), ("date", DESCENDING)])
-        self.db.categories.create_index(
-            [("user_id", DESCENDING), ("type", DESCENDING), ("name", DESCENDING)],
-            unique=True,
-        )
-        self.db.budgets.create_index(
-            [("user_id", DESCENDING), ("category", DESCENDING), ("year", DESCENDING), ("month", DESCENDING)],
-            unique=True,
-        )
-
-    def get_collection(self, collection_name: str):
-        return self.db[collection_name]
+        self.create_indexes(self.db)
+
+    @staticmethod
+    def create_indexes(db):
+        """Create the default index set (INDEXES) on `db`."""
+        for collection_key, indexes in INDEXES.items():
+            collection = db[config.COLLECTIONS[collection_key]]
+            for keys, options in indexes:
+                try:
+                    collection.create_index(keys, **options)
+                except OperationFailure as e:
+                    # e.g. unique index over data that is not migrated yet
+                    print(f"Error creating index {keys} on {collection.name}: {e}")
+
+    def get_collection(self, collection_name: str, workload: str = OLTP):
+        """Collection on the OLTP client, or on the analytics client (read-only use)."""
+        db = self.analytics_db if workload == ANALYTICS else self.db
+        return db[collection_name]
 
     def close_connection(self):
-        if self.client:
-            self.client.close()
-            print("Shutdown database connection")
+        for client in (self.client, self.analytics_client):
+            if client:
+                client.close()
+        print("Shutdown database connection")
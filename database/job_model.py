@@ -0,0 +1,356 @@
+"""
+Background mutation jobs: cascade/reassign category deletes and account purges.
+
+A job is a list of steps (a delete or an update over one collection)
+followed by a finalize action. Steps run in chunks of config.JOB_CHUNK_SIZE
+documents:
+
+    ids = find(filter, {"_id": 1}).limit(chunk)      # served by the filter's index
+    delete_many / update_many({**filter, "_id": {"$in": ids}})
+
+A processed document no longer matches its step filter, so the filter
+itself is the checkpoint: a job that dies resumes with the documents that
+are left (a chunk that the write leaves matching fails the job instead).
+Progress lives in the job document, so the UI only polls it.
+
+A category delete hides the category (deleting: true) as soon as it is
+queued, so no new transaction or budget can use it, and moves every chunk
+of transactions out of the rollups and the summary as it goes. A failed
+delete shows the category again with what is left of it.
+
+Each process runs one JobRunner thread. It claims a job by taking its
+lease and renews the lease after every chunk. A job whose lease expired
+(crashed worker) is claimed again; after config.JOB_MAX_ATTEMPTS claims it is failed.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+
+from .database_manager import DatabaseManager
+from .rollup_model import RollupModel
+from .summary_model import SummaryModel
+from .query_cache import query_cache, category_cache
+import config
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE = [PENDING, RUNNING]
+
+DELETE_CATEGORY = "delete_category"
+PURGE_USER = "purge_user"
+
+# read with each chunk of a category delete, to adjust rollups and the summary
+ROLLUP_PROJECTION = {"_id": 1, "user_id": 1, "type": 1, "category_id": 1, "amount": 1, "date": 1}
+
+
+class JobModel:
+    """
+    One document per job:
+
+        {"user_id", "kind", "params", "status", "steps": [{"name", "processed", "done"}],
+         "attempts", "lease_until", "error", "created_at", "updated_at", "finished_at"}
+    """
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.db_manager = DatabaseManager()
+        self.collection = self.db_manager.get_collection(config.COLLECTIONS["job"])
+        self.collections = {
+            key: self.db_manager.get_collection(config.COLLECTIONS[key])
+            for key in ("user", "transaction", "category", "budget", "rollup")
+        }
+        self.rollup_model = RollupModel()
+        self.summary_model = SummaryModel()
+        self._user_id: Optional[ObjectId] = ObjectId(user_id) if user_id else None
+
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        return self._user_id
+
+    def _require_user(self):
+        if not self.user_id:
+            raise ValueError("user_id is required. Create the model with a user_id.")
+
+    # -----------------------------
+    # Submit / read
+    # -----------------------------
+    def start(self, kind: str, params: Optional[dict] = None) -> str:
+        """Queue a job for the current user (an identical active job is reused)."""
+        self._require_user()
+        params = params or {}
+
+        existing = self.collection.find_one(
+            {"user_id": self.user_id, "kind": kind, "params": params, "status": {"$in": ACTIVE}},
+            {"_id": 1},
+        )
+        if existing:
+            return str(existing["_id"])
+
+        now = datetime.now()
+        job = {
+            "user_id": self.user_id,
+            "kind": kind,
+            "params": params,
+            "status": PENDING,
+            "attempts": 0,
+            # claimable right away
+            "lease_until": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        job["steps"] = [
+            {"name": name, "processed": 0, "done": False}
+            for name, *_ in self._steps(job)
+        ]
+        result = self.collection.insert_one(job)
+        job_runner.wake()
+        return str(result.inserted_id)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        self._require_user()
+        return self.collection.find_one({"_id": ObjectId(job_id), "user_id": self.user_id})
+
+    def get_active_jobs(self, kind: Optional[str] = None) -> list[dict]:
+        self._require_user()
+        query = {"user_id": self.user_id, "status": {"$in": ACTIVE}}
+        if kind:
+            query["kind"] = kind
+        return list(self.collection.find(query).sort("created_at", 1))
+
+    # -----------------------------
+    # Steps
+    # -----------------------------
+    def _steps(self, job: dict) -> list[tuple]:
+        """(name, collection, filter, $set or None for a delete) of every step."""
+        user_id = job["user_id"]
+        params = job["params"]
+
+        if job["kind"] == DELETE_CATEGORY:
+            match = {"user_id": user_id, "category_id": params["category_id"]}
+            reassign = None
+            if params["strategy"] == "reassign":
+                reassign = {"category_id": params["others_id"]}
+            return [
+                ("transactions", self.collections["transaction"], match, reassign),
+                # budgets: xoá (tránh bị mồ côi)
+                ("budgets", self.collections["budget"], match, None),
+            ]
+
+        if job["kind"] == PURGE_USER:
+            # giữ lại system default categories (như trước)
+            default_names = config.DEFAULT_CATEGORIES_EXPENSE + config.DEFAULT_CATEGORIES_INCOME
+            return [
+                ("transactions", self.collections["transaction"], {"user_id": user_id}, None),
+                ("budgets", self.collections["budget"], {"user_id": user_id}, None),
+                (
+                    "categories",
+                    self.collections["category"],
+                    {"user_id": user_id, "name": {"$nin": default_names}},
+                    None,
+                ),
+                ("rollups", self.collections["rollup"], {"user_id": user_id}, None),
+            ]
+
+        raise ValueError(f"Unknown job kind '{job['kind']}'")
+
+    def _chunk_done(self, job: dict, transactions: list[dict]):
+        """Move a processed chunk of a category delete out of its rollups (and summary)."""
+        params = job["params"]
+        self.rollup_model.remove_transactions(transactions)
+        if params["strategy"] == "reassign":
+            self.rollup_model.apply_transactions(
+                [{**transaction, "category_id": params["others_id"]} for transaction in transactions]
+            )
+        else:
+            self.summary_model.remove_transactions(transactions)
+
+    def _finalize(self, job: dict):
+        user_id = job["user_id"]
+        params = job["params"]
+
+        if job["kind"] == DELETE_CATEGORY:
+            # rollups/summary already follow every chunk: this only catches
+            # a chunk whose adjustment was lost when a worker crashed
+            if params["strategy"] == "reassign":
+                self.rollup_model.reassign_category(user_id, params["category_id"], params["others_id"])
+            else:
+                self.rollup_model.delete_category(user_id, params["category_id"])
+                self.summary_model.rebuild(user_id)
+            self.collections["category"].delete_one({"_id": params["category_id"], "user_id": user_id})
+
+        elif job["kind"] == PURGE_USER:
+            self.summary_model.delete_user(user_id)
+            self.collections["user"].delete_one({"_id": user_id})
+
+        category_cache.bump_version(user_id)
+        query_cache.bump_version(user_id)
+
+    # -----------------------------
+    # Execution
+    # -----------------------------
+    def claim_next(self) -> Optional[dict]:
+        """Take the lease of the oldest runnable job (pending, or crashed)."""
+        now = datetime.now()
+        return self.collection.find_one_and_update(
+            {"status": {"$in": ACTIVE}, "lease_until": {"$lte": now}},
+            self._claim_update(now),
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    def _claim_update(now: datetime) -> dict:
+        return {
+            "$set": {
+                "status": RUNNING,
+                "lease_until": now + timedelta(seconds=config.JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        }
+
+    def run_now(self, job_id: str) -> Optional[dict]:
+        """Run a job in the calling thread (or wait for the worker running it)."""
+        self._require_user()
+        now = datetime.now()
+        job = self.collection.find_one_and_update(
+            {"_id": ObjectId(job_id), "user_id": self.user_id,
+             "status": {"$in": ACTIVE}, "lease_until": {"$lte": now}},
+            self._claim_update(now),
+            return_document=ReturnDocument.AFTER,
+        )
+        if job:
+            self.process(job)
+
+        while True:
+            job = self.get_job(job_id)
+            if not job or job["status"] not in ACTIVE:
+                return job
+            time.sleep(config.JOB_POLL_SECONDS)
+
+    def process(self, job: dict):
+        """Run a claimed job; failures are retried when the lease expires."""
+        try:
+            self._run(job)
+        except Exception as e:
+            print(f"Error running job {job['_id']}: {e}")
+            now = datetime.now()
+            failed = job["attempts"] >= config.JOB_MAX_ATTEMPTS
+            self.collection.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        "status": FAILED if failed else RUNNING,
+                        "error": str(e),
+                        "updated_at": now,
+                        # retry once the lease runs out
+                        "lease_until": now + timedelta(seconds=config.JOB_LEASE_SECONDS),
+                        **({"finished_at": now} if failed else {}),
+                    }
+                },
+            )
+            if failed:
+                self._abandon(job)
+
+    def _abandon(self, job: dict):
+        """Undo what hides data of a failed job: its category shows again, so it can be deleted again."""
+        if job["kind"] == DELETE_CATEGORY:
+            self.collections["category"].update_one(
+                {"_id": job["params"]["category_id"], "user_id": job["user_id"]},
+                {"$unset": {"deleting": ""}},
+            )
+            category_cache.bump_version(job["user_id"])
+            query_cache.bump_version(job["user_id"])
+
+    def _run(self, job: dict):
+        for index, (name, collection, match, update) in enumerate(self._steps(job)):
+            if job["steps"][index]["done"]:
+                continue
+
+            adjusts_rollups = job["kind"] == DELETE_CATEGORY and name == "transactions"
+            projection = ROLLUP_PROJECTION if adjusts_rollups else {"_id": 1}
+            while True:
+                docs = list(collection.find(match, projection).limit(config.JOB_CHUNK_SIZE))
+                if not docs:
+                    break
+
+                ids = [doc["_id"] for doc in docs]
+                chunk = {**match, "_id": {"$in": ids}}
+                if update is None:
+                    processed = collection.delete_many(chunk).deleted_count
+                else:
+                    processed = collection.update_many(
+                        chunk, {"$set": {**update, "last_modified": datetime.now()}}
+                    ).modified_count
+                if collection.count_documents(chunk) == len(ids):
+                    # no document left the step filter: the next pass would find the same chunk
+                    raise RuntimeError(f"Step '{name}' made no progress on {len(ids)} documents")
+                if adjusts_rollups:
+                    self._chunk_done(job, docs)
+
+                self._checkpoint(job["_id"], {"$inc": {f"steps.{index}.processed": processed}})
+                query_cache.bump_version(job["user_id"])
+                time.sleep(config.JOB_THROTTLE_SECONDS)
+
+            self._checkpoint(job["_id"], {"$set": {f"steps.{index}.done": True}})
+
+        self._finalize(job)
+        now = datetime.now()
+        self.collection.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": DONE, "updated_at": now, "finished_at": now}, "$unset": {"error": ""}},
+        )
+
+    def _checkpoint(self, job_id: ObjectId, update: dict):
+        """Record progress and renew the lease."""
+        now = datetime.now()
+        update.setdefault("$set", {}).update(
+            updated_at=now,
+            lease_until=now + timedelta(seconds=config.JOB_LEASE_SECONDS),
+        )
+        self.collection.update_one({"_id": job_id}, update)
+
+
+class JobRunner:
+    """One daemon thread per process that claims and runs jobs one at a time."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="job-runner", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """Check for jobs now instead of at the next poll (no-op if not started)."""
+        self._wake.set()
+
+    def _loop(self):
+        model = JobModel()
+        while True:
+            try:
+                job = model.claim_next()
+            except Exception as e:
+                print(f"Error claiming job: {e}")
+                job = None
+
+            if job:
+                model.process(job)
+                continue
+
+            # idle: also picks up jobs whose worker crashed once their lease expires
+            self._wake.wait(config.JOB_IDLE_POLL_SECONDS)
+            self._wake.clear()
+
+
+# shared by every session of the process (started by app.py)
+job_runner = JobRunner()
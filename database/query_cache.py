@@ -0,0 +1,204 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Optional
+
+import bson
+import pandas as pd
+from bson import json_util
+
+import config
+
+
+def _json_default(value):
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+    return json_util.default(value)
+
+
+def _estimate_size(value) -> int:
+    """Rough in-memory size of a cached value (bytes)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        try:
+            # Python objects take ~2x their BSON size
+            return 2 * len(bson.encode(value))
+        except Exception:
+            return sys.getsizeof(value) + sum(_estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+# pandas >= 3 always copies on write: a shallow copy cannot change the cached frame
+_FRAMES_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _copy_out(value):
+    """
+    Hand callers their own copy so they cannot mutate the cached entry:
+    lists, tuples and dicts (documents) are copied at every level, the
+    leaves (numbers, strings, dates, ObjectIds) are immutable and shared.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=not _FRAMES_COPY_ON_WRITE)
+    if isinstance(value, dict):
+        return {key: _copy_out(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_out(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_out(item) for item in value)
+    return value
+
+
+class QueryCache:
+    """
+    In-process result cache for per-user queries.
+
+    Entries are keyed by (user_id, namespace, normalized params, data version).
+    Every write path calls bump_version(user_id), so entries loaded before the
+    write can never be returned again. Eviction: LRU, TTL and a memory cap.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = config.QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = config.QUERY_CACHE_TTL_SECONDS,
+        max_bytes: int = config.QUERY_CACHE_MAX_MB * 2**20,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.RLock()
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, size, value)
+        self._versions: dict[str, int] = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------
+    # Versions
+    # -----------------------------
+    def get_version(self, user_id) -> int:
+        with self._lock:
+            return self._versions.get(str(user_id), 0)
+
+    def bump_version(self, user_id):
+        """Call after every write that changes the user's data."""
+        if user_id is None:
+            return
+        with self._lock:
+            key = str(user_id)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            # drop the user's outdated entries now instead of waiting for LRU/TTL
+            for entry_key in [k for k in self._entries if k[0] == key]:
+                self._remove(entry_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            # bumping every known version also invalidates in-flight loads
+            for key in self._versions:
+                self._versions[key] += 1
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    @staticmethod
+    def make_params_key(params: Any) -> str:
+        return json_util.dumps(params, sort_keys=True, default=_json_default)
+
+    def get_or_load(self, user_id, namespace: str, params: Any, loader: Callable[[], Any]):
+        """
+        Return the cached result for (user_id, namespace, params) or call loader().
+
+        The data version is read before loading, so a result that raced with a
+        write is stored under the old version and never served.
+        """
+        if user_id is None:
+            return loader()
+
+        key = (str(user_id), namespace, self.make_params_key(params), self.get_version(user_id))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_out(entry[2])
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+
+        value = loader()
+        self._store(key, value, now + self.ttl_seconds)
+        return _copy_out(value)
+
+    def _store(self, key, value, expires_at: float):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._total_bytes += size
+            self._evict()
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+
+        # least recently used first
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+
+# one cache per process, shared by every session
+query_cache = QueryCache()
+
+# category catalog (CategoryModel.get_category_map): versioned apart from
+# query_cache, so transaction writes keep it and only category writes reload it
+category_cache = QueryCache()
+
+
+def cached_query(namespace: Optional[str] = None, cache: Optional[QueryCache] = None):
+    """
+    Cache a method's result per (self.user_id, arguments, data version).
+    Arguments must be JSON/BSON serializable (dates, ObjectIds, dicts, lists...).
+
+    Args:
+        namespace: Cache key prefix (default: the method's qualified name)
+        cache: QueryCache holding the results (default: query_cache)
+    """
+
+    def decorator(method):
+        name = namespace or method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return (cache if cache is not None else query_cache).get_or_load(
+                self.user_id,
+                name,
+                {"args": args, "kwargs": kwargs},
+                lambda: method(self, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,169 @@
+"""
+Compile transaction filter dicts into canonical MongoDB filters.
+
+Equivalent filter dicts (any key order, date vs datetime vs ISO string,
+int vs float amounts, empty values) compile to the same flat filter:
+
+    {"user_id": ..., "type": ..., "category_id": {"$in": [...]},
+     "amount": {"$gte": ..., "$lte": ...}, "date": {...}, "$text": {...}}
+
+- user_id always comes first, the other fields follow FIELD_ORDER
+- bounds on the same field are merged into one range predicate
+- there is no $and wrapper unless two conditions use the same operator key
+
+shape_hash() hashes the filter with its values removed, so MongoDB's plan
+cache and the query result cache see one shape per kind of filter.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from bson.objectid import ObjectId
+
+from utils import handler_datetime
+from .text_search import search_terms
+
+# canonical field order after user_id (equality fields first, like the indexes)
+FIELD_ORDER = ("type", "category_id", "amount", "date", "$text")
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+# operators whose list value is a set of values, not a list of sub-filters
+LIST_OPERATORS = ("$in", "$nin", "$all")
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _category_values(value) -> Optional[list]:
+    """A category id or a list of ids -> sorted unique ids (None = no filter)."""
+    if isinstance(value, (list, tuple, set)):
+        return sorted({category_id for category_id in value if not _is_empty(category_id)})
+    if _is_empty(value):
+        return None
+    return [value]
+
+
+def _merge_range(existing: Optional[dict], bounds: dict) -> dict:
+    """Merge two range predicates on one field, keeping the tighter bound."""
+    merged = dict(existing or {})
+    for operator, value in bounds.items():
+        if operator not in merged:
+            merged[operator] = value
+        elif operator in ("$gt", "$gte"):
+            merged[operator] = max(merged[operator], value)
+        else:
+            merged[operator] = min(merged[operator], value)
+    return {operator: merged[operator] for operator in RANGE_OPERATORS if operator in merged}
+
+
+def _order(query: dict) -> dict:
+    """Put the fields of a flat filter in canonical order."""
+    rank = {field: index for index, field in enumerate(("user_id",) + FIELD_ORDER)}
+    return dict(sorted(query.items(), key=lambda item: (rank.get(item[0], len(rank)), item[0])))
+
+
+def compile_transaction_filter(user_id, advanced_filter: Optional[dict] = None) -> dict:
+    """
+    Build the canonical user-scoped filter for an advanced filter dict.
+
+    Args:
+        user_id: Owner of the transactions (required)
+        advanced_filter: transaction_type, category_id, min_amount, max_amount,
+                         start_date, end_date, search_text (all optional).
+                         category_id is one id or a list of ids
+                         (an explicit empty list matches nothing).
+                         Category names are resolved to ids by
+                         TransactionModel.build_query.
+    """
+    if not user_id:
+        raise ValueError("user_id is not set for TransactionModel")
+
+    query = {"user_id": ObjectId(user_id)}
+    advanced_filter = advanced_filter or {}
+
+    if not _is_empty(advanced_filter.get("transaction_type")):
+        query["type"] = advanced_filter["transaction_type"]
+
+    categories = _category_values(advanced_filter.get("category_id"))
+    if categories is not None:
+        # always $in, even for one id: every category selection has one shape
+        query["category_id"] = {"$in": categories}
+
+    # amount <= 0 never matches a transaction, so a 0 bound is no bound
+    amount = {}
+    if advanced_filter.get("min_amount"):
+        amount["$gte"] = float(advanced_filter["min_amount"])
+    if advanced_filter.get("max_amount"):
+        amount["$lte"] = float(advanced_filter["max_amount"])
+    if amount:
+        query["amount"] = _merge_range(None, amount)
+
+    date_range = {}
+    if not _is_empty(advanced_filter.get("start_date")):
+        date_range["$gte"] = handler_datetime(advanced_filter["start_date"])
+    if not _is_empty(advanced_filter.get("end_date")):
+        date_range["$lte"] = handler_datetime(advanced_filter["end_date"])
+    if date_range:
+        query["date"] = _merge_range(None, date_range)
+
+    # word/prefix search on the description tokens (see text_search)
+    terms = search_terms(advanced_filter.get("search_text"))
+    if terms:
+        query["$text"] = {"$search": terms}
+
+    return _order(query)
+
+
+def is_text_search(query: dict) -> bool:
+    return "$text" in query
+
+
+def add_conditions(query: dict, conditions: dict) -> dict:
+    """
+    AND extra conditions into a compiled filter, keeping it flat.
+
+    Range bounds on a field that is already a range are merged; anything
+    that cannot be merged (same operator key, equality vs range) falls back to $and.
+    """
+    merged = dict(query)
+    conflicts = {}
+    for field, value in conditions.items():
+        current = merged.get(field)
+        if field not in merged:
+            merged[field] = value
+        elif _is_range(current) and _is_range(value):
+            merged[field] = _merge_range(current, value)
+        elif current != value:
+            conflicts[field] = value
+
+    merged = _order(merged)
+    if conflicts:
+        return {"$and": [merged, conflicts]}
+    return merged
+
+
+def _is_range(value) -> bool:
+    return isinstance(value, dict) and bool(value) and all(op in RANGE_OPERATORS for op in value)
+
+
+def query_shape(query):
+    """
+    The filter with every value replaced by a placeholder (operators and fields kept).
+
+    A $in/$nin/$all list is one placeholder whatever its length, so every
+    category selection shares a shape; $or/$and lists keep one entry per branch.
+    """
+    if isinstance(query, dict):
+        return {
+            key: 1 if key in LIST_OPERATORS else query_shape(value)
+            for key, value in query.items()
+        }
+    if isinstance(query, list):
+        return [query_shape(item) for item in query]
+    return 1
+
+
+def shape_hash(query: dict) -> str:
+    """Stable short hash of query_shape(query)."""
+    payload = json.dumps(query_shape(query), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
@@ -0,0 +1,328 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument, UpdateOne, DeleteOne
+
+from .database_manager import DatabaseManager, ANALYTICS, maintenance_timeout
+from .query_cache import query_cache
+import config
+
+
+class RollupModel:
+    """
+    Daily rollups of transactions, one document per (user_id, day, type, category_id):
+
+        {"user_id", "day", "type", "category_id", "sum", "count", "min", "max"}
+
+    Transaction/category write paths keep it current, analytics read it
+    so their cost scales with the number of days, not transactions.
+    """
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.db_manager = DatabaseManager()
+        self.collection = self.db_manager.get_collection(
+            config.COLLECTIONS["rollup"]
+        )
+        self.transaction_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["transaction"]
+        )
+        # dashboard reads run on the analytics pool
+        self.analytics_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["rollup"], workload=ANALYTICS
+        )
+        # gắn user_id 1 lần khi tạo model (dùng cho các hàm đọc)
+        self._user_id: Optional[ObjectId] = ObjectId(user_id) if user_id else None
+
+    # -----------------------------
+    # Helper
+    # -----------------------------
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        return self._user_id
+
+    @staticmethod
+    def to_day(value: datetime) -> datetime:
+        """Truncate a datetime to midnight (the rollup bucket)"""
+        return datetime(value.year, value.month, value.day)
+
+    @classmethod
+    def _bucket_key(cls, transaction: dict) -> dict:
+        return {
+            "user_id": transaction["user_id"],
+            "day": cls.to_day(transaction["date"]),
+            "type": transaction["type"],
+            "category_id": transaction["category_id"],
+        }
+
+    # -----------------------------
+    # Incremental maintenance
+    # -----------------------------
+    def apply_transaction(self, transaction: dict):
+        """Add one transaction to its daily bucket."""
+        amount = transaction["amount"]
+        self.collection.update_one(
+            self._bucket_key(transaction),
+            {
+                "$inc": {"sum": amount, "count": 1},
+                "$min": {"min": amount},
+                "$max": {"max": amount},
+            },
+            upsert=True,
+        )
+
+    @classmethod
+    def _combine(cls, transactions: list[dict]) -> dict:
+        """{(user_id, day, type, category_id): {"key", "sum", "count", "min", "max"}}"""
+        buckets = {}
+        for transaction in transactions:
+            key = cls._bucket_key(transaction)
+            amount = transaction["amount"]
+            bucket_id = tuple(key.values())
+            if bucket_id not in buckets:
+                buckets[bucket_id] = {"key": key, "sum": 0, "count": 0, "min": amount, "max": amount}
+            bucket = buckets[bucket_id]
+            bucket["sum"] += amount
+            bucket["count"] += 1
+            bucket["min"] = min(bucket["min"], amount)
+            bucket["max"] = max(bucket["max"], amount)
+        return buckets
+
+    def apply_transactions(self, transactions: list[dict]):
+        """Add many transactions: combined per bucket, one bulk write."""
+        buckets = self._combine(transactions)
+        operations = [
+            UpdateOne(
+                bucket["key"],
+                {
+                    "$inc": {"sum": bucket["sum"], "count": bucket["count"]},
+                    "$min": {"min": bucket["min"]},
+                    "$max": {"max": bucket["max"]},
+                },
+                upsert=True,
+            )
+            for bucket in buckets.values()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def remove_transaction(self, transaction: dict):
+        """
+        Remove one transaction from its daily bucket.
+
+        `transaction` is its previous version: on an update the raw document
+        already holds the new values, so a recompute leaves it out by _id.
+        """
+        key = self._bucket_key(transaction)
+        amount = transaction["amount"]
+
+        bucket = self.collection.find_one_and_update(
+            key,
+            {"$inc": {"sum": -amount, "count": -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not bucket:
+            return
+
+        if bucket["count"] <= 0:
+            self.collection.delete_one(key)
+        elif amount <= bucket["min"] or amount >= bucket["max"]:
+            # min/max cannot be decremented -> recompute this single bucket
+            self._recompute_bucket(key, exclude_id=transaction.get("_id"))
+
+    def remove_transactions(self, transactions: list[dict]):
+        """
+        Remove many transactions that no longer match their buckets (deleted,
+        or moved to another category): combined per bucket, one bulk write.
+        Buckets left empty are deleted, those that lost their min/max are recomputed.
+        """
+        buckets = self._combine(transactions)
+        if not buckets:
+            return
+
+        self.collection.bulk_write(
+            [
+                UpdateOne(bucket["key"], {"$inc": {"sum": -bucket["sum"], "count": -bucket["count"]}})
+                for bucket in buckets.values()
+            ],
+            ordered=False,
+        )
+
+        operations = []
+        for bucket in self.collection.find({"$or": [bucket["key"] for bucket in buckets.values()]}):
+            removed = buckets[(bucket["user_id"], bucket["day"], bucket["type"], bucket["category_id"])]
+            if bucket["count"] <= 0:
+                operations.append(DeleteOne({"_id": bucket["_id"]}))
+            elif removed["min"] <= bucket["min"] or removed["max"] >= bucket["max"]:
+                self._recompute_bucket(removed["key"])
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def _recompute_bucket(self, key: dict, exclude_id: Optional[ObjectId] = None):
+        day_start = key["day"]
+        match = {
+            "user_id": key["user_id"],
+            "type": key["type"],
+            "category_id": key["category_id"],
+            "date": {"$gte": day_start, "$lt": day_start + timedelta(days=1)},
+        }
+        if exclude_id is not None:
+            match["_id"] = {"$ne": exclude_id}
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": None,
+                    "sum": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                    "min": {"$min": "$amount"},
+                    "max": {"$max": "$amount"},
+                }
+            },
+        ]
+        result = list(self.transaction_collection.aggregate(pipeline))
+
+        if not result:
+            self.collection.delete_one(key)
+            return
+
+        stats = {field: result[0][field] for field in ("sum", "count", "min", "max")}
+        self.collection.update_one(key, {"$set": stats}, upsert=True)
+
+    def reassign_category(self, user_id: ObjectId, old_id: ObjectId, new_id: ObjectId):
+        """Merge every bucket of category `old_id` into `new_id` (delete with 'reassign')."""
+        if old_id == new_id:
+            return
+
+        old_filter = {"user_id": user_id, "category_id": old_id}
+
+        operations = []
+        for bucket in self.collection.find(old_filter):
+            operations.append(
+                UpdateOne(
+                    {
+                        "user_id": user_id,
+                        "day": bucket["day"],
+                        "type": bucket["type"],
+                        "category_id": new_id,
+                    },
+                    {
+                        "$inc": {"sum": bucket["sum"], "count": bucket["count"]},
+                        "$min": {"min": bucket["min"]},
+                        "$max": {"max": bucket["max"]},
+                    },
+                    upsert=True,
+                )
+            )
+            operations.append(DeleteOne({"_id": bucket["_id"]}))
+
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def delete_category(self, user_id: ObjectId, category_id: ObjectId) -> int:
+        result = self.collection.delete_many({"user_id": user_id, "category_id": category_id})
+        return result.deleted_count
+
+    def delete_user(self, user_id: ObjectId) -> int:
+        result = self.collection.delete_many({"user_id": user_id})
+        return result.deleted_count
+
+    # -----------------------------
+    # Full rebuild (backfill)
+    # -----------------------------
+    @maintenance_timeout()
+    def rebuild(self, user_id: Optional[str] = None):
+        """
+        Recompute rollups from raw transactions.
+
+        Args:
+            user_id: Only rebuild this user, None = every user
+        """
+        match = {"user_id": ObjectId(user_id)} if user_id else {}
+
+        self.collection.delete_many(match)
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {
+                        "user_id": "$user_id",
+                        "day": {
+                            "$dateFromParts": {
+                                "year": {"$year": "$date"},
+                                "month": {"$month": "$date"},
+                                "day": {"$dayOfMonth": "$date"},
+                            }
+                        },
+                        "type": "$type",
+                        "category_id": "$category_id",
+                    },
+                    "sum": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                    "min": {"$min": "$amount"},
+                    "max": {"$max": "$amount"},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "user_id": "$_id.user_id",
+                    "day": "$_id.day",
+                    "type": "$_id.type",
+                    "category_id": "$_id.category_id",
+                    "sum": 1,
+                    "count": 1,
+                    "min": 1,
+                    "max": 1,
+                }
+            },
+            {
+                "$merge": {
+                    "into": config.COLLECTIONS["rollup"],
+                    "on": ["user_id", "day", "type", "category_id"],
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        self.transaction_collection.aggregate(pipeline)
+
+        if user_id:
+            query_cache.bump_version(user_id)
+        else:
+            query_cache.clear()
+
+    # -----------------------------
+    # Read
+    # -----------------------------
+    def _require_user(self):
+        if not self.user_id:
+            raise ValueError("user_id is required. Create the model with a user_id.")
+
+    def aggregate(
+        self,
+        pipeline: list[dict],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Run an aggregation pipeline on the current user's rollups.
+
+        Args:
+            pipeline: Stages appended after the user/day $match
+            start_date: Only buckets on or after this day
+            end_date: Only buckets on or before this datetime
+        """
+        self._require_user()
+
+        match: dict = {"user_id": self.user_id}
+        day_query = {}
+        if start_date is not None:
+            day_query["$gte"] = self.to_day(start_date)
+        if end_date is not None:
+            day_query["$lte"] = end_date
+        if day_query:
+            match["day"] = day_query
+
+        return list(self.analytics_collection.aggregate([{"$match": match}, *pipeline]))
@@ -0,0 +1,328 @@
+from datetime import datetime
+from typing import Optional
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from .database_manager import DatabaseManager, maintenance_timeout
+from .query_cache import query_cache
+import config
+
+# sums are floats: drift from $inc below this is not a mismatch
+RECONCILE_TOLERANCE = 0.005
+
+
+class SummaryModel:
+    """
+    Lifetime totals of a user's transactions, one document per user:
+
+        {"_id": user_id, "count", "first_date", "last_date",
+         "types": {"Expense": {"sum", "count", "first_date", "last_date"}, ...}}
+
+    Transaction write paths keep it current with $inc/$min/$max, so all-time
+    figures are a single _id lookup. reconcile() checks it against the raw data.
+    """
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.db_manager = DatabaseManager()
+        self.collection = self.db_manager.get_collection(
+            config.COLLECTIONS["summary"]
+        )
+        self.transaction_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["transaction"]
+        )
+        self._user_id: Optional[ObjectId] = ObjectId(user_id) if user_id else None
+
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        return self._user_id
+
+    # -----------------------------
+    # Incremental maintenance
+    # -----------------------------
+    def apply_transaction(self, transaction: dict):
+        """Add one transaction to its user's summary."""
+        self.apply_transactions([transaction])
+
+    def apply_transactions(self, transactions: list[dict]):
+        """Add many transactions: combined per user, one upsert each."""
+        users = {}
+        for transaction in transactions:
+            user = users.setdefault(transaction["user_id"], {"$inc": {}, "$min": {}, "$max": {}})
+            prefix = f"types.{transaction['type']}"
+            date = transaction["date"]
+            for field, value in (("count", 1), (f"{prefix}.count", 1), (f"{prefix}.sum", transaction["amount"])):
+                user["$inc"][field] = user["$inc"].get(field, 0) + value
+            for field in ("first_date", f"{prefix}.first_date"):
+                user["$min"][field] = min(user["$min"].get(field, date), date)
+            for field in ("last_date", f"{prefix}.last_date"):
+                user["$max"][field] = max(user["$max"].get(field, date), date)
+
+        operations = [
+            UpdateOne(
+                {"_id": user_id},
+                {**update, "$set": {"updated_at": datetime.now()}},
+                upsert=True,
+            )
+            for user_id, update in users.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def remove_transaction(self, transaction: dict):
+        """Remove one transaction from its user's summary."""
+        user_id = transaction["user_id"]
+        transaction_type = transaction["type"]
+        prefix = f"types.{transaction_type}"
+
+        summary = self.collection.find_one_and_update(
+            {"_id": user_id},
+            {
+                "$inc": {
+                    "count": -1,
+                    f"{prefix}.count": -1,
+                    f"{prefix}.sum": -transaction["amount"],
+                },
+                "$set": {"updated_at": datetime.now()},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if not summary:
+            return
+
+        if summary["count"] <= 0:
+            self.collection.delete_one({"_id": user_id})
+            return
+
+        stats = summary.get("types", {}).get(transaction_type, {})
+        if stats.get("count", 0) <= 0:
+            self.collection.update_one({"_id": user_id}, {"$unset": {prefix: ""}})
+
+        # first/last dates cannot be decremented -> re-read the bounds that moved
+        date = transaction["date"]
+        if date <= summary["first_date"] or date >= summary["last_date"]:
+            self._recompute_dates(user_id)
+        elif stats.get("count", 0) > 0 and (date <= stats["first_date"] or date >= stats["last_date"]):
+            self._recompute_dates(user_id, transaction_type)
+
+    def remove_transactions(self, transactions: list[dict]):
+        """Remove many transactions: combined per user, first/last dates re-read once."""
+        users = {}
+        for transaction in transactions:
+            inc = users.setdefault(transaction["user_id"], {})
+            prefix = f"types.{transaction['type']}"
+            for field, value in (("count", -1), (f"{prefix}.count", -1), (f"{prefix}.sum", -transaction["amount"])):
+                inc[field] = inc.get(field, 0) + value
+
+        for user_id, inc in users.items():
+            summary = self.collection.find_one_and_update(
+                {"_id": user_id},
+                {"$inc": inc, "$set": {"updated_at": datetime.now()}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if not summary:
+                continue
+
+            if summary["count"] <= 0:
+                self.collection.delete_one({"_id": user_id})
+                continue
+
+            emptied = {
+                f"types.{transaction_type}": ""
+                for transaction_type, stats in summary.get("types", {}).items()
+                if stats.get("count", 0) <= 0
+            }
+            if emptied:
+                self.collection.update_one({"_id": user_id}, {"$unset": emptied})
+            self._recompute_dates(user_id)
+
+    def _recompute_dates(self, user_id: ObjectId, transaction_type: Optional[str] = None):
+        """
+        Reset first/last dates from the transactions: one index seek per bound
+        on (user_id, date) or (user_id, type, date).
+        """
+        types = [transaction_type] if transaction_type else config.TRANSACTION_TYPES
+        update = {}
+        for type_ in types:
+            first, last = self._date_bounds({"user_id": user_id, "type": type_})
+            if first:
+                update[f"types.{type_}.first_date"] = first
+                update[f"types.{type_}.last_date"] = last
+        if not transaction_type:
+            first, last = self._date_bounds({"user_id": user_id})
+            if not first:
+                self.collection.delete_one({"_id": user_id})
+                return
+            update["first_date"] = first
+            update["last_date"] = last
+
+        if update:
+            self.collection.update_one({"_id": user_id}, {"$set": update})
+
+    def _date_bounds(self, match: dict) -> tuple[Optional[datetime], Optional[datetime]]:
+        bounds = []
+        for direction in (1, -1):
+            transaction = self.transaction_collection.find_one(
+                match, {"date": 1, "_id": 0}, sort=[("date", direction)]
+            )
+            bounds.append(transaction["date"] if transaction else None)
+        return bounds[0], bounds[1]
+
+    def delete_user(self, user_id: ObjectId) -> int:
+        result = self.collection.delete_one({"_id": user_id})
+        return result.deleted_count
+
+    # -----------------------------
+    # Rebuild / reconcile
+    # -----------------------------
+    @staticmethod
+    def _summary_pipeline(match: dict) -> list[dict]:
+        """Stages computing the summary documents from raw transactions."""
+        return [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {"user_id": "$user_id", "type": "$type"},
+                    "sum": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                    "first_date": {"$min": "$date"},
+                    "last_date": {"$max": "$date"},
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$_id.user_id",
+                    "count": {"$sum": "$count"},
+                    "first_date": {"$min": "$first_date"},
+                    "last_date": {"$max": "$last_date"},
+                    "types": {
+                        "$push": {
+                            "k": "$_id.type",
+                            "v": {
+                                "sum": "$sum",
+                                "count": "$count",
+                                "first_date": "$first_date",
+                                "last_date": "$last_date",
+                            },
+                        }
+                    },
+                }
+            },
+            {"$addFields": {"types": {"$arrayToObject": "$types"}}},
+        ]
+
+    @maintenance_timeout()
+    def rebuild(self, user_id: Optional[str] = None):
+        """
+        Recompute summaries from raw transactions.
+
+        Args:
+            user_id: Only rebuild this user, None = every user
+        """
+        if user_id:
+            # a single document: computed here and written in place
+            user_id = ObjectId(user_id)
+            expected = list(self.transaction_collection.aggregate(
+                self._summary_pipeline({"user_id": user_id})
+            ))
+            self._write(user_id, expected[0] if expected else None)
+            query_cache.bump_version(user_id)
+            return
+
+        self.collection.delete_many({})
+
+        pipeline = [
+            *self._summary_pipeline({}),
+            {"$addFields": {"updated_at": datetime.now()}},
+            {
+                "$merge": {
+                    "into": config.COLLECTIONS["summary"],
+                    "on": "_id",
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        self.transaction_collection.aggregate(pipeline)
+        query_cache.clear()
+
+    def _write(self, user_id: ObjectId, summary: Optional[dict]):
+        """Replace a user's summary (None = the user has no transactions)."""
+        if summary is None:
+            self.collection.delete_one({"_id": user_id})
+            return
+        document = {**summary, "updated_at": datetime.now()}
+        self.collection.replace_one({"_id": user_id}, document, upsert=True)
+
+    @maintenance_timeout()
+    def reconcile(self, user_id: Optional[str] = None, fix: bool = False) -> list[dict]:
+        """
+        Compare stored summaries with the raw transactions.
+
+        Args:
+            user_id: Only check this user, None = every user
+            fix: Rewrite the summaries that do not match
+
+        Returns:
+            [{"user_id", "field", "stored", "expected"}] one entry per mismatched field
+        """
+        match = {"user_id": ObjectId(user_id)} if user_id else {}
+        expected = {
+            doc["_id"]: doc
+            for doc in self.transaction_collection.aggregate(self._summary_pipeline(match))
+        }
+        stored = {
+            doc["_id"]: doc
+            for doc in self.collection.find({"_id": ObjectId(user_id)} if user_id else {})
+        }
+
+        mismatches = []
+        for uid in expected.keys() | stored.keys():
+            for field, stored_value, expected_value in self._diff(stored.get(uid), expected.get(uid)):
+                mismatches.append({
+                    "user_id": uid,
+                    "field": field,
+                    "stored": stored_value,
+                    "expected": expected_value,
+                })
+
+        if fix:
+            for uid in {mismatch["user_id"] for mismatch in mismatches}:
+                self._write(uid, expected.get(uid))
+                query_cache.bump_version(uid)
+
+        return mismatches
+
+    @staticmethod
+    def _flatten(summary: Optional[dict]) -> dict:
+        """{"count": ..., "types.Expense.sum": ...} without zero-count types."""
+        if not summary:
+            return {}
+        flat = {field: summary.get(field) for field in ("count", "first_date", "last_date")}
+        for transaction_type, stats in (summary.get("types") or {}).items():
+            if stats.get("count", 0) <= 0:
+                continue
+            for field in ("sum", "count", "first_date", "last_date"):
+                flat[f"types.{transaction_type}.{field}"] = stats.get(field)
+        return flat
+
+    @classmethod
+    def _diff(cls, stored: Optional[dict], expected: Optional[dict]):
+        stored, expected = cls._flatten(stored), cls._flatten(expected)
+        for field in sorted(stored.keys() | expected.keys()):
+            stored_value, expected_value = stored.get(field), expected.get(field)
+            if isinstance(stored_value, float) or isinstance(expected_value, float):
+                if stored_value is not None and expected_value is not None \
+                        and abs(stored_value - expected_value) <= RECONCILE_TOLERANCE:
+                    continue
+            if stored_value != expected_value:
+                yield field, stored_value, expected_value
+
+    # -----------------------------
+    # Read
+    # -----------------------------
+    def get_summary(self) -> dict:
+        """The current user's summary ({} when the user has no transactions)."""
+        if not self.user_id:
+            raise ValueError("user_id is required. Create the model with a user_id.")
+        return self.collection.find_one({"_id": self.user_id}) or {}
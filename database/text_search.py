@@ -0,0 +1,47 @@
+"""
+Word and prefix search on transaction descriptions.
+
+Every transaction stores `search_tokens`: the edge n-grams of each word
+of its description ("coffee" -> co, cof, coff, coffe, coffee), lowercased.
+The tokens are covered by a text index on (user_id, search_tokens) with
+default_language "none" (no stemming, no stop words), so:
+
+- a search term matches a word or the beginning of a word
+- $text only reads the index entries of the searched terms, so latency
+  depends on the number of matches, not on the size of the history
+- results can be ordered by relevance with {"$meta": "textScore"}
+"""
+import re
+from typing import Optional
+
+MIN_GRAM = 2
+MAX_GRAM = 15
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: Optional[str]) -> list[str]:
+    return _WORD.findall((text or "").casefold())
+
+
+def search_tokens(text: Optional[str]) -> list[str]:
+    """Edge n-grams of every word in `text` (stored on the transaction)."""
+    tokens = set()
+    for word in _words(text):
+        if len(word) < MIN_GRAM:
+            tokens.add(word)
+            continue
+        for size in range(MIN_GRAM, min(len(word), MAX_GRAM) + 1):
+            tokens.add(word[:size])
+    return sorted(tokens)
+
+
+def search_terms(query: Optional[str]) -> str:
+    """
+    Turn user input into a $text search string.
+
+    Terms longer than MAX_GRAM are cut to MAX_GRAM, which is the longest
+    token stored for a word. Returns "" if there is nothing to search.
+    """
+    terms = dict.fromkeys(word[:MAX_GRAM] for word in _words(query))
+    return " ".join(terms)
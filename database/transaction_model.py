@@ -1,10 +1,38 @@
-from typing import Optional, Any
+from typing import Optional, Callable, Iterable, Iterator
 from datetime import datetime, date
+import base64
+import json
+from itertools import islice
+import pandas as pd
 from bson.objectid import ObjectId
-from .database_manager import DatabaseManager
+from .database_manager import DatabaseManager, ANALYTICS
 import config
-from pymongo import DESCENDING, ASCENDING
-from utils import handler_datetime
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from utils import handler_datetime, validate_amount
+from analytics.frame_loader import frame_from_cursor
+from .rollup_model import RollupModel
+from .summary_model import SummaryModel
+from .category_models import CategoryModel
+from .query_cache import query_cache
+from .query_compiler import compile_transaction_filter, add_conditions, is_text_search
+from .text_search import search_tokens
+
+# fields that decide which daily rollup bucket a transaction belongs to
+ROLLUP_FIELDS = ("type", "category_id", "amount", "date")
+
+# fields counted in the per-user summary
+SUMMARY_FIELDS = ("type", "amount", "date")
+
+# MongoDB duplicate key error (unique (user_id, import_hash) index)
+DUPLICATE_KEY_ERROR = 11000
+
+# default order of transaction lists: newest first.
+# (date, _id) matches the transaction indexes, so lists never sort in memory
+TRANSACTION_SORT = [("date", DESCENDING), ("_id", DESCENDING)]
+
+# description searches: best matches first, then newest
+SEARCH_SORT = [("score", {"$meta": "textScore"}), *TRANSACTION_SORT]
 
 
 class TransactionModel:
@@ -14,101 +42,331 @@ class TransactionModel:
         self.collection = self.db_manager.get_collection(
             config.COLLECTIONS["transaction"]
         )
+        # dashboard aggregates, frame loads and full scans (lists, exports) run on the analytics pool
+        self.analytics_collection = self.db_manager.get_collection(
+            config.COLLECTIONS["transaction"], workload=ANALYTICS
+        )
         # dùng cho validate category
         self.category_collection = self.db_manager.get_collection(
             config.COLLECTIONS["category"]
         )
+        # daily rollups are kept current on every write
+        self.rollup_model = RollupModel()
+        self.summary_model = SummaryModel()
 
-        self.user_id = user_id
+        # bound once: a model instance never changes user
+        self._user_id = ObjectId(user_id) if user_id is not None else None
+        # transactions store category_id, names come from the category map
+        self.category_model = CategoryModel(self._user_id)
 
-    def set_user_id(self, user_id: Optional[str]):
-        """Set or clear the current user id used to scope queries."""
-        self.user_id = ObjectId(user_id) if user_id is not None else None
-    def _validate_category_for_transaction(self, transaction_type: str, category: str):
-        
+    @property
+    def user_id(self) -> Optional[ObjectId]:
+        """The user every query of this model is scoped to."""
+        return self._user_id
+
+    def _validate_category_for_transaction(self, transaction_type: str, category: str) -> ObjectId:
+        """Id of the category `category` of `transaction_type` (raises ValueError)."""
         if not self.user_id:
             raise ValueError("user_id is not set for TransactionModel")
 
-        filter_ = {
-            "user_id": self.user_id,
-            "type": transaction_type,   # 'Expense' hoặc 'Income'
-            "name": category,
-        }
-        valid_category = self.category_collection.find_one(filter_)
+        # in-memory lookup in the cached category catalog
+        category_id = self.category_model.category_id(transaction_type, category)
 
-        if not valid_category:
+        if category_id is None:
             # thông báo rõ ràng như trong đề
             raise ValueError(
                 f"Category '{category}' does not exist for type '{transaction_type}'."
             )
+        return category_id
+
+    def _with_category_names(self, transactions: Iterable[dict]) -> Iterator[dict]:
+        """Add the display name ("category") of each transaction's category_id."""
+        categories = self.category_model.get_category_map()
+        for transaction in transactions:
+            if "category_id" in transaction:
+                category = categories.get(transaction["category_id"])
+                transaction["category"] = category["name"] if category else None
+            yield transaction
 
     def get_transactions(
         self,
-        advanced_filters: dict[str, any] = None
+        advanced_filters: dict[str, any] = None,
+        fields: Optional[list[str]] = None,
     ) -> list[dict]:
+        """
+        Get the current user's transactions, newest first
+        (best matches first when searching descriptions).
 
-        # Build query filter
-        query = self._build_query(advanced_filters)
-              
-        # Fetch transactions, sort from newest to oldest
-        cursor = self.collection.find(query).sort("created_at", -1)
-        return list(cursor)     
-    
-    def _build_query(self, advanced_filter: Optional[dict]) -> dict:
-        conditions = []
-        if not advanced_filter:
-            return self._add_user_constraint(conditions)
-        
-        # Check transaction_type:
-        if "transaction_type" in advanced_filter:
-            conditions.append({"type": advanced_filter.get("transaction_type")})
-
-        # Check Category:
-        if "category" in advanced_filter:
-            conditions.append({"category": advanced_filter.get("category")})
-
-        # Check amount:
-        min_amount = advanced_filter.get("min_amount")
-        max_amount = advanced_filter.get("max_amount")
-        if min_amount or max_amount:
-            amount = {}
-            if min_amount is not None:
-                amount["$gte"] = min_amount # $gte = greater than or equal
-            if max_amount is not None:
-                amount["$lte"] = max_amount # $lte = less than or equal
-
-            conditions.append({"amount": amount})
-
-        # Check datetime
-        start_date = advanced_filter.get("start_date")
-        end_date = advanced_filter.get("end_date")
-        if start_date or end_date:
-
-            date_query = {}
-            if start_date is not None:
-                date_query["$gte"] = handler_datetime(start_date) # $gte = greater than or equal
-            if end_date is not None:
-                date_query["$lte"] = handler_datetime(end_date) # $lte = less than or equal
-            conditions.append({"date": date_query})
-
-        # Check description:
-        if "search_text" in advanced_filter:
-            conditions.append({
-                "description": {
-                    "$regex": advanced_filter.get("search_text"),
-                    "$options": "i"  # case-insensitive
-                }
-            })
-
-        return self._add_user_constraint(conditions)
+        Args:
+            advanced_filters: Filter dict (see build_query)
+            fields: Only return these fields (None = whole documents).
+                    "_id" is only included when listed.
+
+        Returns:
+            list of transaction documents
+        """
+        query = self.build_query(advanced_filters)
+        return query_cache.get_or_load(
+            self.user_id,
+            "transactions",
+            {"query": query, "fields": fields},
+            lambda: list(self._with_category_names(self._cursor(query, fields))),
+        )
+
+    def count_transactions(self, advanced_filters: Optional[dict] = None, limit: int = 0) -> int:
+        """
+        Number of the current user's transactions matching the filters.
+
+        Args:
+            advanced_filters: Filter dict (see build_query)
+            limit: Stop counting past this many (0 = count all)
+        """
+        query = self.build_query(advanced_filters)
+        return query_cache.get_or_load(
+            self.user_id,
+            "transaction_count",
+            {"query": query, "limit": limit},
+            lambda: self.analytics_collection.count_documents(query, **({"limit": limit} if limit else {})),
+        )
+
+    def iter_transactions(
+        self,
+        advanced_filters: Optional[dict] = None,
+        batch_size: int = config.TRANSACTION_BATCH_SIZE,
+        fields: Optional[list[str]] = None,
+        schema: Optional[dict] = None,
+    ) -> Iterator[dict] | Iterator[pd.DataFrame]:
+        """
+        Stream the current user's transactions (same order as get_transactions).
+
+        Only one cursor batch is held at a time, so single-pass consumers
+        (export, analytics) work on any history size with bounded memory.
+        Results are not cached.
+
+        Args:
+            advanced_filters: Filter dict (see build_query)
+            batch_size: Documents per cursor batch (and per DataFrame)
+            fields: Only return these fields (None = whole documents)
+            schema: Yield one typed DataFrame per batch instead of documents,
+                    {field: dtype} as in analytics.frame_loader (fields = its keys)
+        """
+        if schema is not None:
+            fields = list(schema)
+        cursor = self._cursor(self.build_query(advanced_filters), fields, batch_size)
+        if fields is not None and "category" not in fields:
+            transactions = cursor
+        else:
+            transactions = self._with_category_names(cursor)
+        if schema is None:
+            return transactions
+        return self._frames(transactions, schema, batch_size)
+
+    @staticmethod
+    def _frames(transactions: Iterator[dict], schema: dict, batch_size: int) -> Iterator[pd.DataFrame]:
+        # each batch is decoded column-wise, so chunks keep the compact dtypes
+        while True:
+            frame = frame_from_cursor(islice(transactions, batch_size), schema, chunk_size=batch_size)
+            if frame.empty:
+                return
+            yield frame
+
+    def _cursor(self, query: dict, fields: Optional[list[str]], batch_size: int = config.TRANSACTION_BATCH_SIZE):
+        # read-only scan over a whole filter: kept off the OLTP pool
+        return (
+            self.analytics_collection.find(query, self._build_projection(fields), batch_size=batch_size)
+            .sort(self._sort_for(query))
+        )
+
+    @staticmethod
+    def _sort_for(query: dict) -> list:
+        return SEARCH_SORT if is_text_search(query) else TRANSACTION_SORT
+
+    @staticmethod
+    def _build_projection(fields: Optional[list[str]]) -> Optional[dict]:
+        if fields is None:
+            return None
+
+        projection = {field: 1 for field in fields}
+        if projection.pop("category", None):
+            # the name is resolved from category_id
+            projection["category_id"] = 1
+        if "_id" not in projection:
+            projection["_id"] = 0
+        return projection
+
+    def get_transactions_page(
+        self,
+        advanced_filters: Optional[dict] = None,
+        page_size: int = config.TRANSACTIONS_PAGE_SIZE,
+        page_token: Optional[str] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Get one page of transactions, newest first, using (date, _id) seek keys.
+        Description searches are ordered by relevance and paged by offset
+        (the server scores every match anyway, so there is no seek key).
+
+        Args:
+            advanced_filters: Same filter dict accepted by get_transactions
+            page_size: Number of transactions per page
+            page_token: Token returned by the previous page (None = first page)
+
+        Returns:
+            (transactions, next_page_token) - next_page_token is None on the last page
+        """
+        query = self.build_query(advanced_filters)
+        cache_params = {"query": query, "page_size": page_size, "page_token": page_token}
+        return query_cache.get_or_load(
+            self.user_id,
+            "transactions_page",
+            cache_params,
+            lambda: self._load_page(query, page_size, page_token),
+        )
+
+    def _load_page(
+        self,
+        query: dict,
+        page_size: int,
+        page_token: Optional[str],
+    ) -> tuple[list[dict], Optional[str]]:
+        if is_text_search(query):
+            return self._load_search_page(query, page_size, page_token)
+
+        # Seek past the last row of the previous page instead of skipping
+        if page_token:
+            query = self._seek_query(query, *self._decode_page_token(page_token))
+
+        # fetch one extra row to know whether there is a next page
+        cursor = (
+            self.collection.find(query)
+            .sort(TRANSACTION_SORT)
+            .limit(page_size + 1)
+        )
+        transactions = list(self._with_category_names(cursor))
+
+        next_page_token = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_page_token = self._encode_page_token(transactions[-1])
+
+        return transactions, next_page_token
+
+    @staticmethod
+    def _seek_query(query: dict, last_date: datetime, last_id: ObjectId) -> dict:
+        """`query` restricted to the rows after (last_date, last_id) in TRANSACTION_SORT order."""
+        return add_conditions(query, {
+            "$or": [
+                {"date": {"$lt": last_date}},
+                {"date": last_date, "_id": {"$lt": last_id}},
+            ]
+        })
+
+    def _load_search_page(
+        self,
+        query: dict,
+        page_size: int,
+        page_token: Optional[str],
+    ) -> tuple[list[dict], Optional[str]]:
+        offset = self._decode_offset_token(page_token) if page_token else 0
+        cursor = (
+            self.collection.find(query)
+            .sort(SEARCH_SORT)
+            .skip(offset)
+            .limit(page_size + 1)
+        )
+        transactions = list(self._with_category_names(cursor))
+
+        next_page_token = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_page_token = self._encode_token({"offset": offset + page_size})
+
+        return transactions, next_page_token
+
+    @staticmethod
+    def _encode_token(payload: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @staticmethod
+    def _decode_token(page_token: str) -> dict:
+        return json.loads(base64.urlsafe_b64decode(page_token.encode()))
+
+    @classmethod
+    def _encode_page_token(cls, transaction: dict) -> str:
+        return cls._encode_token({
+            "date": transaction["date"].isoformat(),
+            "id": str(transaction["_id"]),
+        })
+
+    @classmethod
+    def _decode_page_token(cls, page_token: str) -> tuple[datetime, ObjectId]:
+        try:
+            payload = cls._decode_token(page_token)
+            return datetime.fromisoformat(payload["date"]), ObjectId(payload["id"])
+        except Exception:
+            raise ValueError("Invalid page token")
+
+    @classmethod
+    def _decode_offset_token(cls, page_token: str) -> int:
+        try:
+            return max(int(cls._decode_token(page_token)["offset"]), 0)
+        except Exception:
+            raise ValueError("Invalid page token")
+
+    def aggregate(
+        self,
+        pipeline: list[dict],
+        advanced_filters: Optional[dict] = None,
+    ) -> list[dict]:
+        """
+        Run an aggregation pipeline on the current user's transactions.
+
+        Args:
+            pipeline: Stages appended after the user/filter $match
+            advanced_filters: Same filter dict accepted by get_transactions
+
+        Returns:
+            list of result documents
+        """
+        query = self.build_query(advanced_filters)
+        return list(self.analytics_collection.aggregate([{"$match": query}, *pipeline]))
     
-    def _add_user_constraint(self, conditions: list) -> dict:
-        conditions.append({
-            "user_id": ObjectId(self.user_id) if self.user_id else None
+    def build_query(self, advanced_filter: Optional[dict]) -> dict:
+        """
+        Build the canonical user-scoped MongoDB filter (see query_compiler).
+
+        "category" (a name or a list of names) and "category_prefix"
+        (case-insensitive) are resolved here to category ids from the
+        cached category map, so the query filters with an index-backed
+        category_id $in instead of a regex on every transaction.
+        """
+        advanced_filter = dict(advanced_filter or {})
+        transaction_type = advanced_filter.get("transaction_type") or None
+        selected = advanced_filter.pop("category", None)
+        if isinstance(selected, str) and not selected.strip():
+            selected = None
+
+        prefix = (advanced_filter.pop("category_prefix", None) or "").strip()
+        if prefix:
+            names = self.match_categories(prefix, transaction_type)
+            if selected:
+                selected = [selected] if isinstance(selected, str) else selected
+                names = [name for name in names if name in selected]
+            selected = names
+
+        if selected is not None:
+            advanced_filter["category_id"] = self.category_model.category_ids(selected, transaction_type)
+
+        return compile_transaction_filter(self.user_id, advanced_filter)
+
+    def match_categories(self, prefix: str, transaction_type: Optional[str] = None) -> list[str]:
+        """Names of the user's categories starting with `prefix`, ignoring case."""
+        prefix = prefix.strip().casefold()
+        return sorted({
+            category["name"]
+            for category in self.category_model.get_category_map().values()
+            if (not transaction_type or category["type"] == transaction_type)
+            and category["name"].casefold().startswith(prefix)
         })
-        return {
-            "$and": conditions
-        }
     
     def add_transaction(
         self,
@@ -122,14 +380,15 @@ class TransactionModel:
         if not isinstance(transaction_date, datetime):
             transaction_date = handler_datetime(transaction_date)
 
-        self._validate_category_for_transaction(transaction_type, category)
+        category_id = self._validate_category_for_transaction(transaction_type, category)
 
         transaction = {
             'type': transaction_type,
-            'category': category,
+            'category_id': category_id,
             'amount': amount,
             'date': transaction_date,
             'description': description,
+            'search_tokens': search_tokens(description),
             'created_at': datetime.now(),
             'last_modified': datetime.now(),
             'user_id': self.user_id
@@ -137,11 +396,168 @@ class TransactionModel:
 
         try:
             result = self.collection.insert_one(transaction)
-            return str(result.inserted_id)
         except Exception as e:
             print(f"Error adding transaction: {e}")
             return None
 
+        self.rollup_model.apply_transaction(transaction)
+        self.summary_model.apply_transaction(transaction)
+        query_cache.bump_version(self.user_id)
+        return str(result.inserted_id)
+
+
+    def add_transactions_bulk(
+        self,
+        transactions: Iterable[dict],
+        chunk_size: int = config.BULK_INSERT_CHUNK_SIZE,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Insert many transactions with batched validation and writes.
+
+        Rows are read chunk by chunk. Categories are validated with one $in
+        query per chunk (names already checked are remembered), and each chunk
+        is written with insert_many(ordered=False). A bad row never aborts the batch.
+
+        Rows may carry an "import_hash": the unique (user_id, import_hash) index
+        rejects rows that were already imported, they are counted as duplicates.
+        Rows may carry an "error" (a value their source could not parse): they
+        are reported in "errors" and never inserted.
+
+        Args:
+            transactions: Iterable of dicts with type, category, amount, date
+                          and optional description / import_hash
+            chunk_size: Documents per insert_many
+            progress: Called with the number of rows processed after each chunk
+
+        Returns:
+            {"inserted": int, "duplicates": int,
+             "errors": [{"row": int, "message": str}], "message": str}
+            rows are numbered from 0 in input order
+        """
+        if not self.user_id:
+            raise ValueError("user_id is not set for TransactionModel")
+
+        result = {"inserted": 0, "duplicates": 0, "errors": []}
+        # (type, name) -> category_id, from the cached category catalog
+        known_categories = {
+            (category["type"], category["name"]): category_id
+            for category_id, category in self.category_model.get_category_map().items()
+        }
+        chunk = []
+        processed = 0
+        for row_number, row in enumerate(transactions):
+            chunk.append((row_number, row))
+            if len(chunk) == chunk_size:
+                self._insert_chunk(chunk, known_categories, result)
+                processed += len(chunk)
+                chunk = []
+                if progress:
+                    progress(processed)
+        if chunk:
+            self._insert_chunk(chunk, known_categories, result)
+            processed += len(chunk)
+            if progress:
+                progress(processed)
+
+        if result["inserted"]:
+            query_cache.bump_version(self.user_id)
+
+        result["errors"].sort(key=lambda error: error["row"])
+        result["message"] = (
+            f"Inserted {result['inserted']} transactions, "
+            f"skipped {result['duplicates']} duplicates, {len(result['errors'])} rows failed."
+        )
+        return result
+
+    def _insert_chunk(self, chunk: list, known_categories: dict, result: dict):
+        errors = result["errors"]
+        now = datetime.now()
+        documents, row_numbers = [], []
+        for row_number, row in chunk:
+            try:
+                documents.append(self._bulk_document(row, now))
+                row_numbers.append(row_number)
+            except (ValueError, TypeError) as e:
+                errors.append({"row": row_number, "message": str(e)})
+
+        valid_documents, valid_rows = [], []
+        for doc, row_number in zip(documents, row_numbers):
+            category_id = known_categories.get((doc["type"], doc["category"]))
+            if category_id:
+                doc["category_id"] = category_id
+                del doc["category"]
+                valid_documents.append(doc)
+                valid_rows.append(row_number)
+            else:
+                errors.append({
+                    "row": row_number,
+                    "message": f"Category '{doc['category']}' does not exist for type '{doc['type']}'.",
+                })
+
+        if not valid_documents:
+            return
+
+        failed = set()
+        try:
+            self.collection.insert_many(valid_documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                    result["duplicates"] += 1
+                    continue
+                errors.append({
+                    "row": valid_rows[write_error["index"]],
+                    "message": write_error.get("errmsg", "Write failed"),
+                })
+        except Exception as e:
+            print(f"Error adding transactions: {e}")
+            errors.extend({"row": row_number, "message": str(e)} for row_number in valid_rows)
+            return
+
+        inserted = [doc for index, doc in enumerate(valid_documents) if index not in failed]
+        if inserted:
+            self.rollup_model.apply_transactions(inserted)
+            self.summary_model.apply_transactions(inserted)
+        result["inserted"] += len(inserted)
+
+    def _bulk_document(self, row: dict, now: datetime) -> dict:
+        """Validate one bulk row and build its document (raises ValueError)."""
+        if row.get("error"):
+            raise ValueError(row["error"])
+        if row.get("amount") is None:
+            raise ValueError("Amount is required.")
+        valid, amount = validate_amount(row["amount"])
+        if not valid:
+            raise ValueError(amount)
+
+        transaction_type = row.get("type")
+        if transaction_type not in config.TRANSACTION_TYPES:
+            raise ValueError(f"Invalid transaction type '{transaction_type}'.")
+
+        category = row.get("category")
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError("Category is required.")
+
+        if row.get("date") is None:
+            raise ValueError("Date is required.")
+
+        description = row.get("description") or ""
+        document = {
+            'type': transaction_type,
+            'category': category.strip(),
+            'amount': amount,
+            'date': handler_datetime(row["date"]),
+            'description': description,
+            'search_tokens': search_tokens(description),
+            'created_at': now,
+            'last_modified': now,
+            'user_id': self.user_id,
+        }
+        if row.get("import_hash"):
+            document['import_hash'] = row["import_hash"]
+        return document
     
     def update_transaction(
         self,
@@ -161,7 +577,14 @@ class TransactionModel:
                     raise ValueError("Transaction not found.")
                 tx_type = current.get("type")
 
-            self._validate_category_for_transaction(tx_type, new_category)
+            kwargs["category_id"] = self._validate_category_for_transaction(tx_type, new_category)
+            del kwargs["category"]
+
+        if "date" in kwargs:
+            kwargs["date"] = handler_datetime(kwargs["date"])
+
+        if "description" in kwargs:
+            kwargs["search_tokens"] = search_tokens(kwargs["description"])
 
         try:
             kwargs['last_modified'] = datetime.now()
@@ -169,12 +592,28 @@ class TransactionModel:
                 '_id': ObjectId(transaction_id),
                 'user_id': self.user_id
             }
-            result = self.collection.update_one(filter_, {'$set': kwargs})
-            return result.modified_count > 0
+            # get the previous version back to move it between rollup buckets
+            previous = self.collection.find_one_and_update(
+                filter_,
+                {'$set': kwargs},
+                return_document=ReturnDocument.BEFORE,
+            )
         except Exception as e:
             print(f"Error updating transaction: {e}")
             return False
 
+        if not previous:
+            return False
+
+        if any(field in kwargs for field in ROLLUP_FIELDS):
+            self.rollup_model.remove_transaction(previous)
+            self.rollup_model.apply_transaction({**previous, **kwargs})
+        if any(field in kwargs for field in SUMMARY_FIELDS):
+            self.summary_model.remove_transaction(previous)
+            self.summary_model.apply_transaction({**previous, **kwargs})
+        query_cache.bump_version(self.user_id)
+        return True
+
     
     def delete_transaction(self, transaction_id: str) -> bool:
         """
@@ -190,11 +629,18 @@ class TransactionModel:
             filter_ = {'_id': ObjectId(transaction_id),
                        'user_id': self.user_id} 
             
-            result = self.collection.delete_one(filter_)
-            return result.deleted_count > 0
+            deleted = self.collection.find_one_and_delete(filter_)
         except Exception as e:
             print(f"Error deleting transaction: {e}")
             return False
+
+        if not deleted:
+            return False
+
+        self.rollup_model.remove_transaction(deleted)
+        self.summary_model.remove_transaction(deleted)
+        query_cache.bump_version(self.user_id)
+        return True
     
     def get_transaction_by_id(self, transaction_id: str) -> Optional[dict]:
         """
@@ -209,7 +655,8 @@ class TransactionModel:
         try:
             filter_ = {'_id': ObjectId(transaction_id),
                        'user_id': self.user_id}
-            return self.collection.find_one(filter_)
+            transaction = self.collection.find_one(filter_)
+            return next(self._with_category_names([transaction])) if transaction else None
         except Exception as e:
             print(f"Error getting transaction: {e}")
             return None
@@ -217,7 +664,8 @@ class TransactionModel:
     def get_transactions_by_date_range(
         self,
         start_date: datetime | date | str,
-        end_date: datetime | date | str
+        end_date: datetime | date | str,
+        fields: Optional[list[str]] = None,
     ) -> list[dict]:
         """
         Legacy method: Get transactions in date range.
@@ -225,6 +673,7 @@ class TransactionModel:
         Args:
             start_date: Start date
             end_date: End date
+            fields: Only return these fields (None = whole documents)
         
         Returns:
             list of transaction documents
@@ -233,6 +682,7 @@ class TransactionModel:
             advanced_filters= {
                 "start_date": start_date,
                 "end_date": end_date,
-            }
+            },
+            fields=fields,
         )
 
@@ -1,4 +1,7 @@
 from database.database_manager import DatabaseManager
+from database.category_models import CategoryModel
+from database.query_cache import query_cache
+from database.job_model import JobModel, PURGE_USER, DONE
 import config
 from datetime import datetime
 from bson.objectid import ObjectId
@@ -18,6 +21,7 @@ class UserModel:
         self.budget_collection = self.db_manager.get_collection(
             config.COLLECTIONS["budget"]
         )
+
     def create_user(self, email: str) -> str:
         """Create new user"""
 
@@ -42,11 +46,43 @@ class UserModel:
 
         # case 2: user exist but deactivate
         # raise Error
-        if user.get("is_activate") is not True:
-            raise ValueError("This account is deactivated! Please connect to CS")
+        self._check_activate(user)
 
         # all checking passed
         return str(user.get("_id"))
+
+    def _check_activate(self, user: dict):
+        if user.get("is_activate") is not True:
+            raise ValueError("This account is deactivated! Please connect to CS")
+
+    def bootstrap(self, email: str) -> str:
+        """
+        One-time per session setup: login + seed default categories.
+
+        Default categories are only written when the user's "defaults_version"
+        marker is older than config.DEFAULT_CATEGORIES_VERSION.
+
+        Returns:
+            Mongo user id (string), to be cached in the session
+        """
+        user = self.collection.find_one({"email": email})
+
+        if not user:
+            user_id = self.create_user(email)
+            defaults_version = None
+        else:
+            self._check_activate(user)
+            user_id = str(user.get("_id"))
+            defaults_version = user.get("defaults_version")
+
+        if defaults_version != config.DEFAULT_CATEGORIES_VERSION:
+            CategoryModel(user_id).initialize_user_default_categories()
+            self.collection.update_one(
+                {"_id": ObjectId(user_id)},
+                {"$set": {"defaults_version": config.DEFAULT_CATEGORIES_VERSION}},
+            )
+
+        return user_id
     
     def deactivate_user(self, user_id: str) -> bool:
         # find and update:
@@ -66,47 +102,53 @@ class UserModel:
         )
 
         return result.modified_count > 0
-    def delete_user_with_data(self, user_id: str) -> dict:
-        oid = ObjectId(user_id)
+    def delete_user_with_data(self, user_id: str, wait: bool = False) -> dict:
+        """
+        Purge a user and their data in a background job (database/job_model.py):
+        transactions, budgets, custom categories, rollups, then the user document.
 
-        # 1. Xoá tất cả transactions của user
-        tx_filter = {"user_id": oid}
-        transactions_deleted = self.transaction_collection.count_documents(tx_filter)
-        self.transaction_collection.delete_many(tx_filter)
+        The account is deactivated first, so it cannot log in while the purge runs.
 
-        # 2. Xoá tất cả budgets của user
-        budget_filter = {"user_id": oid}
-        budgets_deleted = self.budget_collection.count_documents(budget_filter)
-        self.budget_collection.delete_many(budget_filter)
-
-        # 3. Xoá custom categories của user (giữ lại system defaults)
-        default_names = set(
-            config.DEFAULT_CATEGORIES_EXPENSE + config.DEFAULT_CATEGORIES_INCOME
+        Args:
+            user_id: User to delete
+            wait: Run the job in the calling thread and return its counts
+        """
+        oid = ObjectId(user_id)
+        self.collection.update_one(
+            {"_id": oid},
+            {"$set": {"is_activate": False, "last_modified": datetime.now()}},
         )
-
-        category_filter = {
-            "user_id": oid,
-            "name": {"$nin": list(default_names)},  # chỉ xoá category không nằm trong default list
-        }
-        categories_deleted = self.category_collection.count_documents(category_filter)
-        self.category_collection.delete_many(category_filter)
-
-        # 4. Cuối cùng: xoá user document
-        user_result = self.collection.delete_one({"_id": oid})
-        user_deleted = user_result.deleted_count
-
+        query_cache.bump_version(oid)
+
+        job_model = JobModel(user_id)
+        job_id = job_model.start(PURGE_USER)
+        if not wait:
+            return {
+                "job_id": job_id,
+                "message": "Account deletion started, it continues in the background.",
+            }
+
+        job = job_model.run_now(job_id)
+        return self.purge_summary(job)
+
+    @staticmethod
+    def purge_summary(job: dict) -> dict:
+        """Counts of a finished purge job."""
+        processed = {step["name"]: step["processed"] for step in job["steps"]}
+        user_deleted = int(job["status"] == DONE)
         message = (
             f"Deleted: {user_deleted} user, "
-            f"{transactions_deleted} transactions, "
-            f"{budgets_deleted} budgets, "
-            f"{categories_deleted} categories"
+            f"{processed['transactions']} transactions, "
+            f"{processed['budgets']} budgets, "
+            f"{processed['categories']} categories"
         )
 
         return {
+            "job_id": str(job["_id"]),
             "user_deleted": user_deleted,
-            "transactions_deleted": transactions_deleted,
-            "budgets_deleted": budgets_deleted,
-            "categories_deleted": categories_deleted,
+            "transactions_deleted": processed["transactions"],
+            "budgets_deleted": processed["budgets"],
+            "categories_deleted": processed["categories"],
             "message": message,
         }
 
@@ -0,0 +1,238 @@
+"""
+Streaming export of a user's transactions to CSV, JSONL or Parquet.
+
+Transactions are read from TransactionModel.iter_transactions (a batched cursor) and encoded batch by batch, so
+memory stays bounded by one batch whatever the size of the history:
+
+- iter_export() yields encoded CSV/JSONL bytes (for any streaming consumer)
+- export_to_file() writes any format to a file, Parquet in row groups of
+  PARQUET_ROW_GROUP_ROWS rows
+- open_export() returns a readable binary file of any format, for
+  consumers that want a file object
+
+The bound holds up to the consumer: st.download_button reads the file it
+is given into one bytes object, so the transaction page builds it only on
+click and refuses exports above config.EXPORT_DOWNLOAD_MAX_ROWS.
+
+Parquet needs pyarrow (pip install pyarrow).
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from itertools import batched
+from typing import Callable, Iterator, Optional
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pq is not None
+
+CSV = "csv"
+JSONL = "jsonl"
+PARQUET = "parquet"
+FORMATS = (CSV, JSONL, PARQUET)
+
+MIME_TYPES = {
+    CSV: "text/csv",
+    JSONL: "application/x-ndjson",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+EXPORT_FIELDS = ["date", "type", "category", "amount", "description"]
+
+# cursor batches are buffered into row groups of about this many rows
+PARQUET_ROW_GROUP_ROWS = 100_000
+
+
+def _batches(transaction_model, filters: Optional[dict], batch_size: int) -> Iterator[tuple[dict, ...]]:
+    """Tuples of at most batch_size documents, read from one cursor."""
+    documents = transaction_model.iter_transactions(filters, batch_size=batch_size, fields=EXPORT_FIELDS)
+    return batched(documents, batch_size)
+
+
+def _row(doc: dict) -> list:
+    date = doc.get("date")
+    return [
+        date.isoformat() if isinstance(date, datetime) else date,
+        doc.get("type"),
+        doc.get("category"),
+        doc.get("amount"),
+        doc.get("description") or "",
+    ]
+
+
+def _encode_csv(rows: list[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_jsonl(batch: tuple[dict, ...]) -> bytes:
+    lines = (json.dumps(dict(zip(EXPORT_FIELDS, _row(doc))), ensure_ascii=False) for doc in batch)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _encoded_batches(transaction_model, file_format, filters, batch_size) -> Iterator[tuple[int, bytes]]:
+    """(rows, encoded bytes) per batch, CSV starts with its header."""
+    if file_format == CSV:
+        yield 0, _encode_csv([EXPORT_FIELDS])
+        for batch in _batches(transaction_model, filters, batch_size):
+            yield len(batch), _encode_csv([_row(doc) for doc in batch])
+    elif file_format == JSONL:
+        for batch in _batches(transaction_model, filters, batch_size):
+            yield len(batch), _encode_jsonl(batch)
+    else:
+        raise ValueError(f"Streaming is not supported for '{file_format}'")
+
+
+def iter_export(
+    transaction_model,
+    file_format: str = CSV,
+    filters: Optional[dict] = None,
+    batch_size: int = config.TRANSACTION_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the encoded export (CSV or JSONL) one batch at a time.
+
+    Args:
+        transaction_model: User-bound TransactionModel
+        file_format: CSV or JSONL (Parquet needs a seekable file, see export_to_file)
+        filters: Same filter dict accepted by TransactionModel.get_transactions
+        batch_size: Documents per cursor batch and per encoded chunk
+    """
+    for _, chunk in _encoded_batches(transaction_model, file_format, filters, batch_size):
+        yield chunk
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("date", pa.timestamp("ms")),
+        ("type", pa.dictionary(pa.int8(), pa.string())),
+        ("category", pa.dictionary(pa.int16(), pa.string())),
+        ("amount", pa.float64()),
+        ("description", pa.string()),
+    ])
+
+
+def _parquet_table(batch: tuple[dict, ...], schema):
+    columns = {field: [doc.get(field) for doc in batch] for field in EXPORT_FIELDS}
+    return pa.table(
+        {
+            "date": pa.array(columns["date"], pa.timestamp("ms")),
+            "type": pa.array(columns["type"], pa.string()).dictionary_encode(),
+            "category": pa.array(columns["category"], pa.string()).dictionary_encode(),
+            "amount": pa.array(columns["amount"], pa.float64()),
+            "description": pa.array(columns["description"], pa.string()),
+        }
+    ).cast(schema)
+
+
+def export_to_file(
+    transaction_model,
+    path: str,
+    file_format: str = CSV,
+    filters: Optional[dict] = None,
+    batch_size: int = config.TRANSACTION_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write the export to `path`, one batch at a time.
+
+    Args:
+        transaction_model: User-bound TransactionModel
+        path: Output file
+        file_format: CSV, JSONL or PARQUET
+        filters: Same filter dict accepted by TransactionModel.get_transactions
+        batch_size: Documents per cursor batch
+        progress: Called with the number of rows written after each batch
+
+    Returns:
+        number of rows written
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}'")
+
+    rows = 0
+    if file_format == PARQUET:
+        if pq is None:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+
+        schema = _parquet_schema()
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            tables, buffered = [], 0
+            for batch in _batches(transaction_model, filters, batch_size):
+                tables.append(_parquet_table(batch, schema))
+                buffered += len(batch)
+                if buffered >= PARQUET_ROW_GROUP_ROWS:
+                    writer.write_table(pa.concat_tables(tables))
+                    tables, buffered = [], 0
+                rows += len(batch)
+                if progress:
+                    progress(rows)
+            if tables:
+                writer.write_table(pa.concat_tables(tables))
+        return rows
+
+    with open(path, "wb") as file:
+        for count, chunk in _encoded_batches(transaction_model, file_format, filters, batch_size):
+            file.write(chunk)
+            rows += count
+            if progress and count:
+                progress(rows)
+    return rows
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def open_export(
+    transaction_model,
+    file_format: str = CSV,
+    filters: Optional[dict] = None,
+    batch_size: int = config.TRANSACTION_BATCH_SIZE,
+) -> io.BufferedIOBase:
+    """
+    The export as a readable binary file, produced while it is read.
+
+    CSV/JSONL stream from iter_export. Parquet is written to a temporary
+    file first (its footer needs a seekable file); the file is unlinked
+    right away and disappears when the returned handle is closed.
+    """
+    if file_format != PARQUET:
+        return io.BufferedReader(_ChunkReader(iter_export(transaction_model, file_format, filters, batch_size)))
+
+    fd, path = tempfile.mkstemp(suffix=f".{PARQUET}")
+    os.close(fd)
+    try:
+        export_to_file(transaction_model, path, PARQUET, filters, batch_size)
+        return open(path, "rb")
+    finally:
+        os.remove(path)
@@ -0,0 +1,307 @@
+"""
+Streaming bank-statement importer (CSV and OFX/QFX).
+
+Files are read as a stream, row by row, and fed to
+TransactionModel.add_transactions_bulk in chunks, so memory stays constant
+whatever the file size.
+
+Every row gets an import_hash. The unique (user_id, import_hash) index makes
+re-imports idempotent: rows that were already imported are rejected by the
+server and reported as duplicates.
+
+- OFX rows hash the bank's transaction id (FITID) when there is one.
+- Other rows hash their content (date, type, amount, description, category)
+  plus an occurrence counter. Two identical rows of one file, such as two
+  coffees on the same day, get counters 0 and 1 wherever they are in the
+  file: both are imported once, and neither is imported again. The counters
+  are kept per content digest for the whole file (32 bytes per distinct row).
+"""
+import csv
+import hashlib
+import io
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+import config
+from utils import handler_datetime
+
+CSV = "csv"
+OFX = "ofx"
+
+# category of rows without a category column (exists for both types by default)
+DEFAULT_CATEGORY = "Others"
+
+# CSV column mapping keys; date and amount are required
+MAPPING_FIELDS = ("date", "amount", "description", "type", "category")
+
+_READ_SIZE = 64 * 1024
+
+
+def detect_format(filename: str) -> str:
+    return OFX if filename.lower().endswith((".ofx", ".qfx")) else CSV
+
+
+@contextmanager
+def _text_stream(file) -> Iterator[io.TextIOBase]:
+    """Decode an uploaded (binary) file lazily, without closing it afterwards."""
+    if isinstance(file, io.TextIOBase):
+        yield file
+        return
+
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        yield stream
+    finally:
+        stream.detach()
+
+
+def read_csv_header(file) -> list[str]:
+    """Column names of a CSV file (the stream is rewound afterwards)."""
+    with _text_stream(file) as stream:
+        header = next(csv.reader(stream), [])
+    file.seek(0)
+    return [column.strip() for column in header]
+
+
+# -----------------------------
+# Value parsing
+# -----------------------------
+def parse_amount(value) -> Optional[float]:
+    """'1,234.50', '$-12.00', '(12.00)' -> float, None when unreadable."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip()
+    negative = text.startswith("(") and text.endswith(")")
+    text = re.sub(r"[^\d.\-]", "", text)
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return -abs(amount) if negative else amount
+
+
+def parse_date(value, date_format: Optional[str] = None) -> Optional[datetime]:
+    if value is None or not str(value).strip():
+        return None
+    text = str(value).strip()
+    try:
+        if date_format:
+            return datetime.strptime(text, date_format)
+        return handler_datetime(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_ofx_date(value: str) -> Optional[datetime]:
+    """OFX dates: YYYYMMDD[HHMMSS[.XXX]][TZ]"""
+    digits = re.match(r"\d{8}(\d{6})?", value.strip())
+    if not digits:
+        return None
+    text = digits.group(0)
+    try:
+        return datetime.strptime(text, "%Y%m%d%H%M%S" if len(text) == 14 else "%Y%m%d")
+    except ValueError:
+        # e.g. month 13 or second 61: reported as a row error
+        return None
+
+
+def parse_type(value, amount: Optional[float]) -> Optional[str]:
+    """Explicit type column (Expense/Income, debit/credit) or the amount sign."""
+    if value is not None and str(value).strip():
+        text = str(value).strip().lower()
+        for transaction_type in config.TRANSACTION_TYPES:
+            if text == transaction_type.lower():
+                return transaction_type
+        if text in ("debit", "dr", "withdrawal", "payment"):
+            return "Expense"
+        if text in ("credit", "cr", "deposit"):
+            return "Income"
+        return str(value).strip()
+    if amount is None:
+        return None
+    return "Expense" if amount < 0 else "Income"
+
+
+# -----------------------------
+# Rows
+# -----------------------------
+def _content_key(row: dict) -> str:
+    date = row["date"].isoformat() if isinstance(row.get("date"), datetime) else str(row.get("date"))
+    amount = f"{row['amount']:.2f}" if isinstance(row.get("amount"), float) else str(row.get("amount"))
+    return "\x1f".join((date, str(row.get("type")), amount, row.get("description") or "", str(row.get("category"))))
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1e".join(parts).encode()).hexdigest()
+
+
+def with_import_hashes(rows: Iterable[dict]) -> Iterator[dict]:
+    """Add import_hash to every row (see module docstring)."""
+    occurrences: dict[bytes, int] = {}
+    for row in rows:
+        external_id = row.pop("external_id", None)
+        if external_id:
+            row["import_hash"] = _hash("id", external_id)
+            yield row
+            continue
+
+        if not isinstance(row.get("date"), datetime) or not isinstance(row.get("amount"), float):
+            # row error (see _normalize): add_transactions_bulk reports it
+            yield row
+            continue
+
+        key = _content_key(row)
+        digest = hashlib.sha256(key.encode()).digest()
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        row["import_hash"] = _hash("row", key, str(occurrence))
+        yield row
+
+
+def _normalize(raw: dict) -> dict:
+    """
+    Signed amount + optional type -> positive amount + Expense/Income.
+
+    An unreadable date or amount makes the row an error (see
+    add_transactions_bulk): inserted as is it would have no import_hash,
+    so no re-import protection.
+    """
+    amount = raw.get("amount")
+    row = {
+        "type": parse_type(raw.get("type"), amount),
+        "category": (raw.get("category") or "").strip() or DEFAULT_CATEGORY,
+        "amount": abs(amount) if isinstance(amount, float) else raw.get("raw_amount"),
+        "date": raw.get("date"),
+        "description": (raw.get("description") or "").strip(),
+    }
+    if row["date"] is None:
+        raw_date = raw.get("raw_date")
+        row["error"] = (
+            f"Unreadable date '{raw_date}'." if raw_date and str(raw_date).strip() else "Date is required."
+        )
+    elif not isinstance(amount, float):
+        raw_amount = raw.get("raw_amount")
+        row["error"] = (
+            f"Unreadable amount '{raw_amount}'." if raw_amount and str(raw_amount).strip() else "Amount is required."
+        )
+    if raw.get("external_id"):
+        row["external_id"] = raw["external_id"]
+    return row
+
+
+def iter_csv_rows(file, mapping: dict, date_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream a CSV file as transaction rows.
+
+    Args:
+        file: Binary or text file object
+        mapping: {field: column name} for MAPPING_FIELDS (date and amount required)
+        date_format: strptime format of the date column (None = ISO)
+    """
+    missing = [field for field in ("date", "amount") if not mapping.get(field)]
+    if missing:
+        raise ValueError(f"Column mapping is missing: {', '.join(missing)}")
+
+    with _text_stream(file) as stream:
+        for record in csv.DictReader(stream):
+            record = {(key or "").strip(): value for key, value in record.items()}
+
+            def column(field):
+                name = mapping.get(field)
+                return record.get(name) if name else None
+
+            raw_amount = column("amount")
+            raw_date = column("date")
+            yield _normalize({
+                "amount": parse_amount(raw_amount),
+                "raw_amount": raw_amount,
+                "date": parse_date(raw_date, date_format),
+                "raw_date": raw_date,
+                "type": column("type"),
+                "category": column("category"),
+                "description": column("description"),
+            })
+
+
+def _ofx_tokens(stream) -> Iterator[tuple[str, str]]:
+    """(tag, text) pairs of an OFX file, SGML (no closing tags) or XML, read in chunks."""
+    buffer = ""
+    while True:
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        parts = buffer.split("<")
+        buffer = parts.pop()  # may be incomplete
+        for part in parts:
+            tag, _, text = part.partition(">")
+            if tag:
+                yield tag.strip().upper(), text.strip()
+    if buffer:
+        tag, _, text = buffer.partition(">")
+        yield tag.strip().upper(), text.strip()
+
+
+def iter_ofx_rows(file) -> Iterator[dict]:
+    """Stream the <STMTTRN> entries of an OFX/QFX file as transaction rows."""
+    entry = None
+    with _text_stream(file) as stream:
+        for tag, text in _ofx_tokens(stream):
+            if tag == "STMTTRN":
+                entry = {}
+            elif tag == "/STMTTRN" and entry is not None:
+                name, memo = entry.get("NAME", ""), entry.get("MEMO", "")
+                description = name if not memo or memo == name else f"{name} - {memo}".strip(" -")
+                yield _normalize({
+                    "amount": parse_amount(entry.get("TRNAMT")),
+                    "raw_amount": entry.get("TRNAMT"),
+                    "date": parse_ofx_date(entry.get("DTPOSTED", "")),
+                    "raw_date": entry.get("DTPOSTED"),
+                    "description": description,
+                    "external_id": entry.get("FITID"),
+                })
+                entry = None
+            elif entry is not None and not tag.startswith("/"):
+                entry[tag] = text
+
+
+def import_statement(
+    transaction_model,
+    file,
+    file_format: str = CSV,
+    mapping: Optional[dict] = None,
+    date_format: Optional[str] = None,
+    progress: Optional[Callable[[int, float], None]] = None,
+) -> dict:
+    """
+    Import a bank statement into the model's user.
+
+    Args:
+        transaction_model: User-bound TransactionModel
+        file: Binary file object (e.g. a Streamlit UploadedFile)
+        file_format: CSV or OFX
+        mapping: CSV column mapping (see iter_csv_rows)
+        date_format: CSV date format (None = ISO)
+        progress: Called with (rows processed, fraction of the file read)
+
+    Returns:
+        add_transactions_bulk result ({"inserted", "duplicates", "errors", "message"})
+    """
+    total_size = file.seek(0, io.SEEK_END) or 1
+    file.seek(0)
+
+    if file_format == OFX:
+        rows = iter_ofx_rows(file)
+    else:
+        rows = iter_csv_rows(file, mapping or {}, date_format)
+
+    def report(processed: int):
+        if progress:
+            progress(processed, min(file.tell() / total_size, 1.0))
+
+    return transaction_model.add_transactions_bulk(with_import_hashes(rows), progress=report)
@@ -0,0 +1,39 @@
+"""
+Add search_tokens to transactions created before description search was indexed.
+
+Run from the project root:
+    python -m scripts.backfill_search_tokens
+    python -m scripts.backfill_search_tokens --all   # recompute every transaction
+"""
+import argparse
+
+from pymongo import UpdateOne
+
+import config
+from database.database_manager import DatabaseManager, maintenance_timeout
+from database.text_search import search_tokens
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill transaction search tokens")
+    parser.add_argument("--all", action="store_true", help="Recompute tokens of every transaction")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with maintenance_timeout():
+        collection = DatabaseManager().get_collection(config.COLLECTIONS["transaction"])
+        query = {} if args.all else {"search_tokens": {"$exists": False}}
+
+        updated = 0
+        batch = []
+        for doc in collection.find(query, {"description": 1}, batch_size=args.batch_size):
+            batch.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"search_tokens": search_tokens(doc.get("description"))}},
+            ))
+            if len(batch) == args.batch_size:
+                updated += collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+
+    print(f"Updated search tokens of {updated} transactions")
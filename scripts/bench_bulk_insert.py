@@ -0,0 +1,64 @@
+"""
+Benchmark: add_transaction one row at a time vs add_transactions_bulk.
+
+Bootstraps a throw-away user in the configured database, imports synthetic
+transactions both ways and prints rows per second. The user and its data
+are deleted afterwards.
+
+Run from the project root:
+    python -m scripts.bench_bulk_insert --rows 50000 --single-rows 2000
+"""
+import argparse
+import time
+import uuid
+
+import config
+from database import CategoryModel, TransactionModel, UserModel
+from scripts.bench_frame_loading import synthetic_transactions
+
+
+def rows_for_user(rows: int):
+    """Synthetic rows restricted to the default categories of each type."""
+    for doc in synthetic_transactions(rows):
+        if doc["type"] == "Expense":
+            doc["category"] = config.DEFAULT_CATEGORIES_EXPENSE[rows % len(config.DEFAULT_CATEGORIES_EXPENSE)]
+        else:
+            doc["category"] = config.DEFAULT_CATEGORIES_INCOME[0]
+        rows -= 1
+        yield doc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk transaction ingestion")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single-rows", type=int, default=2_000,
+                        help="Rows inserted one at a time (slow path)")
+    parser.add_argument("--chunk-size", type=int, default=config.BULK_INSERT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    user_model = UserModel()
+    user_id = user_model.bootstrap(f"bench-bulk-{uuid.uuid4().hex}@example.com")
+    transaction_model = TransactionModel(user_id)
+
+    try:
+        started = time.perf_counter()
+        for doc in rows_for_user(args.single_rows):
+            transaction_model.add_transaction(
+                transaction_type=doc["type"],
+                category=doc["category"],
+                amount=doc["amount"],
+                transaction_date=doc["date"],
+                description=doc["description"],
+            )
+        elapsed = time.perf_counter() - started
+        print(f"add_transaction       {args.single_rows:>8,} rows {elapsed:8.2f} s "
+              f"{args.single_rows / elapsed:10,.0f} rows/s")
+
+        started = time.perf_counter()
+        result = transaction_model.add_transactions_bulk(rows_for_user(args.rows), chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"add_transactions_bulk {result['inserted']:>8,} rows {elapsed:8.2f} s "
+              f"{result['inserted'] / elapsed:10,.0f} rows/s  ({len(result['errors'])} errors)")
+    finally:
+        user_model.delete_user_with_data(user_id, wait=True)
+        CategoryModel(user_id).collection.delete_many({"user_id": transaction_model.user_id})
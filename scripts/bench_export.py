@@ -0,0 +1,95 @@
+"""
+Benchmark: streaming export (exporters.transaction_exporter) vs get_transactions.
+
+Seeds a synthetic user with --rows transactions in the configured database,
+then exports them once per format. Every export runs in a fresh process so
+its peak RSS is measured on its own. Reports rows, seconds, MB/s (output
+size) and peak RSS. The synthetic user is deleted afterwards.
+
+Run from the project root:
+    python -m scripts.bench_export --rows 2000000
+    python -m scripts.bench_export --rows 2000000 --naive   # also time get_transactions + pandas
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import config
+from bson.objectid import ObjectId
+
+from scripts.bench_frame_loading import synthetic_transactions
+
+
+def seed(collection, user_id: ObjectId, rows: int):
+    batch = []
+    for doc in synthetic_transactions(rows):
+        doc["user_id"] = user_id
+        batch.append(doc)
+        if len(batch) == 10_000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def run_export(user_id: str, file_format: str, path: str, batch_size: int):
+    """Child process: one export, returns (rows, seconds, peak RSS in MiB)."""
+    from database import TransactionModel
+    from exporters.transaction_exporter import export_to_file
+
+    model = TransactionModel(user_id)
+    started = time.perf_counter()
+    if file_format == "naive-csv":
+        import pandas as pd
+
+        df = pd.DataFrame(model.get_transactions(fields=["date", "type", "category", "amount", "description"]))
+        df.to_csv(path, index=False)
+        rows = len(df)
+    else:
+        rows = export_to_file(model, path, file_format=file_format, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return rows, elapsed, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming transaction export")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=config.TRANSACTION_BATCH_SIZE)
+    parser.add_argument("--naive", action="store_true", help="Also run get_transactions + DataFrame.to_csv")
+    args = parser.parse_args()
+
+    from database.database_manager import DatabaseManager
+    from exporters.transaction_exporter import FORMATS, pq
+
+    collection = DatabaseManager().get_collection(config.COLLECTIONS["transaction"])
+    user_id = ObjectId()
+    print(f"Seeding {args.rows:,} transactions...")
+    seed(collection, user_id, args.rows)
+
+    formats = [f for f in FORMATS if f != "parquet" or pq is not None]
+    if args.naive:
+        formats.append("naive-csv")
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        for file_format in formats:
+            fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+            os.close(fd)
+            try:
+                with context.Pool(1) as pool:
+                    rows, elapsed, peak = pool.apply(run_export, (str(user_id), file_format, path, args.batch_size))
+                size = os.path.getsize(path) / 2**20
+                print(
+                    f"{file_format:<10} {rows:>10,} rows {elapsed:8.2f} s "
+                    f"{size:9.1f} MiB {size / elapsed:8.1f} MB/s   peak RSS {peak:8.1f} MiB"
+                )
+            finally:
+                os.remove(path)
+    finally:
+        collection.delete_many({"user_id": user_id})
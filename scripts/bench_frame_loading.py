@@ -0,0 +1,97 @@
+"""
+Benchmark: list-of-dicts DataFrame vs column-wise decoding (analytics.frame_loader).
+
+Default mode needs no database: synthetic transactions are BSON-encoded once
+and decoded per document on every run, like a pymongo cursor does.
+--mongo seeds a throw-away collection in the configured database and runs
+both paths against the server (uses pymongoarrow if it is installed).
+
+Run from the project root:
+    python -m scripts.bench_frame_loading --rows 500000
+    python -m scripts.bench_frame_loading --rows 500000 --mongo
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import bson
+import pandas as pd
+
+from analytics.analyzer import TRANSACTION_SCHEMA, DEFAULT_FRAME_FIELDS
+from analytics.frame_loader import frame_from_cursor, load_frame
+
+CATEGORIES = ["Shopping", "Transportation", "Entertainment", "Others", "Food", "Rent"]
+
+
+def synthetic_transactions(rows: int):
+    start = datetime(2020, 1, 1)
+    rng = random.Random(42)
+    for i in range(rows):
+        yield {
+            "type": "Expense" if rng.random() < 0.9 else "Income",
+            "category": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(1, 500), 2),
+            "date": start + timedelta(minutes=7 * i),
+            "description": f"synthetic transaction {i % 1000}",
+        }
+
+
+def measure(label: str, load):
+    """Time one run, then trace peak Python memory of a second run (tracemalloc slows it down)."""
+    started = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    df = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} {elapsed:8.2f} s   peak {peak / 2**20:9.1f} MiB   "
+        f"frame {df.memory_usage(deep=True).sum() / 2**20:9.1f} MiB"
+    )
+    return df
+
+
+def dict_path(cursor):
+    df = pd.DataFrame(list(cursor))
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark analytics DataFrame loading")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--mongo", action="store_true", help="Run against the configured database")
+    args = parser.parse_args()
+
+    schema = {field: TRANSACTION_SCHEMA[field] for field in DEFAULT_FRAME_FIELDS}
+    print(f"{args.rows:,} rows")
+
+    if not args.mongo:
+        encoded = [bson.encode(doc) for doc in synthetic_transactions(args.rows)]
+
+        measure("list of dicts", lambda: dict_path(bson.decode(raw) for raw in encoded))
+        measure("column-wise", lambda: frame_from_cursor((bson.decode(raw) for raw in encoded), schema))
+    else:
+        from database.database_manager import DatabaseManager
+
+        collection = DatabaseManager().get_collection("bench_frame_loading")
+        collection.drop()
+        batch = []
+        for doc in synthetic_transactions(args.rows):
+            batch.append(doc)
+            if len(batch) == 10_000:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+
+        try:
+            projection = {field: 1 for field in schema} | {"_id": 0}
+            measure("list of dicts", lambda: dict_path(collection.find({}, projection)))
+            measure("load_frame", lambda: load_frame(collection, {}, schema))
+        finally:
+            collection.drop()
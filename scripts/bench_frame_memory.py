@@ -0,0 +1,55 @@
+"""
+Benchmark: per-row memory of the analytics DataFrame.
+
+Compares the frame built from whole documents (what the analyzer used to do:
+pd.DataFrame(get_transactions())) with the compact frame built by
+analytics.frame_loader with TRANSACTION_SCHEMA (categorical type/category,
+int cents, datetime64, no id columns).
+
+Run from the project root:
+    python -m scripts.bench_frame_memory --rows 500000
+"""
+import argparse
+from datetime import datetime
+
+import pandas as pd
+from bson.objectid import ObjectId
+
+from analytics.analyzer import TRANSACTION_SCHEMA, DEFAULT_FRAME_FIELDS
+from analytics.frame_loader import frame_from_cursor
+from scripts.bench_frame_loading import synthetic_transactions
+
+
+def full_documents(rows: int):
+    user_id = ObjectId()
+    now = datetime.now()
+    for doc in synthetic_transactions(rows):
+        yield {
+            "_id": ObjectId(),
+            **doc,
+            "created_at": now,
+            "last_modified": now,
+            "user_id": user_id,
+        }
+
+
+def report(label: str, df: pd.DataFrame, rows: int):
+    usage = df.memory_usage(deep=True)
+    print(f"{label}: {usage.sum() / rows:7.1f} bytes/row, {usage.sum() / 2**20:8.1f} MiB")
+    for column, dtype in df.dtypes.items():
+        print(f"    {column:<14} {str(dtype):<16} {usage[column] / rows:7.1f} bytes/row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark analytics DataFrame memory per row")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    before = pd.DataFrame(list(full_documents(args.rows)))
+    before["date"] = pd.to_datetime(before["date"])
+    report("before (whole documents)", before, args.rows)
+    del before
+
+    schema = {field: TRANSACTION_SCHEMA[field] for field in DEFAULT_FRAME_FIELDS}
+    after = frame_from_cursor(full_documents(args.rows), schema)
+    report("after (compact frame)", after, args.rows)
@@ -0,0 +1,148 @@
+"""
+Benchmark: OLTP throughput under concurrent sessions for several pool setups.
+
+OLTP sessions (threads, like Streamlit script threads) each add a
+transaction and read the first page of their list in a loop, while
+analytics sessions run dashboard aggregates and frame loads over a seeded
+history. Each profile connects with its own MongoClient options and prints
+OLTP ops/s with p50/p95 latency, next to analytics ops/s:
+
+- shared-10:  every workload on one client of 10 connections (old setup)
+- split-10-4: OLTP pool of 10, analytics pool of 4
+- config:     config.MONGO_CLIENT_OPTIONS as is
+
+The query cache is disabled so every call reaches the database. Users and
+their data are deleted afterwards.
+
+Run from the project root:
+    python -m scripts.bench_pool_concurrency --sessions 32 --analytics-sessions 8 --seconds 15
+"""
+import argparse
+import copy
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+import config
+from analytics.analyzer import FinanceAnalyzer
+from database import CategoryModel, TransactionModel, UserModel
+from database.database_manager import DatabaseManager
+from database.query_cache import query_cache
+from scripts.bench_bulk_insert import rows_for_user
+
+CONFIGURED_OPTIONS = copy.deepcopy(config.MONGO_CLIENT_OPTIONS)
+
+# name -> (OLTP overrides, analytics overrides or None = share the OLTP client)
+PROFILES = {
+    "shared-10": ({"maxPoolSize": 10}, None),
+    "split-10-4": ({"maxPoolSize": 10}, {"maxPoolSize": 4}),
+    "config": ({}, {}),
+}
+
+
+def connect(oltp: dict, analytics) -> DatabaseManager:
+    """Replace the process-wide DatabaseManager with one using these options."""
+    if DatabaseManager._instance is not None:
+        DatabaseManager._instance.close_connection()
+        DatabaseManager._instance = None
+
+    config.MONGO_CLIENT_OPTIONS = {
+        "oltp": {**CONFIGURED_OPTIONS["oltp"], **oltp},
+        "analytics": {**CONFIGURED_OPTIONS["analytics"], **(analytics or {})},
+    }
+    manager = DatabaseManager()
+    if analytics is None:
+        manager.analytics_client.close()
+        manager.analytics_client = manager.client
+        manager.analytics_db = manager.db
+    return manager
+
+
+def oltp_session(user_id: str, deadline: float, latencies: list):
+    transaction_model = TransactionModel(user_id)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        transaction_model.add_transaction(
+            transaction_type="Expense",
+            category=config.DEFAULT_CATEGORIES_EXPENSE[0],
+            amount=1.0,
+            transaction_date=datetime.now(),
+        )
+        transaction_model.get_transactions_page()
+        latencies.append(time.perf_counter() - started)
+
+
+def analytics_session(user_id: str, deadline: float, counter: list):
+    analyzer = FinanceAnalyzer(TransactionModel(user_id))
+    start = datetime.now() - timedelta(days=5 * 365)
+    while time.perf_counter() < deadline:
+        analyzer.get_dashboard_snapshot(start, datetime.now(), months=12)
+        analyzer.get_statistics_summary(start, datetime.now())
+        analyzer.get_transactions_dataframe()
+        counter.append(1)
+
+
+def run_profile(name: str, oltp_users: list, seed_user: str, analytics_sessions: int, seconds: float):
+    oltp, analytics = PROFILES[name]
+    connect(oltp, analytics)
+
+    deadline = time.perf_counter() + seconds
+    latencies, analytics_runs = [], []
+    threads = [
+        threading.Thread(target=oltp_session, args=(user_id, deadline, latencies))
+        for user_id in oltp_users
+    ]
+    threads += [
+        threading.Thread(target=analytics_session, args=(seed_user, deadline, analytics_runs))
+        for _ in range(analytics_sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not latencies:
+        print(f"{name:<11} no OLTP operation finished")
+        return
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<11} OLTP {len(latencies) / seconds:8.1f} ops/s  "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+          f"analytics {len(analytics_runs) / seconds:6.2f} runs/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark connection pool settings under concurrency")
+    parser.add_argument("--sessions", type=int, default=32, help="Concurrent OLTP sessions")
+    parser.add_argument("--analytics-sessions", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--rows", type=int, default=50_000, help="Seeded history of the analytics user")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    # measure the database, not the cache
+    query_cache.max_entries = 0
+
+    user_model = UserModel()
+    seed_user = user_model.bootstrap(f"bench-pool-{uuid.uuid4().hex}@example.com")
+    oltp_users = [
+        user_model.bootstrap(f"bench-pool-{uuid.uuid4().hex}@example.com")
+        for _ in range(args.sessions)
+    ]
+
+    try:
+        TransactionModel(seed_user).add_transactions_bulk(rows_for_user(args.rows))
+        print(f"{args.sessions} OLTP sessions, {args.analytics_sessions} analytics sessions, "
+              f"{args.rows:,} seeded rows, {args.seconds:.0f} s per profile")
+        for name in args.profiles:
+            run_profile(name, oltp_users, seed_user, args.analytics_sessions, args.seconds)
+    finally:
+        # models built on the current DatabaseManager (the first one is closed)
+        user_model = UserModel()
+        for user_id in [seed_user, *oltp_users]:
+            user_model.delete_user_with_data(user_id, wait=True)
+            CategoryModel(user_id).collection.delete_many({"user_id": ObjectId(user_id)})
@@ -0,0 +1,61 @@
+"""
+Explain-based check: category filters must be served by an index.
+
+Seeds the index advisor database, then explains every query shape with a
+category multi-select or a category prefix (alone and combined with the
+other filters), as the full list and as the first page. Each winning plan
+must use IXSCAN, with no COLLSCAN and no in-memory SORT.
+
+Run from the project root (needs a MongoDB server, see config.py):
+    python -m scripts.check_category_filter_plans --rows 50000
+"""
+import argparse
+import sys
+
+import config
+from database.database_manager import DatabaseManager
+from database.query_compiler import is_text_search
+from scripts.index_advisor import explain, plan_stages, query_shapes, seed, seeded_model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that category filters use an index")
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    manager = DatabaseManager()
+    db = manager.client[f"{manager.db.name}_index_advisor"]
+    user_ids = seed(db, args.rows, with_indexes=True)
+
+    errors = []
+    checked = 0
+    try:
+        model = seeded_model(db, user_ids[0])
+        if model.match_categories("SH") != ["Shopping"]:
+            errors.append(f"prefix 'SH' matched {model.match_categories('SH')}")
+
+        for label, filters in query_shapes():
+            if "categories" not in label and "category_prefix" not in label:
+                continue
+            query = model.build_query(filters)
+            for mode, limit in (("list", 0), ("page", config.TRANSACTIONS_PAGE_SIZE + 1)):
+                result = explain(db, query, limit)
+                stages = {stage.get("stage") for stage in plan_stages(result["queryPlanner"]["winningPlan"])}
+                checked += 1
+                problems = []
+                if "IXSCAN" not in stages:
+                    problems.append("no IXSCAN")
+                if "COLLSCAN" in stages:
+                    problems.append("COLLSCAN")
+                # text searches are sorted by relevance, over the matches only
+                if "SORT" in stages and not is_text_search(query):
+                    problems.append("in-memory SORT")
+                if problems:
+                    errors.append(f"{mode} {label}: {', '.join(problems)} ({sorted(stages)})")
+    finally:
+        manager.client.drop_database(db.name)
+
+    if errors:
+        print("\n".join(errors))
+        print(f"FAILED: {len(errors)} of {checked} plans")
+        sys.exit(1)
+    print(f"OK: {checked} category filter plans use an index without an in-memory sort")
@@ -0,0 +1,79 @@
+"""
+Check that a category delete job that fails gives the category back.
+
+Bootstraps a throw-away user with a category and transactions, queues a
+cascade delete (the category is hidden right away), then breaks the job so
+that its chunks make no progress: a reassign onto the category itself.
+The job must end FAILED, and the category must be listed and usable again
+with its transactions and rollups untouched. The user and its data are
+deleted afterwards.
+
+Run from the project root (uses the configured database):
+    python -m scripts.check_failed_category_delete
+"""
+import sys
+import uuid
+from datetime import datetime
+
+import config
+from database import CategoryModel, TransactionModel, UserModel
+from database.job_model import FAILED, JobModel
+
+CATEGORY = "Check delete"
+
+
+def rollup_count(transaction_model: TransactionModel, category_id) -> int:
+    buckets = transaction_model.rollup_model.collection.find(
+        {"user_id": transaction_model.user_id, "category_id": category_id}
+    )
+    return sum(bucket["count"] for bucket in buckets)
+
+
+if __name__ == "__main__":
+    # fail on the first attempt instead of waiting for lease expiries
+    config.JOB_MAX_ATTEMPTS = 1
+
+    user_model = UserModel()
+    user_id = user_model.bootstrap(f"delete-check-{uuid.uuid4().hex}@example.com")
+    category_model = CategoryModel(user_id)
+    transaction_model = TransactionModel(user_id)
+    job_model = JobModel(user_id)
+
+    errors = []
+    try:
+        category_model.upsert_category("Expense", CATEGORY)
+        category_id = category_model.category_id("Expense", CATEGORY)
+        for day in range(1, 4):
+            transaction_model.add_transaction("Expense", CATEGORY, 10.0, datetime(2024, 1, day))
+
+        result = category_model.delete_category("Expense", CATEGORY, "cascade")
+        if category_model.category_id("Expense", CATEGORY) is not None:
+            errors.append("category still listed while its delete is queued")
+
+        # a step whose write leaves every document matching its filter
+        job_model.collection.update_one(
+            {"_id": job_model.get_job(result["job_id"])["_id"]},
+            {"$set": {"params.strategy": "reassign", "params.others_id": category_id}},
+        )
+        job = job_model.run_now(result["job_id"])
+
+        if job["status"] != FAILED:
+            errors.append(f"job ended {job['status']}, expected {FAILED}")
+        if category_model.category_id("Expense", CATEGORY) != category_id:
+            errors.append("category still hidden after the job failed")
+        if CATEGORY not in [category["name"] for category in category_model.get_categories_by_type("Expense")]:
+            errors.append("category missing from the category list after the job failed")
+        try:
+            transaction_model.add_transaction("Expense", CATEGORY, 5.0, datetime(2024, 1, 4))
+        except ValueError as e:
+            errors.append(f"category not usable after the job failed: {e}")
+        if rollup_count(transaction_model, category_id) != 4:
+            errors.append(f"rollups count {rollup_count(transaction_model, category_id)} transactions, expected 4")
+    finally:
+        user_model.delete_user_with_data(user_id, wait=True)
+        category_model.collection.delete_many({"user_id": category_model.user_id})
+
+    if errors:
+        print("\n".join(errors))
+        sys.exit(1)
+    print("OK: a failed category delete leaves the category listed and usable")
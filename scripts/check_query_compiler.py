@@ -0,0 +1,106 @@
+"""
+Check that equivalent filter dicts compile to the same filter and shape hash.
+
+No database needed. Run from the project root:
+    python -m scripts.check_query_compiler
+"""
+import sys
+from datetime import date, datetime
+
+from bson.objectid import ObjectId
+
+from database.query_compiler import add_conditions, compile_transaction_filter, shape_hash
+
+USER_ID = ObjectId()
+FOOD_ID = ObjectId()
+DRINKS_ID = ObjectId()
+RENT_ID = ObjectId()
+
+# each group lists filter dicts that must compile to one identical filter
+EQUIVALENT = {
+    "no filter": [None, {}, {"category_id": None, "search_text": "  "}],
+    "type + category": [
+        {"transaction_type": "Expense", "category_id": FOOD_ID},
+        {"category_id": FOOD_ID, "transaction_type": "Expense"},
+        {"category_id": [FOOD_ID], "transaction_type": "Expense"},
+    ],
+    "categories": [
+        {"category_id": [FOOD_ID, DRINKS_ID]},
+        {"category_id": [DRINKS_ID, FOOD_ID, FOOD_ID]},
+    ],
+    "amount range": [
+        {"min_amount": 10, "max_amount": 50},
+        {"max_amount": 50.0, "min_amount": 10.0},
+        {"max_amount": 50, "min_amount": 10, "category_id": None},
+    ],
+    "date range": [
+        {"start_date": date(2024, 1, 1), "end_date": date(2024, 1, 31)},
+        {"end_date": "2024-01-31", "start_date": datetime(2024, 1, 1)},
+    ],
+    "everything": [
+        {"transaction_type": "Expense", "category_id": FOOD_ID, "min_amount": 5,
+         "start_date": date(2024, 1, 1), "search_text": "coffee"},
+        {"search_text": " coffee ", "start_date": "2024-01-01", "min_amount": 5.0,
+         "category_id": FOOD_ID, "transaction_type": "Expense", "max_amount": 0},
+    ],
+}
+
+# each group lists filter dicts that must share one shape hash (different values)
+SAME_SHAPE = {
+    "type + amount": [
+        {"transaction_type": "Expense", "min_amount": 10},
+        {"min_amount": 99, "transaction_type": "Income"},
+    ],
+    # one query shape whatever the number of selected categories
+    "category selection": [
+        {"category_id": FOOD_ID},
+        {"category_id": [FOOD_ID, DRINKS_ID]},
+        {"category_id": [FOOD_ID, DRINKS_ID, RENT_ID]},
+        {"category_id": [DRINKS_ID, RENT_ID, FOOD_ID, ObjectId()]},
+    ],
+}
+
+
+def check() -> list[str]:
+    errors = []
+    for label, filters in EQUIVALENT.items():
+        compiled = [compile_transaction_filter(USER_ID, f) for f in filters]
+        first = compiled[0]
+        print(f"{label:<16} {shape_hash(first)}  {first}")
+
+        if any(c != first or list(c) != list(first) for c in compiled):
+            errors.append(f"{label}: compiled filters differ: {compiled}")
+        if len({shape_hash(c) for c in compiled}) != 1:
+            errors.append(f"{label}: shape hashes differ")
+        if next(iter(first)) != "user_id":
+            errors.append(f"{label}: user_id is not the first field")
+        if "$and" in first:
+            errors.append(f"{label}: filter is wrapped in $and")
+
+    for label, filters in SAME_SHAPE.items():
+        hashes = {shape_hash(compile_transaction_filter(USER_ID, f)) for f in filters}
+        if len(hashes) != 1:
+            errors.append(f"{label}: filters with the same shape hash differently: {hashes}")
+
+    merged = add_conditions(
+        compile_transaction_filter(USER_ID, {"start_date": date(2024, 1, 1)}),
+        {"date": {"$lte": datetime(2024, 2, 1)}},
+    )
+    if merged["date"] != {"$gte": datetime(2024, 1, 1), "$lte": datetime(2024, 2, 1)}:
+        errors.append(f"range predicates are not merged: {merged}")
+
+    try:
+        compile_transaction_filter(None, {})
+        errors.append("a filter without user_id was compiled")
+    except ValueError:
+        pass
+    return errors
+
+
+if __name__ == "__main__":
+    errors = check()
+    if errors:
+        print("\n".join(errors))
+        print(f"FAILED: {len(errors)} errors")
+        sys.exit(1)
+    print("OK: equivalent filters compile to one canonical filter and shape hash")
@@ -0,0 +1,79 @@
+"""
+Check that daily rollup buckets stay exact when transactions are edited.
+
+Bootstraps a throw-away user, writes two transactions into one bucket,
+edits the bucket's max / min / sum-only transaction and compares the bucket
+(sum, count, min, max) with the raw transactions after each step. The user
+and its data are deleted afterwards.
+
+Run from the project root (uses the configured database):
+    python -m scripts.check_rollup_updates
+"""
+import sys
+import uuid
+from datetime import datetime
+
+from database import CategoryModel, TransactionModel, UserModel
+from database.rollup_model import RollupModel
+
+DAY = datetime(2024, 1, 15)
+CATEGORY = "Shopping"
+
+
+def bucket(transaction_model: TransactionModel, day: datetime = DAY) -> dict:
+    category_id = transaction_model.category_model.category_id("Expense", CATEGORY)
+    doc = transaction_model.rollup_model.collection.find_one({
+        "user_id": transaction_model.user_id,
+        "day": RollupModel.to_day(day),
+        "type": "Expense",
+        "category_id": category_id,
+    }) or {}
+    return {field: doc.get(field) for field in ("sum", "count", "min", "max")}
+
+
+def expected(amounts: list[float]) -> dict:
+    if not amounts:
+        return {"sum": None, "count": None, "min": None, "max": None}
+    return {"sum": sum(amounts), "count": len(amounts), "min": min(amounts), "max": max(amounts)}
+
+
+if __name__ == "__main__":
+    user_model = UserModel()
+    user_id = user_model.bootstrap(f"rollup-check-{uuid.uuid4().hex}@example.com")
+    transaction_model = TransactionModel(user_id)
+
+    errors = []
+
+    def check(step: str, amounts: list[float], day: datetime = DAY):
+        stored, wanted = bucket(transaction_model, day), expected(amounts)
+        if stored != wanted:
+            errors.append(f"{step}: bucket {stored} != {wanted}")
+
+    try:
+        low = transaction_model.add_transaction("Expense", CATEGORY, 10.0, DAY)
+        high = transaction_model.add_transaction("Expense", CATEGORY, 20.0, DAY.replace(hour=12))
+        check("insert", [10.0, 20.0])
+
+        transaction_model.update_transaction(high, amount=25.0)
+        check("edit max upwards", [10.0, 25.0])
+
+        transaction_model.update_transaction(high, amount=5.0)
+        check("edit max below min", [10.0, 5.0])
+
+        transaction_model.update_transaction(low, amount=7.0)
+        check("edit max downwards", [7.0, 5.0])
+
+        transaction_model.update_transaction(high, date=datetime(2024, 1, 16))
+        check("move min to another day", [7.0])
+        check("new day bucket", [5.0], datetime(2024, 1, 16))
+
+        transaction_model.delete_transaction(low)
+        check("delete last transaction", [])
+    finally:
+        user_model.delete_user_with_data(user_id, wait=True)
+        CategoryModel(user_id).collection.delete_many({"user_id": transaction_model.user_id})
+
+    if errors:
+        print("\n".join(errors))
+        sys.exit(1)
+    print("OK: rollup buckets match the raw transactions after every edit")
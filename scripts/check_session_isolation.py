@@ -0,0 +1,94 @@
+"""
+Concurrency check for user-bound models.
+
+Runs many simulated sessions in parallel threads (like Streamlit script
+threads). Each session bootstraps a throw-away user, builds its own models on
+the shared connection pool, writes transactions with a session-specific
+amount and reads them back. Every result must belong to the session's user.
+
+Run from the project root (uses the configured database, test users are deleted):
+    python -m scripts.check_session_isolation --sessions 32 --transactions 20
+"""
+import argparse
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from analytics.analyzer import FinanceAnalyzer
+from database import BudgetModel, CategoryModel, TransactionModel, UserModel
+
+
+def run_session(user_model: UserModel, index: int, transactions: int) -> list[str]:
+    """Simulate one session, return the list of scoping errors found."""
+    email = f"session-check-{uuid.uuid4().hex}@example.com"
+    user_id = user_model.bootstrap(email)
+
+    category_model = CategoryModel(user_id)
+    transaction_model = TransactionModel(user_id)
+    budget_model = BudgetModel(user_id)
+    analyzer = FinanceAnalyzer(transaction_model)
+    oid = transaction_model.user_id
+
+    errors = []
+    try:
+        # distinct amount per session: any cross-user leak shows up in the totals
+        amount = float(index + 1)
+        now = datetime.now()
+        for day in range(transactions):
+            transaction_model.add_transaction(
+                transaction_type="Expense",
+                category="Shopping",
+                amount=amount,
+                transaction_date=now - timedelta(days=day),
+            )
+        budget_model.create_budget(category="Shopping", amount=100.0)
+
+        for doc in transaction_model.get_transactions():
+            if doc["user_id"] != oid:
+                errors.append(f"session {index}: get_transactions returned another user's row")
+
+        page, _ = transaction_model.get_transactions_page(page_size=transactions)
+        if len(page) != transactions or any(doc["user_id"] != oid for doc in page):
+            errors.append(f"session {index}: page is not scoped to its user")
+
+        for category in category_model.get_total():
+            if category["user_id"] != oid:
+                errors.append(f"session {index}: category of another user")
+
+        for budget in budget_model.get_budgets():
+            if budget["user_id"] != oid:
+                errors.append(f"session {index}: budget of another user")
+
+        expected = amount * transactions
+        total = analyzer.calculate_total_by_type("Expense")
+        if abs(total - expected) > 1e-6:
+            errors.append(f"session {index}: expense total {total} != {expected}")
+    finally:
+        user_model.delete_user_with_data(user_id, wait=True)
+        category_model.collection.delete_many({"user_id": oid})
+
+    return errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check user scoping under concurrent sessions")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--transactions", type=int, default=20)
+    args = parser.parse_args()
+
+    user_model = UserModel()
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, user_model, index, args.transactions)
+            for index in range(args.sessions)
+        ]
+        errors = [error for future in futures for error in future.result()]
+
+    if errors:
+        print("\n".join(errors))
+        print(f"FAILED: {len(errors)} scoping errors in {args.sessions} sessions")
+        sys.exit(1)
+
+    print(f"OK: {args.sessions} concurrent sessions, every result scoped to its user")
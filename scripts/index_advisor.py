@@ -0,0 +1,280 @@
+"""
+Index advisor for transaction queries.
+
+Seeds a throw-away database (<DATABASE_NAME>_index_advisor) on the configured
+server with synthetic transactions and the default index set
+(database_manager.INDEXES). It then replays every query shape
+TransactionModel.build_query can produce, as the full sorted list, as the
+first page and as the keyset seek of the next pages (the $or on (date, _id)
+that _load_page adds). Each replay is run through explain("executionStats"),
+and the report flags:
+
+- COLLSCAN: no index was used
+- SORT: the result was sorted in memory
+- docsExamined / nReturned above --max-ratio: the index is not selective enough
+
+For each flagged shape it proposes an ESR-ordered compound index (Equality
+fields, then the Sort key, then Range fields). With the default indexes,
+every seek must plan as an IXSCAN without an in-memory SORT, or the advisor
+exits with status 1.
+
+Run from the project root:
+    python -m scripts.index_advisor --rows 200000
+    python -m scripts.index_advisor --no-default-indexes   # what a bare collection needs
+"""
+import argparse
+import random
+import sys
+from datetime import datetime
+from itertools import combinations
+
+from bson.objectid import ObjectId
+
+import config
+from database import TransactionModel
+from database.database_manager import DatabaseManager
+from database.query_compiler import is_text_search, shape_hash
+from database.text_search import search_tokens
+from database.transaction_model import TRANSACTION_SORT
+from scripts.bench_frame_loading import CATEGORIES, synthetic_transactions
+
+USERS = 5
+
+# every filter build_query understands, grouped as the UI sets them,
+# with a representative value
+FILTER_GROUPS = {
+    "transaction_type": {"transaction_type": "Expense"},
+    "category": {"category": "Shopping"},
+    "categories": {"category": ["Shopping", "Rent"]},
+    "category_prefix": {"category_prefix": "sh"},
+    "amount": {"min_amount": 50, "max_amount": 200},
+    "date": {"start_date": datetime(2021, 1, 1), "end_date": datetime(2021, 6, 30)},
+    "search_text": {"search_text": "42"},
+}
+# at most one of these per query (they set the same filter key)
+CATEGORY_GROUPS = {"category", "categories"}
+
+
+def query_shapes(max_filters: int = 3):
+    """(label, filters) for all combinations of up to `max_filters` filter groups."""
+    for size in range(max_filters + 1):
+        for combo in combinations(FILTER_GROUPS, size):
+            if len(CATEGORY_GROUPS.intersection(combo)) > 1:
+                continue
+            filters = {}
+            for group in combo:
+                filters.update(FILTER_GROUPS[group])
+            yield ", ".join(combo) or "(no filter)", filters
+
+
+def seed(db, rows: int, with_indexes: bool) -> list[ObjectId]:
+    collection = db[config.COLLECTIONS["transaction"]]
+    collection.drop()
+    db[config.COLLECTIONS["category"]].drop()
+    if with_indexes:
+        DatabaseManager.create_indexes(db)
+
+    rng = random.Random(7)
+    user_ids = [ObjectId() for _ in range(USERS)]
+    now = datetime.now()
+    categories = [
+        {"_id": ObjectId(), "user_id": user_id, "type": transaction_type, "name": name, "created_at": now}
+        for user_id in user_ids
+        for transaction_type in config.TRANSACTION_TYPES
+        for name in CATEGORIES
+    ]
+    db[config.COLLECTIONS["category"]].insert_many(categories)
+    category_ids = {(cate["user_id"], cate["type"], cate["name"]): cate["_id"] for cate in categories}
+
+    batch = []
+    for doc in synthetic_transactions(rows):
+        user_id = rng.choice(user_ids)
+        doc.update(
+            user_id=user_id,
+            category_id=category_ids[(user_id, doc["type"], doc.pop("category"))],
+            search_tokens=search_tokens(doc["description"]),
+            created_at=now,
+            last_modified=now,
+        )
+        batch.append(doc)
+        if len(batch) == 10_000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    return user_ids
+
+
+def seeded_model(db, user_id) -> TransactionModel:
+    """A TransactionModel that resolves category names and prefixes against the seeded categories."""
+    model = TransactionModel(user_id)
+    model.category_collection = db[config.COLLECTIONS["category"]]
+    model.category_model.collection = db[config.COLLECTIONS["category"]]
+    return model
+
+
+def explain(db, query: dict, limit: int = 0) -> dict:
+    command = {
+        "find": config.COLLECTIONS["transaction"],
+        "filter": query,
+        "sort": dict(TransactionModel._sort_for(query)),
+    }
+    if limit:
+        command["limit"] = limit
+    return db.command({"explain": command, "verbosity": "executionStats"})
+
+
+def seek_query(db, query: dict, page_size: int):
+    """The page 2 query of `query`: seek past the last row of page 1 (None if there is no page 2)."""
+    rows = list(
+        db[config.COLLECTIONS["transaction"]]
+        .find(query, {"date": 1})
+        .sort(TRANSACTION_SORT)
+        .skip(page_size - 1)
+        .limit(2)
+    )
+    if len(rows) < 2:
+        return None
+    return TransactionModel._seek_query(query, rows[0]["date"], rows[0]["_id"])
+
+
+def plan_stages(plan: dict):
+    """Yield every stage of a (classic or SBE) winning plan tree."""
+    plan = plan.get("queryPlan", plan)
+    yield plan
+    for child_key in ("inputStage", "inputStages"):
+        children = plan.get(child_key)
+        if isinstance(children, dict):
+            children = [children]
+        for child in children or []:
+            yield from plan_stages(child)
+
+
+def split_predicates(query: dict) -> tuple[list, list, list]:
+    """Split a filter into (equality fields, range fields, unindexable fields)."""
+    equality, ranges, other = [], [], []
+    conditions = query["$and"] if "$and" in query else [query]
+    for condition in conditions:
+        for field, value in condition.items():
+            if field == "$text":
+                continue  # served by the text index
+            if field == "$or" and all(set(branch) <= {"date", "_id"} for branch in value):
+                continue  # keyset seek: a range on the sort key
+            if field.startswith("$"):
+                other.append(field)
+            elif isinstance(value, dict) and "$regex" in value:
+                other.append(field)
+            elif isinstance(value, dict) and any(op in value for op in ("$gt", "$gte", "$lt", "$lte")):
+                ranges.append(field)
+            else:
+                equality.append(field)
+    return equality, ranges, other
+
+
+def propose_index(query: dict) -> list[str]:
+    """ESR: equality fields, then the sort key, then range fields not already in it."""
+    equality, ranges, _ = split_predicates(query)
+    sort_fields = [field for field, _ in TRANSACTION_SORT]
+    # user_id leads every index (every query is scoped to one user)
+    equality = ["user_id"] + [field for field in equality if field != "user_id"]
+    return equality + sort_fields + [field for field in ranges if field not in sort_fields]
+
+
+def plan_problems(names: set, text_search: bool = False) -> list[str]:
+    """What keeps a plan from reading the rows straight off an index in sort order."""
+    problems = []
+    if "COLLSCAN" in names:
+        problems.append("COLLSCAN")
+    elif "IXSCAN" not in names:
+        problems.append("no IXSCAN")
+    # relevance order is always computed in memory, over the matches only
+    if "SORT" in names and not text_search:
+        problems.append("in-memory SORT")
+    return problems
+
+
+def analyze(result: dict, max_ratio: float, text_search: bool = False) -> tuple[list[str], dict]:
+    stats = result["executionStats"]
+    stages = list(plan_stages(result["queryPlanner"]["winningPlan"]))
+    names = {stage.get("stage") for stage in stages}
+    indexes = sorted({stage["indexName"] for stage in stages if "indexName" in stage})
+
+    issues = plan_problems(names, text_search)
+    ratio = stats["totalDocsExamined"] / max(stats["nReturned"], 1)
+    if ratio > max_ratio:
+        issues.append(f"docsExamined/nReturned={ratio:.1f}")
+
+    summary = {
+        "stages": names,
+        "indexes": indexes,
+        "returned": stats["nReturned"],
+        "keys": stats["totalKeysExamined"],
+        "docs": stats["totalDocsExamined"],
+        "ms": stats["executionTimeMillis"],
+    }
+    return issues, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain transaction query shapes and propose indexes")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=config.TRANSACTIONS_PAGE_SIZE)
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="Flag shapes examining more documents per returned one")
+    parser.add_argument("--no-default-indexes", action="store_true",
+                        help="Seed without the default index set")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database")
+    args = parser.parse_args()
+
+    manager = DatabaseManager()
+    db = manager.client[f"{manager.db.name}_index_advisor"]
+    user_ids = seed(db, args.rows, with_indexes=not args.no_default_indexes)
+    print(f"Seeded {args.rows:,} transactions for {USERS} users ({', '.join(CATEGORIES)})\n")
+
+    proposals = {}
+    flagged = 0
+    seek_failures = []
+    try:
+        model = seeded_model(db, user_ids[0])
+        for label, filters in query_shapes():
+            query = model.build_query(filters)
+            replays = [("list", query, 0), ("page", query, args.page_size + 1)]
+            # description searches page by offset, there is no seek
+            seek = None if is_text_search(query) else seek_query(db, query, args.page_size)
+            if seek is not None:
+                replays.append(("seek", seek, args.page_size + 1))
+
+            for mode, replay, limit in replays:
+                issues, summary = analyze(explain(db, replay, limit), args.max_ratio, is_text_search(replay))
+                if mode == "seek" and plan_problems(summary["stages"]):
+                    seek_failures.append(
+                        f"{label}: {', '.join(plan_problems(summary['stages']))} ({sorted(summary['stages'])})"
+                    )
+                status = "OK  " if not issues else "FLAG"
+                print(
+                    f"{status} {mode:<4} {shape_hash(replay)} {label:<60} "
+                    f"returned={summary['returned']:<6} keys={summary['keys']:<7} "
+                    f"docs={summary['docs']:<7} {summary['ms']:>4} ms  "
+                    f"index={','.join(summary['indexes']) or '-'}"
+                )
+                if issues:
+                    flagged += 1
+                    print(f"       {'; '.join(issues)}")
+                    _, _, unindexable = split_predicates(replay)
+                    if unindexable:
+                        print(f"       {', '.join(unindexable)}: unanchored regex, no index can serve it")
+                    proposals.setdefault(tuple(propose_index(replay)), []).append(f"{mode}: {label}")
+    finally:
+        if not args.keep:
+            manager.client.drop_database(db.name)
+
+    print(f"\n{flagged} flagged plans")
+    if proposals:
+        print("Proposed ESR indexes:")
+        for keys, shapes in sorted(proposals.items(), key=lambda item: -len(item[1])):
+            print(f"  {{{', '.join(f'{key}: -1' for key in keys)}}}  <- {len(shapes)} shapes")
+
+    if seek_failures and not args.no_default_indexes:
+        print("\n".join(seek_failures))
+        print(f"FAILED: {len(seek_failures)} keyset seeks are not an IXSCAN without an in-memory SORT")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""
+Move transactions, budgets and daily rollups from category names to
+category_id references (renaming a category then only writes the category).
+
+Only documents without category_id are touched, so the migration can be
+stopped and run again:
+
+1. create the categories that transactions/budgets use but that do not exist
+2. backfill category_id (one update_many per category) and unset "category"
+3. drop the indexes keyed on the old "category" field, create the new ones
+4. rebuild the daily rollups (now keyed by category_id)
+
+Run from the project root:
+    python -m scripts.migrate_category_ids
+    python -m scripts.migrate_category_ids --dry-run   # only count what is left
+"""
+import argparse
+from datetime import datetime
+from itertools import batched
+
+from pymongo import UpdateMany, UpdateOne
+
+import config
+from database import RollupModel
+from database.budget_model import BUDGET_CATEGORY_TYPE
+from database.database_manager import DatabaseManager, maintenance_timeout
+
+LEGACY = {"category": {"$exists": True}, "category_id": {"$exists": False}}
+
+
+def _collection(db, key: str):
+    return db[config.COLLECTIONS[key]]
+
+
+def pending(db) -> dict:
+    """Documents still referencing a category by name, per collection."""
+    return {key: _collection(db, key).count_documents(LEGACY) for key in ("transaction", "budget")}
+
+
+def drop_legacy_indexes(db, keys) -> list[str]:
+    dropped = []
+    for key in keys:
+        collection = _collection(db, key)
+        for index in collection.list_indexes():
+            if "category" in index["key"]:
+                collection.drop_index(index["name"])
+                dropped.append(f"{collection.name}.{index['name']}")
+    return dropped
+
+
+def create_missing_categories(db) -> int:
+    """Upsert a category for every (user, type, name) still used by name."""
+    used = {
+        (row["_id"]["user_id"], row["_id"]["type"], row["_id"]["name"])
+        for row in _collection(db, "transaction").aggregate([
+            {"$match": LEGACY},
+            {"$group": {"_id": {"user_id": "$user_id", "type": "$type", "name": "$category"}}},
+        ])
+    }
+    used |= {
+        (user_id, BUDGET_CATEGORY_TYPE, name)
+        for user_id, name in (
+            (budget["user_id"], budget["category"])
+            for budget in _collection(db, "budget").find(LEGACY, {"user_id": 1, "category": 1})
+        )
+    }
+
+    now = datetime.now()
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "type": category_type, "name": name},
+            {"$setOnInsert": {"created_at": now, "last_modified": now}},
+            upsert=True,
+        )
+        for user_id, category_type, name in used
+    ]
+    if not operations:
+        return 0
+    return _collection(db, "category").bulk_write(operations, ordered=False).upserted_count
+
+
+def backfill(db, batch_size: int = 1000) -> dict:
+    """Set category_id from (user_id, type, name) and drop the name."""
+    operations = {"transaction": [], "budget": []}
+    for category in _collection(db, "category").find({}, {"user_id": 1, "type": 1, "name": 1}):
+        update = {"$set": {"category_id": category["_id"]}, "$unset": {"category": ""}}
+        owner = {**LEGACY, "user_id": category["user_id"], "category": category["name"]}
+        operations["transaction"].append(UpdateMany({**owner, "type": category["type"]}, update))
+        if category["type"] == BUDGET_CATEGORY_TYPE:
+            operations["budget"].append(UpdateMany(owner, update))
+
+    modified = {}
+    for key, ops in operations.items():
+        modified[key] = 0
+        for batch in batched(ops, batch_size):
+            result = _collection(db, key).bulk_write(list(batch), ordered=False)
+            modified[key] += result.modified_count
+    return modified
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reference categories by id instead of by name")
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents left to migrate")
+    args = parser.parse_args()
+
+    with maintenance_timeout():
+        db = DatabaseManager().db
+        print(f"Left to migrate: {pending(db)}")
+        if args.dry_run:
+            raise SystemExit(0)
+
+        # the old unique (user_id, category, year, month) index would reject
+        # two budgets of one month once their names are unset
+        dropped = drop_legacy_indexes(db, ["budget"])
+        created = create_missing_categories(db)
+        print(f"Created {created} missing categories")
+
+        # the old transaction indexes still serve the backfill lookups
+        modified = backfill(db)
+        print(f"Backfilled category_id: {modified}")
+
+        dropped += drop_legacy_indexes(db, ["transaction", "rollup"])
+        print(f"Dropped legacy indexes: {', '.join(dropped) or '-'}")
+
+        # rollups are rebuilt from scratch, the new unique index needs an empty collection
+        _collection(db, "rollup").delete_many({})
+        DatabaseManager.create_indexes(db)
+        RollupModel().rebuild()
+        print("Rebuilt daily rollups")
+
+        print(f"Left to migrate: {pending(db)}")
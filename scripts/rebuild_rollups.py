@@ -0,0 +1,21 @@
+"""
+Rebuild the daily_rollups collection from raw transactions (backfill).
+
+Run from the project root:
+    python -m scripts.rebuild_rollups                 # every user
+    python -m scripts.rebuild_rollups --user-id <id>  # a single user
+"""
+import argparse
+
+from database import RollupModel
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild daily transaction rollups")
+    parser.add_argument("--user-id", default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+
+    rollup_model = RollupModel()
+    rollup_model.rebuild(user_id=args.user_id)
+
+    target = args.user_id or "all users"
+    print(f"Rebuilt daily rollups for {target}")
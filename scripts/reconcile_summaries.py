@@ -0,0 +1,36 @@
+"""
+Check the user_summaries collection against raw transactions.
+
+Run from the project root:
+    python -m scripts.reconcile_summaries                 # report mismatches, every user
+    python -m scripts.reconcile_summaries --user-id <id>  # a single user
+    python -m scripts.reconcile_summaries --fix           # rewrite mismatched summaries
+    python -m scripts.reconcile_summaries --rebuild       # recompute all (backfill)
+"""
+import argparse
+
+from database import SummaryModel
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile per-user transaction summaries")
+    parser.add_argument("--user-id", default=None, help="Only check this user")
+    parser.add_argument("--fix", action="store_true", help="Rewrite summaries that do not match")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every summary from scratch")
+    args = parser.parse_args()
+
+    summary_model = SummaryModel()
+    target = args.user_id or "all users"
+
+    if args.rebuild:
+        summary_model.rebuild(user_id=args.user_id)
+        print(f"Rebuilt summaries for {target}")
+    else:
+        mismatches = summary_model.reconcile(user_id=args.user_id, fix=args.fix)
+        for mismatch in mismatches:
+            print(
+                f"{mismatch['user_id']}  {mismatch['field']:<28} "
+                f"stored={mismatch['stored']!r:<28} expected={mismatch['expected']!r}"
+            )
+        users = len({mismatch["user_id"] for mismatch in mismatches})
+        action = "fixed" if args.fix else "found"
+        print(f"{len(mismatches)} mismatched fields in {users} summaries {action} for {target}")
@@ -28,10 +28,7 @@ def render_budgets(budget_model: BudgetModel,
         st.subheader("Create / Update Budget")
 
         # Có thể dùng dropdown category từ CategoryModel
-        categories = [
-            c["name"]
-            for c in category_model.get_categories_by_type("Expense")
-        ]
+        categories = category_model.get_category_names("Expense")
         category = st.selectbox(
             "Category",
             options=categories,
@@ -73,7 +70,8 @@ def render_budgets(budget_model: BudgetModel,
     with col_list:
         st.subheader("Budgets in this period")
 
-        budgets = budget_model.get_budgets(
+        # budgets + progress của cả tháng trong 1 lần
+        budgets = budget_model.get_budgets_with_progress(
             month=int(month),
             year=int(year),
         )
@@ -83,11 +81,7 @@ def render_budgets(budget_model: BudgetModel,
             return
 
         for b in budgets:
-            progress = budget_model.get_budget_progress(
-                category=b["category"],
-                month=b["month"],
-                year=b["year"],
-            )
+            progress = b["progress"]
 
             used_pct = progress["percentage"]
             used_pct_display = min(used_pct, 100.0)
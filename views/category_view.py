@@ -1,10 +1,28 @@
 import streamlit as st
 import config
+from database.job_model import JobModel, DELETE_CATEGORY
+from views.job_progress import render_job_progress
+
+def _usage_badges(item: dict) -> str:
+    if not item.get("transaction_count") and not item.get("budget_count"):
+        return "Unused"
+
+    badges = [
+        f"🧾 {item['transaction_count']} transactions",
+        f"💰 {item['total_amount']:,.2f}",
+    ]
+    if item.get("last_used"):
+        badges.append(f"🕒 {item['last_used'].strftime('%d-%m-%Y')}")
+    if item.get("budget_count"):
+        badges.append(f"🎯 {item['budget_count']} budgets")
+    return " · ".join(badges)
+
 
 # function to render category list
 def _render_category_list(category_model, category_type: str):
     st.subheader(f"{category_type} Categories")
-    expense_lst = category_model.get_categories_by_type(category_type = category_type)
+    # usage counts come with the list: no query per card
+    expense_lst = category_model.get_categories_with_usage(category_type)
 
     if expense_lst:
         st.write(f"Total: {len(expense_lst)} categories")
@@ -27,6 +45,7 @@ def _render_category_list(category_model, category_type: str):
                                 st.caption(created_at.strftime("%d-%m-%Y"))
                             except Exception:
                                 st.caption(str(created_at))
+                        st.caption(_usage_badges(item))
 
                         # Edit: rename + change type
                         with st.expander("Edit", expanded=False):
@@ -76,13 +95,9 @@ def _render_category_list(category_model, category_type: str):
                             if delete_button:
                                 name = item.get("name")
 
-                                # Đếm cả transactions & budgets
-                                tx_affected = category_model.count_transactions_for_category(
-                                    category_name=name
-                                )
-                                budget_affected = category_model.count_budgets_for_category(
-                                    category_name=name
-                                )
+                                # Đếm cả transactions & budgets (đã có trong danh sách)
+                                tx_affected = item.get("transaction_count", 0)
+                                budget_affected = item.get("budget_count", 0)
 
                                 # Warning chi tiết (Topic 2 + 5)
                                 if tx_affected > 0 or budget_affected > 0:
@@ -117,7 +132,10 @@ def _render_category_list(category_model, category_type: str):
                                     strategy=strategy,
                                 )
 
-                                if result.get("deleted"):
+                                if result.get("job_id"):
+                                    # chạy nền, tiến độ hiển thị ở đầu trang
+                                    st.rerun()
+                                elif result.get("deleted"):
                                     st.success(
                                         "✅ "
                                         + result.get("message", "Category deleted.")
@@ -182,10 +200,27 @@ def _render_add_category(category_model):
                 st.error("❌ Error adding category")
 
 
+@st.fragment(run_every=config.JOB_POLL_SECONDS)
+def _render_delete_jobs(job_model):
+    jobs = job_model.get_active_jobs(DELETE_CATEGORY)
+    if not jobs:
+        # all finished: refresh the category list
+        st.rerun()
+
+    for job in jobs:
+        strategy = job["params"]["strategy"]
+        render_job_progress(job, f"Deleting category ({strategy})")
+
+
 # public function
 def render_categories(category_model):
     st.title("🏷️ Category Management")
 
+    # reassign / cascade deletes still running in the background
+    job_model = JobModel(category_model.user_id)
+    if job_model.get_active_jobs(DELETE_CATEGORY):
+        _render_delete_jobs(job_model)
+
     # Display existing category list
     _render_category_detail(category_model)
 
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from utils import format_currency, get_date_range_options
 from analytics.analyzer import FinanceAnalyzer
 from database import TransactionModel
@@ -30,29 +29,26 @@ def render_dashboard(analyzer_model: FinanceAnalyzer,
     date_ranges = get_date_range_options() #> return dictionary
     start_date, end_date = date_ranges[date_range_option]
 
+    # One aggregation for every figure on the page
+    snapshot = analyzer_model.get_dashboard_snapshot(start_date, end_date, months=6)
+
     # Display metrics section
-    _render_metrics(analyzer_model, start_date, end_date)
+    _render_metrics(snapshot)
     
     st.divider()
     
     # Display charts section
-    _render_charts(analyzer_model, visualizer_model, start_date, end_date)
+    _render_charts(visualizer_model, snapshot)
     
     # # Display recent transactions
     # _render_recent_transactions(transaction_model)
 
 
-def _render_metrics(analyzer_model: FinanceAnalyzer, start_date, end_date):
+def _render_metrics(snapshot: dict):
     """Render the metrics cards at the top of dashboard"""
-    # Get statistics
-    if start_date and end_date:
-        total_expenses = analyzer_model.calculate_total_by_type("Expense", start_date, end_date)
-        total_income = analyzer_model.calculate_total_by_type("Income", start_date, end_date)
-    else:
-        total_expenses = analyzer_model.calculate_total_by_type("Expense")
-        total_income = analyzer_model.calculate_total_by_type("Income")
-    
-    net_balance = total_income - total_expenses
+    total_expenses = snapshot["total_expense"]
+    total_income = snapshot["total_income"]
+    net_balance = snapshot["net_balance"]
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -70,21 +66,19 @@ def _render_metrics(analyzer_model: FinanceAnalyzer, start_date, end_date):
                   delta_color=delta_color)
     
     with col4:
-        daily_avg = analyzer_model.get_daily_average()
+        daily_avg = snapshot["daily_average"]
         st.metric("📅 Daily Avg Expense", format_currency(daily_avg))
 
 
-def _render_charts(analyzer_model:FinanceAnalyzer, 
-                   visualizer_model:FinanceVisualizer, 
-                   start_date, 
-                   end_date):
+def _render_charts(visualizer_model:FinanceVisualizer, snapshot: dict):
     """Render the charts section with category and trend visualizations"""
     # Category charts
     col1, col2 = st.columns(2)
 
+    category_spending = snapshot["category_spending"]
+
     with col1:
         st.subheader("Spending by Category")
-        category_spending = analyzer_model.get_spending_by_category(start_date, end_date)
         if not category_spending.empty:
             fig = visualizer_model.plot_category_spending(category_spending)
             st.plotly_chart(fig, width='stretch') # embedded plotly chart into streamlit
@@ -101,7 +95,7 @@ def _render_charts(analyzer_model:FinanceAnalyzer,
     
     # Monthly trend
     st.subheader("Monthly Trend")
-    monthly_trend = analyzer_model.get_monthly_trend(months=6)
+    monthly_trend = snapshot["monthly_trend"]
     if not monthly_trend.empty:
         fig = visualizer_model.plot_monthly_trend(monthly_trend)
         st.plotly_chart(fig, width='stretch')
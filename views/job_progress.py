@@ -0,0 +1,20 @@
+import streamlit as st
+
+from database.job_model import DONE, FAILED
+
+
+def render_job_progress(job: dict, label: str):
+    """Progress of a background job (database/job_model.py) from its step counters."""
+    steps = job.get("steps", [])
+    done_steps = sum(1 for step in steps if step.get("done"))
+    processed = ", ".join(f"{step['processed']} {step['name']}" for step in steps)
+
+    if job.get("status") == FAILED:
+        st.error(f"{label} failed: {job.get('error', 'unknown error')}")
+        return
+    if job.get("status") == DONE:
+        st.success(f"{label} finished ({processed}).")
+        return
+
+    fraction = done_steps / len(steps) if steps else 0.0
+    st.progress(fraction, text=f"{label}… {processed}")
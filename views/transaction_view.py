@@ -1,10 +1,18 @@
 import streamlit as st
 import config
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta
 import time
-from utils import handler_datetime, format_currency, format_date
+from utils import format_date
 
 from database import TransactionModel
+from exporters.transaction_exporter import FORMATS, MIME_TYPES, PARQUET, PARQUET_AVAILABLE, open_export
+from importers.statement_importer import (
+    CSV,
+    MAPPING_FIELDS,
+    detect_format,
+    import_statement,
+    read_csv_header,
+)
 
 # ======================================
 # supporting functions
@@ -70,7 +78,7 @@ def _render_transaction_card(model: TransactionModel, item: dict):
                 else:
                     st.error("Failed to delete transaction")
 
-def _render_filters(model: TransactionModel):
+def _render_filters(model: TransactionModel, category_model):
     """Render filter controls."""
     st.subheader("🔍 Filters")
     
@@ -98,9 +106,17 @@ def _render_filters(model: TransactionModel):
         )
     
     with col2:
-        category = st.text_input(
-            "Category (regex match)",
-            key="filter_category"
+        category_options = sorted(category_model.get_category_names(transaction_type))
+        categories = st.multiselect(
+            "Categories",
+            options=category_options,
+            key="filter_categories"
+        )
+
+        category_prefix = st.text_input(
+            "Category starts with",
+            key="filter_category_prefix",
+            help="Case-insensitive, e.g. 'sh' matches Shopping"
         )
         
         max_amount = st.number_input(
@@ -119,7 +135,8 @@ def _render_filters(model: TransactionModel):
     
     search_text = st.text_input(
         "Search in Description",
-        key="filter_search_text"
+        key="filter_search_text",
+        help="Matches whole words or word beginnings, best matches first"
     )
     
     # Filter action buttons
@@ -133,8 +150,11 @@ def _render_filters(model: TransactionModel):
             if transaction_type:
                 filters['transaction_type'] = transaction_type
             
-            if category:
-                filters['category'] = category
+            if categories:
+                filters['category'] = categories
+
+            if category_prefix.strip():
+                filters['category_prefix'] = category_prefix.strip()
             
             if min_amount > 0:
                 filters['min_amount'] = min_amount
@@ -152,12 +172,14 @@ def _render_filters(model: TransactionModel):
                 filters['search_text'] = search_text
             
             st.session_state.active_filters = filters if filters else None
+            _reset_pagination()
             st.rerun()
     
     with col_clear:
         if st.button("🔄 Clear Filters", use_container_width=True):
             st.session_state.active_filters = None
             st.session_state.show_filters = False
+            _reset_pagination()
             st.rerun()
 
 def _render_create_transaction_form(transaction_model: TransactionModel, category_model):
@@ -190,8 +212,8 @@ def _render_create_transaction_form(transaction_model: TransactionModel, categor
     
     with col2:
         if transaction_type:
-            categories_result = category_model.get_categories_by_type(transaction_type)
-            category_options = [cate['name'] for cate in categories_result]
+            # cached category catalog: no query on reruns
+            category_options = category_model.get_category_names(transaction_type)
             category = st.selectbox(
                 "Category *",
                 options=category_options,
@@ -244,6 +266,118 @@ def _render_create_transaction_form(transaction_model: TransactionModel, categor
                 st.session_state.show_create_form = False
                 st.rerun()
 
+def _render_import_form(transaction_model: TransactionModel):
+    """Render the bank statement import form (CSV / OFX)."""
+    st.subheader("📥 Import Bank Statement")
+
+    uploaded = st.file_uploader(
+        "Statement file",
+        type=["csv", "ofx", "qfx"],
+        key="import_file",
+        help="Rows that were already imported are skipped"
+    )
+    if uploaded is None:
+        return
+
+    file_format = detect_format(uploaded.name)
+    mapping = {}
+    date_format = None
+
+    if file_format == CSV:
+        columns = read_csv_header(uploaded)
+        options = ["(none)"] + columns
+        st.caption("Map the file columns. Without a Type column, negative amounts are expenses.")
+
+        map_cols = st.columns(len(MAPPING_FIELDS))
+        for col, field in zip(map_cols, MAPPING_FIELDS):
+            with col:
+                # preselect a column with the same name
+                guess = next((i for i, c in enumerate(options) if c.lower() == field), 0)
+                choice = st.selectbox(field.capitalize(), options=options, index=guess, key=f"import_map_{field}")
+                if choice != "(none)":
+                    mapping[field] = choice
+
+        date_format = st.text_input(
+            "Date format",
+            value="",
+            key="import_date_format",
+            help="strptime format, e.g. %d/%m/%Y. Empty = ISO (YYYY-MM-DD)"
+        ).strip() or None
+
+    col_import, col_cancel = st.columns(2)
+
+    with col_import:
+        start = st.button("📥 Import", use_container_width=True, type="primary")
+
+    with col_cancel:
+        if st.button("❌ Cancel", key="import_cancel", use_container_width=True):
+            st.session_state.show_import_form = False
+            st.rerun()
+
+    if not start:
+        return
+
+    progress_bar = st.progress(0.0, text="Importing...")
+
+    def on_progress(rows: int, fraction: float):
+        progress_bar.progress(fraction, text=f"Imported {rows:,} rows...")
+
+    try:
+        result = import_statement(
+            transaction_model,
+            uploaded,
+            file_format=file_format,
+            mapping=mapping,
+            date_format=date_format,
+            progress=on_progress,
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    progress_bar.progress(1.0, text="Done")
+    st.success(f"✅ {result['message']}")
+
+    if result["errors"]:
+        # CSV rows: +2 for the header line and 1-based line numbers
+        offset = 2 if file_format == CSV else 1
+        st.warning(f"{len(result['errors'])} rows were not imported")
+        st.dataframe(
+            [{"line": e["row"] + offset, "error": e["message"]} for e in result["errors"][:200]],
+            use_container_width=True,
+        )
+
+    _reset_pagination()
+
+
+def _render_export(transaction_model: TransactionModel):
+    """Export the transactions matching the active filters."""
+    with st.expander("⬇️ Export"):
+        file_format = st.selectbox("Format", options=FORMATS, key="export_format")
+        if file_format == PARQUET and not PARQUET_AVAILABLE:
+            st.error("❌ Parquet export needs pyarrow (pip install pyarrow)")
+            return
+
+        filters = st.session_state.active_filters
+        # built only when the button is clicked, but st.download_button
+        # holds the whole file in memory: cap the number of rows
+        max_rows = config.EXPORT_DOWNLOAD_MAX_ROWS
+        if transaction_model.count_transactions(filters, limit=max_rows + 1) > max_rows:
+            st.warning(
+                f"⚠️ More than {max_rows:,} transactions match: "
+                "narrow the filters (e.g. a date range) to export them."
+            )
+            return
+
+        st.download_button(
+            "Download transactions",
+            data=lambda: open_export(transaction_model, file_format, filters),
+            file_name=f"transactions.{file_format}",
+            mime=MIME_TYPES[file_format],
+            use_container_width=True,
+        )
+
+
 def initialize_session_state():
     """Initialize session state variables for transaction view."""
     if 'show_filters' not in st.session_state:
@@ -252,12 +386,25 @@ def initialize_session_state():
         st.session_state.active_filters = None
     if 'show_create_form' not in st.session_state:
         st.session_state.show_create_form = False
+    if 'show_import_form' not in st.session_state:
+        st.session_state.show_import_form = False
+    if 'page_tokens' not in st.session_state:
+        # stack of page tokens visited so far, [None] = first page
+        st.session_state.page_tokens = [None]
+
+
+def _reset_pagination():
+    """Go back to the first page (e.g. when filters change)."""
+    st.session_state.page_tokens = [None]
 
 
 def _render_list_transaction(transaction_model: TransactionModel):
 
-    transactions = transaction_model.get_transactions(
-        advanced_filters=st.session_state.active_filters
+    page_tokens = st.session_state.page_tokens
+    transactions, next_page_token = transaction_model.get_transactions_page(
+        advanced_filters=st.session_state.active_filters,
+        page_size=config.TRANSACTIONS_PAGE_SIZE,
+        page_token=page_tokens[-1],
     )
         
 
@@ -267,6 +414,23 @@ def _render_list_transaction(transaction_model: TransactionModel):
         for item in transactions:
             _render_transaction_card(transaction_model, item)
 
+    # Pagination controls
+    col_prev, col_page, col_next = st.columns([1, 3, 1])
+
+    with col_prev:
+        if st.button("⬅️ Previous", use_container_width=True, disabled=len(page_tokens) <= 1):
+            page_tokens.pop()
+            st.rerun()
+
+    with col_page:
+        searching = bool((st.session_state.active_filters or {}).get("search_text"))
+        st.caption(f"Page {len(page_tokens)}" + (" · sorted by relevance" if searching else ""))
+
+    with col_next:
+        if st.button("Next ➡️", use_container_width=True, disabled=next_page_token is None):
+            page_tokens.append(next_page_token)
+            st.rerun()
+
 
 def render_transactions(transaction_model, category_model):
     """Main function to render the transaction view."""
@@ -279,7 +443,7 @@ def render_transactions(transaction_model, category_model):
         return 
     
 
-    col_title, col_create, col_filter = st.columns([3, 1, 1])
+    col_title, col_create, col_import, col_filter = st.columns([3, 1, 1, 1])
     
     with col_title:
         st.title("📊 Transactions")
@@ -289,6 +453,11 @@ def render_transactions(transaction_model, category_model):
             st.session_state.show_create_form = not st.session_state.show_create_form # negate the boolean value
             st.rerun()
     
+    with col_import:
+        if st.button("📥 IMPORT", use_container_width=True):
+            st.session_state.show_import_form = not st.session_state.show_import_form
+            st.rerun()
+
     with col_filter:
         if st.button("🔍 Filters", use_container_width=True):
             st.session_state.show_filters = not st.session_state.show_filters # negate the boolean value
@@ -301,13 +470,20 @@ def render_transactions(transaction_model, category_model):
         st.divider()
     
 
+    if st.session_state.show_import_form:
+        with st.container():
+            _render_import_form(transaction_model)
+        st.divider()
+
     if st.session_state.show_filters:
         with st.container():
-            _render_filters(transaction_model)
+            _render_filters(transaction_model, category_model)
         st.divider()
     
     if st.session_state.active_filters:
         filter_count = len(st.session_state.active_filters)
         st.info(f"🔍 {filter_count} filter(s) active")
 
+    _render_export(transaction_model)
+
     _render_list_transaction(transaction_model)
\ No newline at end of file
@@ -1,13 +1,22 @@
 from database.user_model import UserModel
+from database.job_model import JobModel, ACTIVE, DONE
+from views.job_progress import render_job_progress
+import config
 import streamlit as st
 import time
-from typing import Any, Optional 
 
 def render_user_profile(user_model: UserModel, user: dict[str, any]):
     
     if 'user_settings_open' not in st.session_state:
         st.session_state['user_settings_open'] = False
 
+    # account purge running in the background: only show its progress
+    if st.session_state.get("purge_job_id"):
+        with st.sidebar:
+            st.divider()
+            _render_purge_progress(user.get("id"), st.session_state["purge_job_id"])
+        return
+
     # Create a more compact profile container
     with st.sidebar:
         st.divider()
@@ -53,9 +62,7 @@ def render_user_profile(user_model: UserModel, user: dict[str, any]):
                         st.error("Please confirm before deleting your account.")
                     elif user_id:
                         summary = user_model.delete_user_with_data(user_id)
-                        st.success(summary.get("message", "Account deleted."))
-                        time.sleep(1)
-                        st.logout()
+                        st.session_state["purge_job_id"] = summary["job_id"]
                         st.rerun()
                     else:
                         st.error("Unable to determine user id.")
@@ -110,11 +117,26 @@ def _render_user_settings(user_model, user_id: str):
                     st.error("Please confirm before deleting your account.")
                 elif user_id:
                     summary = user_model.delete_user_with_data(user_id)
-                    st.success(summary.get("message", "Account deleted."))
-                    time.sleep(1)
-                    st.logout()
+                    st.session_state["purge_job_id"] = summary["job_id"]
                     st.rerun()
                 else:
                     st.error("Unable to determine user id.")
 
-    st.caption("_Account settings_")
\ No newline at end of file
+    st.caption("_Account settings_")
+
+
+@st.fragment(run_every=config.JOB_POLL_SECONDS)
+def _render_purge_progress(user_id: str, job_id: str):
+    job = JobModel(user_id).get_job(job_id)
+    if not job:
+        st.session_state.pop("purge_job_id", None)
+        return
+
+    render_job_progress(job, "Deleting account")
+    if job["status"] == DONE:
+        st.session_state.pop("purge_job_id", None)
+        time.sleep(1)
+        st.logout()
+    elif job["status"] not in ACTIVE:
+        # failed: back to the profile (the account stays deactivated)
+        st.session_state.pop("purge_job_id", None)